@@ -276,6 +276,54 @@ router.post('/route/optimize-station', validateStationOptimizationRequest, wrapA
   }
 }));
 
+router.get('/route/stations/nearby', wrapAsync(async (req, res) => {
+  const lat = Number(req.query.lat);
+  const lon = Number(req.query.lon);
+  const k = req.query.k !== undefined ? Number(req.query.k) : 10;
+  const radiusKm = req.query.radiusKm !== undefined ? Number(req.query.radiusKm) : null;
+  
+  if (!Number.isFinite(lat) || !Number.isFinite(lon)) {
+    throw new ExpressError(400, 'lat and lon query parameters are required');
+  }
+
+  try {
+    const result = await mlClient.findNearbyStations([lat, lon], k, radiusKm);
+    
+    res.json({
+      success: true,
+      stations: result.stations,
+      totalFound: result.total_found,
+      timestamp: new Date().toISOString()
+    });
+  } catch (error) {
+    throw new ExpressError(500, error.message);
+  }
+}));
+
+router.post('/route/matrix', wrapAsync(async (req, res) => {
+  const { sources, destinations = null, roadNetwork = false } = req.body;
+  
+  if (!Array.isArray(sources) || sources.length === 0) {
+    throw new ExpressError(400, 'Sources array is required and cannot be empty');
+  }
+  
+  if (destinations !== null && !Array.isArray(destinations)) {
+    throw new ExpressError(400, 'Destinations must be an array of [latitude, longitude]');
+  }
+
+  try {
+    const matrix = await mlClient.getDistanceMatrix(sources, destinations, roadNetwork);
+    
+    res.json({
+      success: true,
+      matrix,
+      timestamp: new Date().toISOString()
+    });
+  } catch (error) {
+    throw new ExpressError(500, error.message);
+  }
+}));
+
 router.post('/route/multi-stop', wrapAsync(async (req, res) => {
   const { startLocation, stops, endLocation = null } = req.body;
   
@@ -402,6 +450,22 @@ router.post('/models/retrain/:modelName', wrapAsync(async (req, res) => {
   }
 }));
 
+router.get('/models/jobs/:jobId', wrapAsync(async (req, res) => {
+  const { jobId } = req.params;
+
+  try {
+    const job = await mlClient.getTrainingJob(jobId);
+    
+    res.json({
+      success: true,
+      job,
+      timestamp: new Date().toISOString()
+    });
+  } catch (error) {
+    throw new ExpressError(500, error.message);
+  }
+}));
+
 router.get('/models/status', wrapAsync(async (req, res) => {
   try {
     const status = await mlClient.getModelsStatus();
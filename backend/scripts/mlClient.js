@@ -186,6 +186,31 @@ class MLClient {
     }
   }
 
+  async findNearbyStations(location, k = 10, radiusKm = null) {
+    try {
+      const [lat, lon] = location;
+      const response = await this.client.get('/route/stations/nearby', {
+        params: { lat, lon, k, ...(radiusKm !== null && { radius_km: radiusKm }) }
+      });
+      return response.data;
+    } catch (error) {
+      throw new Error(`Nearby station lookup failed: ${error.response?.data?.detail || error.message}`);
+    }
+  }
+
+  async getDistanceMatrix(sources, destinations = null, roadNetwork = false) {
+    try {
+      const response = await this.client.post('/route/matrix', {
+        sources: sources,
+        destinations: destinations,
+        road_network: roadNetwork
+      });
+      return response.data;
+    } catch (error) {
+      throw new Error(`Distance matrix failed: ${error.response?.data?.detail || error.message}`);
+    }
+  }
+
   async optimizeMultiStopRoute(startLocation, stops, endLocation = null) {
     try {
       const response = await this.client.post('/route/multi-stop', {
@@ -252,6 +277,15 @@ class MLClient {
     }
   }
 
+  async getTrainingJob(jobId) {
+    try {
+      const response = await this.client.get(`/models/jobs/${jobId}`);
+      return response.data;
+    } catch (error) {
+      throw new Error(`Training job lookup failed: ${error.response?.data?.detail || error.message}`);
+    }
+  }
+
   async getModelsStatus() {
     try {
       const response = await this.client.get('/models/status');
@@ -5,36 +5,116 @@ Configuration settings for EV Copilot ML Service
 import os
 from typing import Dict, Any
 
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse 'key=value,key=value' environment overrides"""
+    mapping = {}
+    for item in value.split(','):
+        if '=' in item:
+            key, val = item.split('=', 1)
+            mapping[key.strip()] = val.strip()
+    return mapping
+
 class MLConfig:
     """Configuration class for ML models and service"""
     
-    # Model settings
+    # Model settings, keyed by model and then by estimator attribute.
+    # n_jobs is the serving value; the training orchestrator raises it within
+    # TRAINING_SETTINGS['cpu_budget'] while fitting.
     MODEL_SETTINGS = {
         'failure_predictor': {
-            'contamination': 0.1,
-            'n_estimators': 100,
-            'random_state': 42
+            'anomaly_detector': {
+                'contamination': float(os.getenv('FAILURE_CONTAMINATION', 0.1)),
+                'n_estimators': 100,
+                'random_state': 42,
+                'n_jobs': 1
+            },
+            'failure_classifier': {
+                'n_estimators': 200,
+                'max_depth': 10,
+                'random_state': 42,
+                'n_jobs': 1
+            }
         },
         'traffic_optimizer': {
-            'n_estimators': 200,
-            'max_depth': 15,
-            'random_state': 42
+            'demand_predictor': {
+                'n_estimators': int(os.getenv('TRAFFIC_N_ESTIMATORS', 200)),
+                'max_depth': 15,
+                'random_state': 42,
+                'n_jobs': 1
+            },
+            'wait_time_predictor': {
+                'n_estimators': 150,
+                'max_depth': 8,
+                'random_state': 42
+            }
         },
         'logistics_optimizer': {
-            'n_estimators': 200,
-            'max_depth': 8,
-            'random_state': 42
+            'stockout_predictor': {
+                'n_estimators': 200,
+                'max_depth': int(os.getenv('LOGISTICS_MAX_DEPTH', 8)),
+                'random_state': 42
+            },
+            'demand_predictor': {
+                'n_estimators': 150,
+                'max_depth': 12,
+                'random_state': 42,
+                'n_jobs': 1
+            }
         },
         'energy_trader': {
-            'n_estimators': 200,
-            'learning_rate': 0.1,
-            'max_depth': 8,
-            'random_state': 42
+            'price_predictor': {
+                'n_estimators': 200,
+                'learning_rate': float(os.getenv('ENERGY_LEARNING_RATE', 0.1)),
+                'max_depth': 8,
+                'random_state': 42
+            },
+            'demand_predictor': {
+                'n_estimators': 150,
+                'max_depth': 12,
+                'random_state': 42,
+                'n_jobs': 1
+            }
         },
         'audit_analyzer': {
-            'contamination': 0.05,
-            'n_estimators': 150,
-            'random_state': 42
+            'anomaly_detector': {
+                'contamination': float(os.getenv('AUDIT_CONTAMINATION', 0.05)),
+                'n_estimators': 150,
+                'random_state': 42,
+                'n_jobs': 1
+            },
+            'compliance_classifier': {
+                'n_estimators': 200,
+                'max_depth': 15,
+                'random_state': 42,
+                'n_jobs': 1
+            }
+        },
+        'route_optimizer': {
+            # Routing lookups one request may have in flight at once
+            'request_concurrency': int(os.getenv('ROUTE_REQUEST_CONCURRENCY', 8)),
+            'osrm': {
+                'base_url': os.getenv('OSRM_BASE_URL', 'http://router.project-osrm.org'),
+                'timeout': float(os.getenv('OSRM_TIMEOUT', 10)),
+                'max_retries': int(os.getenv('OSRM_MAX_RETRIES', 2)),
+                'backoff_seconds': float(os.getenv('OSRM_BACKOFF_SECONDS', 0.2)),
+                'pool_size': int(os.getenv('OSRM_POOL_SIZE', 16)),
+                'max_table_size': int(os.getenv('OSRM_MAX_TABLE_SIZE', 100))
+            },
+            'route_cache': {
+                'max_entries': int(os.getenv('ROUTE_CACHE_MAX_ENTRIES', 4096)),
+                'max_bytes': int(float(os.getenv('ROUTE_CACHE_MAX_MB', 32)) * 1024 * 1024),
+                'ttl_seconds': float(os.getenv('ROUTE_CACHE_TTL', 6 * 3600)),
+                'precision_m': float(os.getenv('ROUTE_CACHE_PRECISION_M', 50)),
+                'sqlite_path': os.getenv('ROUTE_CACHE_DB', '')
+            },
+            'tsp': {
+                'exact_max_stops': int(os.getenv('TSP_EXACT_MAX_STOPS', 15)),
+                'time_budget_ms': float(os.getenv('TSP_TIME_BUDGET_MS', 250))
+            },
+            'station_search': {
+                'max_candidates': int(os.getenv('STATION_MAX_CANDIDATES', 25)),
+                'radius_km': float(os.getenv('STATION_SEARCH_RADIUS_KM', 0))
+            }
         }
     }
     
@@ -50,7 +130,60 @@ class MLConfig:
     DATA_SETTINGS = {
         'datasets_dir': os.getenv('DATASETS_DIR', 'datasets'),
         'models_dir': os.getenv('MODELS_DIR', 'saved_models'),
-        'max_batch_size': int(os.getenv('MAX_BATCH_SIZE', 100))
+        'max_model_versions': int(os.getenv('MAX_MODEL_VERSIONS', 3)),
+        'max_batch_size': int(os.getenv('MAX_BATCH_SIZE', 100)),
+        'max_fleet_batch_size': int(os.getenv('MAX_FLEET_BATCH_SIZE', 20000)),
+        'max_matrix_cells': int(os.getenv('MAX_MATRIX_CELLS', 10000000))
+    }
+    
+    # Inference execution settings ('thread' or 'process' per endpoint path)
+    INFERENCE_SETTINGS = {
+        'thread_workers': int(os.getenv('INFERENCE_THREAD_WORKERS', 8)),
+        'process_workers': int(os.getenv('INFERENCE_PROCESS_WORKERS', 2)),
+        'max_pending': int(os.getenv('INFERENCE_MAX_PENDING', 64)),
+        'default_executor': os.getenv('INFERENCE_DEFAULT_EXECUTOR', 'thread'),
+        'endpoint_executors': {
+            '/audit/batch-analyze': 'process',
+            **_parse_mapping(os.getenv('INFERENCE_ENDPOINT_EXECUTORS', ''))
+        }
+    }
+    
+    # Micro-batching settings, keyed by endpoint path
+    BATCHING_SETTINGS = {
+        '/mechanic/predict-failure': {
+            'enabled': os.getenv('MICROBATCH_ENABLED', 'true').lower() == 'true',
+            'max_batch_size': int(os.getenv('MICROBATCH_MAX_SIZE', 64)),
+            'max_wait_ms': float(os.getenv('MICROBATCH_MAX_WAIT_MS', 5)),
+            'max_concurrent_batches': int(os.getenv('MICROBATCH_MAX_CONCURRENT', 4))
+        }
+    }
+    
+    # Forecast response cache settings
+    CACHE_SETTINGS = {
+        'enabled': os.getenv('ENABLE_CACHING', 'true').lower() == 'true',
+        'ttl_seconds': float(os.getenv('CACHE_TTL', 300)),
+        'max_entries': int(os.getenv('CACHE_MAX_ENTRIES', 2048)),
+        'max_bytes': int(float(os.getenv('CACHE_MAX_MB', 64)) * 1024 * 1024)
+    }
+    
+    # Per-agent deadlines (seconds) for /agents/comprehensive-analysis
+    ANALYSIS_SETTINGS = {
+        'default_deadline': float(os.getenv('AGENT_DEADLINE', 2.0)),
+        'agent_deadlines': {
+            'route_optimization': 5.0,
+            **{
+                agent: float(seconds)
+                for agent, seconds in _parse_mapping(os.getenv('AGENT_DEADLINES', '')).items()
+            }
+        }
+    }
+    
+    # Background retraining settings
+    TRAINING_SETTINGS = {
+        'workers': int(os.getenv('TRAINING_WORKERS', 1)),
+        'niceness': int(os.getenv('TRAINING_NICENESS', 10)),
+        'cpu_budget': int(os.getenv('TRAINING_CPU_BUDGET', 0)) or os.cpu_count() or 1,
+        'max_jobs': int(os.getenv('TRAINING_MAX_JOBS', 50))
     }
     
     # Agent thresholds
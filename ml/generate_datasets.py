@@ -6,16 +6,138 @@ Generates realistic synthetic datasets for all 5 agents
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import argparse
 import json
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import DATASET_FORMATS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # Streaming parquet and feather output needs pyarrow; CSV streams without it
+    pa = None
+
+# Demand as a fraction of station capacity for each hour of the day
+HOURLY_DEMAND_FACTOR = np.full(24, 0.3)
+HOURLY_DEMAND_FACTOR[[7, 10, 16, 20]] = 0.6  # Mid-peak
+HOURLY_DEMAND_FACTOR[[8, 9, 17, 18, 19]] = 0.8  # Peak hours
+
+# (confidence beta, cost impact normal, success rate beta) parameters per agent;
+# MechanicAgent outcomes also depend on the trigger and action
+AGENT_OUTCOME_DISTRIBUTIONS = {
+    'TrafficAgent': ((7, 2), (-50, 25), (8, 2)),  # Lower cost for traffic actions
+    'LogisticsAgent': ((6, 2), (-500, 200), (7, 2)),  # Medium cost for logistics
+    'EnergyAgent': ((6, 3), (100, 1000), (6, 3))  # Can be positive (revenue) or negative
+}
+
+WEATHER_CONDITIONS = ['sunny', 'cloudy', 'rainy', 'hot', 'cold']
+ERROR_CODES = ['PROTOCOL_TIMEOUT', 'VOLTAGE_INSTABILITY', 'OVERHEATING', 'NETWORK_ERROR']
+
+# Signals are generated a few stations at a time, about this many rows per block
+SIGNAL_BLOCK_ROWS = 1_000_000
+
+# Parquet row groups are the unit predicate filters can skip when loading;
+# streamed feather files use record batches of the same size
+PARQUET_ROW_GROUP_ROWS = 131_072
+
+# Streaming mode: default memory ceiling, the part of it held by the trigger
+# pool and writer buffer, and the measured peak cost of generating and
+# writing one signal row (arrays, temporaries, frame, writer)
+STREAM_MEMORY_MB = 512
+STREAM_FIXED_MB = 40
+SIGNAL_BYTES_PER_ROW = 700
+
+# Decisions draw their triggers from a uniform sample of at most this many streamed signals
+TRIGGER_POOL_ROWS = 100_000
+
+# Independent random streams derived from the master seed, one per dataset;
+# signals add the station's position so every station has a stream of its own
+STATION_STREAM, SIGNAL_STREAM, DECISION_STREAM, MARKET_STREAM, USER_STREAM, TRIGGER_POOL_STREAM = range(6)
+
+def sequence_ids(prefix, n, width=6):
+    """prefix followed by 1..n zero-padded to width, like f'{prefix}{i:06d}'"""
+    if pa is None:
+        return prefix + pd.Series(np.arange(1, n + 1)).astype(str).str.zfill(width)
+    
+    # Arrow's string kernels avoid creating a Python string per id
+    numbers = pa_compute.utf8_lpad(pa_compute.cast(pa.array(np.arange(1, n + 1)), pa.string()), width, '0')
+    return pd.arrays.ArrowStringArray(pa_compute.binary_join_element_wise(prefix, numbers, ''))
+
+class DatasetStreamWriter:
+    """Append DataFrame chunks to a single csv, parquet or feather file
+    
+    Parquet and feather rows are regrouped into PARQUET_ROW_GROUP_ROWS
+    pieces, so the file is the same however the rows were chunked.
+    """
+    
+    def __init__(self, path, file_format):
+        if file_format != 'csv' and pa is None:
+            raise ImportError(f"pyarrow is required to stream {file_format} datasets")
+        self.path = path
+        self.file_format = file_format
+        self.schema = None
+        self._writer = None
+        self._pending = []
+        self._pending_rows = 0
+    
+    def write(self, df):
+        """Append one chunk; every chunk must have the same columns"""
+        if self.file_format == 'csv':
+            df.to_csv(self.path, mode='w' if self.schema is None else 'a', header=self.schema is None, index=False)
+            self.schema = True
+            return
+        
+        if self.schema is None:
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            # A column that is all None in the first chunk would otherwise be typed null
+            self.schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in schema
+            ], metadata=schema.metadata)
+            if self.file_format == 'parquet':
+                self._writer = pa_parquet.ParquetWriter(self.path, self.schema)
+            else:
+                self._writer = pa_ipc.new_file(
+                    self.path, self.schema, options=pa_ipc.IpcWriteOptions(compression='lz4')
+                )
+        
+        self._pending.append(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+        self._pending_rows += len(df)
+        while self._pending_rows >= PARQUET_ROW_GROUP_ROWS:
+            self._flush(PARQUET_ROW_GROUP_ROWS)
+    
+    def _flush(self, rows):
+        """Write the first rows pending rows as one row group or record batch"""
+        pending = pa.concat_tables(self._pending)
+        self._writer.write_table(pending.slice(0, rows).combine_chunks())
+        self._pending = [pending.slice(rows)]
+        self._pending_rows -= rows
+    
+    def close(self):
+        """Write what is still pending and finish the file"""
+        if self._writer is not None:
+            if self._pending_rows:
+                self._flush(self._pending_rows)
+            self._writer.close()
+            self._writer = None
 
 class EVCopilotDatasetGenerator:
-    def __init__(self, seed=42):
-        np.random.seed(seed)
+    def __init__(self, seed=42, workers=1):
+        self.seed = seed
+        self.workers = workers
         self.base_date = datetime(2024, 1, 1)
+    
+    def _rng(self, *stream):
+        """Generator for one random stream, the same however and wherever it is created"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=stream))
         
     def generate_station_master_data(self, n_stations=50):
         """Generate master data for EV charging stations"""
+        rng = self._rng(STATION_STREAM)
         
         station_types = ['fast', 'standard', 'ultra']
         cities = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Pune', 'Kolkata']
@@ -25,17 +147,17 @@ class EVCopilotDatasetGenerator:
             station = {
                 'station_id': f'ST{i+1:03d}',
                 'name': f'EV Station {i+1}',
-                'city': np.random.choice(cities),
-                'station_type': np.random.choice(station_types, p=[0.3, 0.5, 0.2]),
-                'capacity': np.random.randint(4, 16),
-                'max_inventory': np.random.randint(50, 200),
-                'latitude': np.random.uniform(8.0, 35.0),  # India coordinates
-                'longitude': np.random.uniform(68.0, 97.0),
-                'is_highway': np.random.choice([0, 1], p=[0.7, 0.3]),
-                'is_mall': np.random.choice([0, 1], p=[0.8, 0.2]),
-                'is_office': np.random.choice([0, 1], p=[0.7, 0.3]),
-                'installation_date': (self.base_date - timedelta(days=np.random.randint(30, 1000))).isoformat(),
-                'operator': f'Operator_{np.random.randint(1, 10)}'
+                'city': rng.choice(cities),
+                'station_type': rng.choice(station_types, p=[0.3, 0.5, 0.2]),
+                'capacity': rng.integers(4, 16),
+                'max_inventory': rng.integers(50, 200),
+                'latitude': rng.uniform(8.0, 35.0),  # India coordinates
+                'longitude': rng.uniform(68.0, 97.0),
+                'is_highway': rng.choice([0, 1], p=[0.7, 0.3]),
+                'is_mall': rng.choice([0, 1], p=[0.8, 0.2]),
+                'is_office': rng.choice([0, 1], p=[0.7, 0.3]),
+                'installation_date': (self.base_date - timedelta(days=int(rng.integers(30, 1000)))).isoformat(),
+                'operator': f'Operator_{rng.integers(1, 10)}'
             }
             stations.append(station)
         
@@ -44,104 +166,166 @@ class EVCopilotDatasetGenerator:
     def generate_historical_signals(self, stations_df, days=90, signals_per_hour=6):
         """Generate historical signal data for all stations"""
         
-        signals = []
+        blocks = list(self._signal_blocks(stations_df, days, signals_per_hour))
+        if not blocks:
+            return pd.DataFrame()
         
-        for _, station in stations_df.iterrows():
-            station_id = station['station_id']
-            capacity = station['capacity']
-            max_inventory = station['max_inventory']
-            
-            # Generate signals for each day
-            for day in range(days):
-                current_date = self.base_date + timedelta(days=day)
-                
-                # Daily patterns
-                is_weekend = current_date.weekday() >= 5
-                is_holiday = np.random.random() < 0.05  # 5% chance of holiday
-                
-                for hour in range(24):
-                    # Hour-based demand patterns
-                    if hour in [8, 9, 17, 18, 19]:  # Peak hours
-                        base_demand = capacity * 0.8
-                    elif hour in [7, 10, 16, 20]:  # Mid-peak
-                        base_demand = capacity * 0.6
-                    else:  # Off-peak
-                        base_demand = capacity * 0.3
-                    
-                    # Weekend adjustment
-                    if is_weekend:
-                        base_demand *= 0.7
-                    
-                    # Holiday adjustment
-                    if is_holiday:
-                        base_demand *= 0.5
-                    
-                    # Generate multiple signals per hour
-                    for signal_num in range(signals_per_hour):
-                        timestamp = current_date.replace(
-                            hour=hour, 
-                            minute=signal_num * (60 // signals_per_hour)
-                        )
-                        
-                        # Add noise and variations
-                        demand_noise = np.random.normal(0, base_demand * 0.2)
-                        actual_demand = max(0, base_demand + demand_noise)
-                        
-                        # Calculate queue (demand vs capacity)
-                        queue_length = max(0, actual_demand - capacity)
-                        
-                        # Inventory simulation
-                        consumption_rate = actual_demand * 0.8  # 80% of demand consumes inventory
-                        current_inventory = max_inventory - (consumption_rate * (hour + 1))
-                        current_inventory = max(0, current_inventory)
-                        
-                        # Hardware status
-                        chargers_up = capacity
-                        if np.random.random() < 0.02:  # 2% chance of charger failure
-                            chargers_up = np.random.randint(capacity//2, capacity)
-                        
-                        # Environmental factors
-                        temperature = 25 + np.random.normal(0, 10)
-                        if current_date.month in [4, 5, 6]:  # Summer
-                            temperature += 10
-                        elif current_date.month in [12, 1, 2]:  # Winter
-                            temperature -= 5
-                        
-                        voltage = 220 + np.random.normal(0, 10)
-                        current = actual_demand * 5 + np.random.normal(0, 5)  # Approximate current
-                        
-                        # Error simulation
-                        error = None
-                        if np.random.random() < 0.01:  # 1% chance of error
-                            errors = ['PROTOCOL_TIMEOUT', 'VOLTAGE_INSTABILITY', 'OVERHEATING', 'NETWORK_ERROR']
-                            error = np.random.choice(errors)
-                        
-                        signal = {
-                            'timestamp': timestamp.isoformat(),
-                            'station_id': station_id,
-                            'queue_length': round(queue_length, 1),
-                            'chargers_up': chargers_up,
-                            'total_chargers': capacity,
-                            'inventory': round(current_inventory, 0),
-                            'max_inventory': max_inventory,
-                            'temperature': round(temperature, 1),
-                            'voltage': round(voltage, 1),
-                            'current': round(current, 1),
-                            'error': error,
-                            'weather': self._get_weather(current_date, temperature),
-                            'is_weekend': is_weekend,
-                            'is_holiday': is_holiday,
-                            'hour': hour,
-                            'day_of_week': current_date.weekday(),
-                            'month': current_date.month
-                        }
-                        
-                        signals.append(signal)
-        
-        return pd.DataFrame(signals)
+        return pd.concat(blocks, ignore_index=True)
+    
+    def _signal_blocks(self, stations_df, days, signals_per_hour, block_rows=SIGNAL_BLOCK_ROWS):
+        """Yield signal DataFrames for consecutive blocks of stations
+        
+        A block holds about block_rows rows, and always at least one station.
+        With several workers, blocks are generated in a process pool, a few
+        ahead of the consumer, and still yielded in station order.
+        """
+        
+        steps = days * 24 * signals_per_hour
+        if steps == 0:
+            return
+        
+        grid = self._signal_time_grid(days, signals_per_hour)
+        stations_per_block = max(1, block_rows // steps)
+        station_ids = stations_df['station_id'].to_numpy()
+        blocks = (
+            (stations_df.iloc[start:start + stations_per_block], start, station_ids, grid, days, signals_per_hour)
+            for start in range(0, len(stations_df), stations_per_block)
+        )
+        
+        if self.workers <= 1:
+            for block in blocks:
+                yield self._signal_block(*block)
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for block in blocks:
+                pending.append(pool.submit(self._signal_block, *block))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _signal_block(self, block, start, station_ids, grid, days, signals_per_hour):
+        """Signals for one block of stations, whose first station is at position start
+        
+        Values are drawn as (stations, time steps) arrays, so rows come out in
+        the same station, day, hour, signal order as the nested loops did.
+        Every station draws from its own stream, so the result does not
+        depend on how stations are split into blocks or across workers.
+        """
+        
+        steps_per_day = 24 * signals_per_hour
+        steps = days * steps_per_day
+        n = len(block)
+        capacity = block['capacity'].to_numpy()
+        max_inventory = block['max_inventory'].to_numpy()
+        shape = (n, steps)
+        
+        station_draws = [self._station_draws(self._rng(SIGNAL_STREAM, start + i), days, steps) for i in range(n)]
+        draws = {name: np.stack([d[name] for d in station_draws]) for name in station_draws[0]}
+        del station_draws
+        
+        # Demand per station, day and hour, repeated for each signal in the hour
+        is_holiday = draws['holiday'] < 0.05  # 5% chance of holiday
+        base_demand = (
+            capacity[:, None, None] * HOURLY_DEMAND_FACTOR[None, None, :] *
+            np.where(grid['day_is_weekend'], 0.7, 1.0)[None, :, None] *
+            np.where(is_holiday, 0.5, 1.0)[:, :, None]
+        )
+        base_demand = np.repeat(base_demand.reshape(n, days * 24), signals_per_hour, axis=1)
+        
+        actual_demand = np.maximum(0, base_demand + draws['demand'] * base_demand * 0.2)
+        queue_length = np.maximum(0, actual_demand - capacity[:, None])
+        
+        # 80% of demand consumes inventory
+        consumption_rate = actual_demand * 0.8
+        current_inventory = np.maximum(0, max_inventory[:, None] - consumption_rate * (grid['hour'] + 1))
+        
+        # 2% chance of charger failure, leaving between half and all but one charger up
+        chargers_up = np.repeat(capacity[:, None], steps, axis=1)
+        failed = draws['failure'] < 0.02
+        lowest = chargers_up // 2
+        chargers_up[failed] = (lowest + draws['chargers'] * (chargers_up - lowest)).astype(int)[failed]
+        
+        temperature = 25 + draws['temperature'] * 10 + grid['season_offset']
+        voltage = 220 + draws['voltage'] * 10
+        current = actual_demand * 5 + draws['current'] * 5  # Approximate current
+        
+        # 1% chance of error; code -1 means no error
+        error = np.where(draws['error'] < 0.01, draws['error_code'], -1)
+        
+        return pd.DataFrame({
+            'timestamp': np.tile(grid['timestamp'], n),
+            'station_id': pd.Categorical.from_codes(
+                np.repeat(np.arange(start, start + n), steps), categories=station_ids
+            ),
+            'queue_length': np.round(queue_length, 1).ravel(),
+            'chargers_up': chargers_up.ravel(),
+            'total_chargers': np.repeat(capacity, steps),
+            'inventory': np.round(current_inventory, 0).ravel(),
+            'max_inventory': np.repeat(max_inventory, steps),
+            'temperature': np.round(temperature, 1).ravel(),
+            'voltage': np.round(voltage, 1).ravel(),
+            'current': np.round(current, 1).ravel(),
+            'error': pd.Categorical.from_codes(error.ravel(), categories=ERROR_CODES),
+            'weather': pd.Categorical.from_codes(
+                self._get_weather(temperature, draws['weather']).ravel(), categories=WEATHER_CONDITIONS
+            ),
+            'is_weekend': np.tile(grid['is_weekend'], n),
+            'is_holiday': np.repeat(is_holiday, steps_per_day, axis=1).ravel(),
+            'hour': np.tile(grid['hour'], n),
+            'day_of_week': np.tile(grid['day_of_week'], n),
+            'month': np.tile(grid['month'], n)
+        })
+    
+    def _station_draws(self, rng, days, steps):
+        """Random inputs for one station's signals, drawn in a fixed order"""
+        
+        return {
+            'holiday': rng.random(days),
+            'demand': rng.standard_normal(steps),
+            'failure': rng.random(steps),
+            'chargers': rng.random(steps),
+            'temperature': rng.standard_normal(steps),
+            'voltage': rng.standard_normal(steps),
+            'current': rng.standard_normal(steps),
+            'error': rng.random(steps),
+            'error_code': rng.integers(0, len(ERROR_CODES), steps),
+            'weather': rng.random(steps)
+        }
+    
+    def _signal_time_grid(self, days, signals_per_hour):
+        """Time columns shared by every station, one entry per signal"""
+        
+        dates = pd.date_range(self.base_date, periods=days, freq='D')
+        day_of_week = dates.dayofweek.to_numpy()
+        month = dates.month.to_numpy()
+        
+        # Summer is warmer, winter cooler
+        season_offset = np.select([np.isin(month, [4, 5, 6]), np.isin(month, [12, 1, 2])], [10, -5], 0)
+        
+        steps_per_day = 24 * signals_per_hour
+        hour = np.tile(np.repeat(np.arange(24), signals_per_hour), days)
+        minute = np.tile(np.arange(signals_per_hour) * (60 // signals_per_hour), days * 24)
+        timestamps = (
+            np.repeat(dates.to_numpy().astype('datetime64[s]'), steps_per_day) +
+            (hour * 3600 + minute * 60).astype('timedelta64[s]')
+        )
+        
+        return {
+            'timestamp': timestamps,
+            'hour': hour,
+            'day_of_week': np.repeat(day_of_week, steps_per_day),
+            'month': np.repeat(month, steps_per_day),
+            'is_weekend': np.repeat(day_of_week >= 5, steps_per_day),
+            'day_is_weekend': day_of_week >= 5,
+            'season_offset': np.repeat(season_offset, steps_per_day)
+        }
     
     def generate_agent_decisions(self, signals_df, n_decisions=5000):
         """Generate historical agent decisions"""
+        rng = self._rng(DECISION_STREAM)
         
         agents = ['MechanicAgent', 'TrafficAgent', 'LogisticsAgent', 'EnergyAgent']
         actions = {
@@ -151,63 +335,66 @@ class EVCopilotDatasetGenerator:
             'EnergyAgent': ['buy_energy', 'sell_energy', 'optimize_load', 'grid_stabilization']
         }
         
-        decisions = []
+        # Select random signals as triggers, all in one index sample
+        triggers = signals_df[['timestamp', 'station_id', 'error']].iloc[
+            rng.integers(0, len(signals_df), n_decisions)
+        ]
+        error_codes = triggers['error'].astype(pd.CategoricalDtype(ERROR_CODES)).cat.codes.to_numpy()
+        has_error = error_codes >= 0
         
-        for i in range(n_decisions):
-            # Select random signal as trigger
-            trigger_signal = signals_df.sample(1).iloc[0]
-            
-            agent = np.random.choice(agents)
-            action = np.random.choice(actions[agent])
-            
-            # Generate decision based on agent type
-            if agent == 'MechanicAgent':
-                confidence = 0.9 if trigger_signal['error'] else np.random.beta(8, 2)
-                cost_impact = np.random.normal(-200, 100) if action == 'restart_charger' else np.random.normal(-1000, 500)
-                success_rate = 0.95 if not trigger_signal['error'] else np.random.beta(7, 3)
-                
-            elif agent == 'TrafficAgent':
-                confidence = np.random.beta(7, 2)
-                cost_impact = np.random.normal(-50, 25)  # Lower cost for traffic actions
-                success_rate = np.random.beta(8, 2)
-                
-            elif agent == 'LogisticsAgent':
-                confidence = np.random.beta(6, 2)
-                cost_impact = np.random.normal(-500, 200)  # Medium cost for logistics
-                success_rate = np.random.beta(7, 2)
-                
-            else:  # EnergyAgent
-                confidence = np.random.beta(6, 3)
-                cost_impact = np.random.normal(100, 1000)  # Can be positive (revenue) or negative
-                success_rate = np.random.beta(6, 3)
-            
-            decision = {
-                'decision_id': f'DEC_{i+1:06d}',
-                'timestamp': trigger_signal['timestamp'],
-                'station_id': trigger_signal['station_id'],
-                'agent': agent,
-                'action': action,
-                'trigger_event': trigger_signal['error'] if trigger_signal['error'] else 'routine_monitoring',
-                'confidence_score': round(confidence, 3),
-                'execution_time': np.random.lognormal(7, 1),  # Log-normal distribution
-                'cost_impact': round(cost_impact, 2),
-                'revenue_impact': round(np.random.normal(200, 300), 2),
-                'success_rate': round(success_rate, 3),
-                'user_satisfaction': round(np.random.beta(7, 2), 3),
-                'risk_score': round(np.random.beta(2, 8), 3),
-                'human_override': 1 if np.random.random() < 0.05 else 0,
-                'system_cpu': round(np.random.beta(3, 7) * 100, 1),
-                'system_memory': round(np.random.beta(4, 6) * 100, 1),
-                'api_calls': np.random.poisson(8),
-                'approved_by_supervisor': 1 if np.random.random() < 0.95 else 0
-            }
-            
-            decisions.append(decision)
+        agent = rng.integers(0, len(agents), n_decisions)
+        action_names = [action for name in agents for action in actions[name]]
+        action_counts = np.array([len(actions[name]) for name in agents])
+        action_offsets = np.concatenate([[0], np.cumsum(action_counts)[:-1]])
+        action = action_offsets[agent] + (rng.random(n_decisions) * action_counts[agent]).astype(int)
         
-        return pd.DataFrame(decisions)
+        # Generate decision outcomes based on agent type
+        confidence = np.empty(n_decisions)
+        cost_impact = np.empty(n_decisions)
+        success_rate = np.empty(n_decisions)
+        
+        mechanic = agent == agents.index('MechanicAgent')
+        count = mechanic.sum()
+        error = has_error[mechanic]
+        restart = action[mechanic] == action_names.index('restart_charger')
+        confidence[mechanic] = np.where(error, 0.9, rng.beta(8, 2, count))
+        cost_impact[mechanic] = np.where(restart, rng.normal(-200, 100, count), rng.normal(-1000, 500, count))
+        success_rate[mechanic] = np.where(error, rng.beta(7, 3, count), 0.95)
+        
+        for name, (confidence_beta, cost_normal, success_beta) in AGENT_OUTCOME_DISTRIBUTIONS.items():
+            selected = agent == agents.index(name)
+            count = selected.sum()
+            confidence[selected] = rng.beta(*confidence_beta, count)
+            cost_impact[selected] = rng.normal(*cost_normal, count)
+            success_rate[selected] = rng.beta(*success_beta, count)
+        
+        # copy=False keeps each column's array instead of consolidating them into new blocks
+        return pd.DataFrame({
+            'decision_id': sequence_ids('DEC_', n_decisions),
+            'timestamp': triggers['timestamp'].to_numpy(),
+            'station_id': triggers['station_id'].array,
+            'agent': pd.Categorical.from_codes(agent, categories=agents),
+            'action': pd.Categorical.from_codes(action, categories=action_names),
+            'trigger_event': pd.Categorical.from_codes(
+                np.where(has_error, error_codes, len(ERROR_CODES)), categories=[*ERROR_CODES, 'routine_monitoring']
+            ),
+            'confidence_score': np.round(confidence, 3, out=confidence),
+            'execution_time': rng.lognormal(7, 1, n_decisions),  # Log-normal distribution
+            'cost_impact': np.round(cost_impact, 2, out=cost_impact),
+            'revenue_impact': np.round(rng.normal(200, 300, n_decisions), 2),
+            'success_rate': np.round(success_rate, 3, out=success_rate),
+            'user_satisfaction': np.round(rng.beta(7, 2, n_decisions), 3),
+            'risk_score': np.round(rng.beta(2, 8, n_decisions), 3),
+            'human_override': (rng.random(n_decisions) < 0.05).astype(int),
+            'system_cpu': np.round(rng.beta(3, 7, n_decisions) * 100, 1),
+            'system_memory': np.round(rng.beta(4, 6, n_decisions) * 100, 1),
+            'api_calls': rng.poisson(8, n_decisions),
+            'approved_by_supervisor': (rng.random(n_decisions) < 0.95).astype(int)
+        }, copy=False)
     
     def generate_energy_market_data(self, days=90):
         """Generate energy market data"""
+        rng = self._rng(MARKET_STREAM)
         
         market_data = []
         
@@ -226,16 +413,16 @@ class EVCopilotDatasetGenerator:
                 else:  # Off-peak
                     demand_multiplier = 0.8
                 
-                grid_demand = base_demand * demand_multiplier + np.random.normal(0, 50)
-                grid_supply = grid_demand * np.random.uniform(0.95, 1.15)  # Supply variation
+                grid_demand = base_demand * demand_multiplier + rng.normal(0, 50)
+                grid_supply = grid_demand * rng.uniform(0.95, 1.15)  # Supply variation
                 
                 # Weather impact on renewables
-                solar_irradiance = max(0, np.random.normal(500, 200)) if 6 <= hour <= 18 else 0
-                wind_speed = np.random.uniform(0, 20)
+                solar_irradiance = max(0, rng.normal(500, 200)) if 6 <= hour <= 18 else 0
+                wind_speed = rng.uniform(0, 20)
                 
                 # Fuel prices (daily variation)
-                coal_price = 3000 + np.random.normal(0, 100)
-                gas_price = 40 + np.random.normal(0, 2)
+                coal_price = 3000 + rng.normal(0, 100)
+                gas_price = 40 + rng.normal(0, 2)
                 
                 # Calculate energy price
                 base_price = 4.5
@@ -255,21 +442,21 @@ class EVCopilotDatasetGenerator:
                 else:
                     supply_multiplier = 0.9
                 
-                energy_price = base_price * time_multiplier * supply_multiplier + np.random.normal(0, 0.2)
+                energy_price = base_price * time_multiplier * supply_multiplier + rng.normal(0, 0.2)
                 energy_price = max(1.0, energy_price)  # Minimum price
                 
                 market_entry = {
-                    'timestamp': timestamp.isoformat(),
+                    'timestamp': timestamp,
                     'grid_demand': round(grid_demand, 1),
                     'grid_supply': round(grid_supply, 1),
-                    'grid_frequency': round(50 + np.random.normal(0, 0.2), 2),
+                    'grid_frequency': round(50 + rng.normal(0, 0.2), 2),
                     'energy_price': round(energy_price, 3),
                     'solar_irradiance': round(solar_irradiance, 1),
                     'wind_speed': round(wind_speed, 1),
                     'coal_price': round(coal_price, 2),
                     'gas_price': round(gas_price, 2),
-                    'carbon_price': round(2000 + np.random.normal(0, 100), 2),
-                    'temperature': round(25 + np.random.normal(0, 8), 1),
+                    'carbon_price': round(2000 + rng.normal(0, 100), 2),
+                    'temperature': round(25 + rng.normal(0, 8), 1),
                     'hour': hour,
                     'day_of_week': current_date.weekday(),
                     'month': current_date.month
@@ -281,6 +468,7 @@ class EVCopilotDatasetGenerator:
     
     def generate_user_data(self, n_users=1000):
         """Generate user/driver data"""
+        rng = self._rng(USER_STREAM)
         
         users = []
         
@@ -289,75 +477,147 @@ class EVCopilotDatasetGenerator:
                 'user_id': f'USR_{i+1:06d}',
                 'name': f'User {i+1}',
                 'email': f'user{i+1}@example.com',
-                'phone': f'+91{np.random.randint(7, 10)}{np.random.randint(100000000, 999999999)}',
-                'city': np.random.choice(['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad']),
-                'vehicle_type': np.random.choice(['car', 'motorcycle', 'truck'], p=[0.7, 0.2, 0.1]),
-                'user_segment': np.random.choice(['premium', 'regular', 'budget'], p=[0.2, 0.6, 0.2]),
-                'avg_monthly_usage': np.random.normal(15, 5),  # Sessions per month
-                'price_sensitivity': np.random.beta(3, 3),  # 0 to 1
-                'time_value_per_minute': np.random.uniform(1, 5),  # ₹ per minute
-                'registration_date': (self.base_date - timedelta(days=np.random.randint(1, 365))).isoformat(),
-                'total_sessions': np.random.randint(5, 200),
-                'total_spent': round(np.random.normal(5000, 2000), 2),
-                'satisfaction_score': round(np.random.beta(7, 2), 2)
+                'phone': f'+91{rng.integers(7, 10)}{rng.integers(100000000, 999999999)}',
+                'city': rng.choice(['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad']),
+                'vehicle_type': rng.choice(['car', 'motorcycle', 'truck'], p=[0.7, 0.2, 0.1]),
+                'user_segment': rng.choice(['premium', 'regular', 'budget'], p=[0.2, 0.6, 0.2]),
+                'avg_monthly_usage': rng.normal(15, 5),  # Sessions per month
+                'price_sensitivity': rng.beta(3, 3),  # 0 to 1
+                'time_value_per_minute': rng.uniform(1, 5),  # ₹ per minute
+                'registration_date': (self.base_date - timedelta(days=int(rng.integers(1, 365)))).isoformat(),
+                'total_sessions': rng.integers(5, 200),
+                'total_spent': round(rng.normal(5000, 2000), 2),
+                'satisfaction_score': round(rng.beta(7, 2), 2)
             }
             users.append(user)
         
         return pd.DataFrame(users)
     
-    def _get_weather(self, date, temperature):
-        """Get weather condition based on temperature and randomness"""
-        if temperature > 35:
-            return np.random.choice(['sunny', 'hot'], p=[0.7, 0.3])
-        elif temperature < 15:
-            return np.random.choice(['cloudy', 'cold'], p=[0.6, 0.4])
+    def _get_weather(self, temperature, draw):
+        """Get weather condition codes into WEATHER_CONDITIONS from temperature and uniform draws"""
+        sunny, cloudy, rainy, hot, cold = range(len(WEATHER_CONDITIONS))
+        
+        hot_weather = np.where(draw < 0.7, sunny, hot)
+        cold_weather = np.where(draw < 0.6, cloudy, cold)
+        mild_weather = np.select([draw < 0.6, draw < 0.9], [sunny, cloudy], rainy)
+        
+        return np.select([temperature > 35, temperature < 15], [hot_weather, cold_weather], mild_weather).astype(np.int8)
+    
+    def _save_dataset(self, df, output_dir, name, file_format):
+        """Write one dataset as csv, parquet or feather and return its filename"""
+        
+        filename = name + DATASET_FORMATS[file_format]
+        path = os.path.join(output_dir, filename)
+        
+        if file_format == 'parquet':
+            df.to_parquet(path, index=False, row_group_size=PARQUET_ROW_GROUP_ROWS)
+        elif file_format == 'feather':
+            df.to_feather(path)
         else:
-            return np.random.choice(['sunny', 'cloudy', 'rainy'], p=[0.6, 0.3, 0.1])
+            df.to_csv(path, index=False)
+        
+        return filename
     
-    def save_datasets(self, output_dir='datasets'):
-        """Generate and save all datasets"""
+    def _stream_signals(self, stations_df, days, output_dir, file_format, max_memory_mb):
+        """Write signals block by block and return (filename, row count, trigger pool)
+        
+        Blocks are sized so generating and writing one stays under
+        max_memory_mb, and only a bounded sample of rows is kept for
+        decision triggers, so memory does not grow with the dataset.
+        """
+        
+        # With workers, up to two blocks per worker are in flight and share the ceiling
+        in_flight = 1 if self.workers <= 1 else 2 * self.workers
+        block_budget = max(max_memory_mb - STREAM_FIXED_MB, 0) * 2 ** 20
+        block_rows = max(1, int(block_budget / SIGNAL_BYTES_PER_ROW / in_flight))
+        steps = days * 24 * 6
+        pool_fraction = min(1.0, TRIGGER_POOL_ROWS / max(len(stations_df) * steps, 1))
+        
+        filename = 'signals' + DATASET_FORMATS[file_format]
+        writer = DatasetStreamWriter(os.path.join(output_dir, filename), file_format)
+        n_signals = 0
+        pool = []
+        try:
+            for block in self._signal_blocks(stations_df, days, 6, block_rows):
+                writer.write(block)
+                n_signals += len(block)
+                
+                # Each station keeps its sample of rows from its own stream, whatever the blocks
+                first = int(block['station_id'].cat.codes.iloc[0])
+                keep = np.concatenate([
+                    self._rng(TRIGGER_POOL_STREAM, station).random(steps) < pool_fraction
+                    for station in range(first, first + len(block) // steps)
+                ])
+                pool.append(block[keep])
+                del block
+        finally:
+            writer.close()
+        
+        return filename, n_signals, pd.concat(pool, ignore_index=True) if pool else pd.DataFrame()
+    
+    def save_datasets(self, output_dir='datasets', file_format='csv', n_stations=50, days=90,
+                      stream=False, max_memory_mb=STREAM_MEMORY_MB):
+        """Generate and save all datasets
+        
+        With stream=True signals are flushed to disk a block of stations at
+        a time under max_memory_mb instead of being held in one DataFrame.
+        """
+        
+        if file_format not in DATASET_FORMATS:
+            raise ValueError(f"Unknown dataset format: {file_format}")
         
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
         print("🏭 Generating station master data...")
-        stations_df = self.generate_station_master_data(50)
-        stations_df.to_csv(f'{output_dir}/stations.csv', index=False)
-        print(f"✅ Saved {len(stations_df)} stations to stations.csv")
+        stations_df = self.generate_station_master_data(n_stations)
+        filename = self._save_dataset(stations_df, output_dir, 'stations', file_format)
+        if file_format != 'csv':
+            # The Node backend only reads stations.csv and falls back to mock stations without it
+            self._save_dataset(stations_df, output_dir, 'stations', 'csv')
+        print(f"✅ Saved {len(stations_df)} stations to {filename}")
         
         print("📡 Generating historical signals...")
-        signals_df = self.generate_historical_signals(stations_df, days=90)
-        signals_df.to_csv(f'{output_dir}/signals.csv', index=False)
-        print(f"✅ Saved {len(signals_df)} signals to signals.csv")
+        if stream:
+            filename, n_signals, signals_df = self._stream_signals(
+                stations_df, days, output_dir, file_format, max_memory_mb
+            )
+        else:
+            signals_df = self.generate_historical_signals(stations_df, days=days)
+            filename = self._save_dataset(signals_df, output_dir, 'signals', file_format)
+            n_signals = len(signals_df)
+        print(f"✅ Saved {n_signals} signals to {filename}")
         
         print("🤖 Generating agent decisions...")
         decisions_df = self.generate_agent_decisions(signals_df, 5000)
-        decisions_df.to_csv(f'{output_dir}/decisions.csv', index=False)
-        print(f"✅ Saved {len(decisions_df)} decisions to decisions.csv")
+        del signals_df
+        filename = self._save_dataset(decisions_df, output_dir, 'decisions', file_format)
+        print(f"✅ Saved {len(decisions_df)} decisions to {filename}")
         
         print("⚡ Generating energy market data...")
-        market_df = self.generate_energy_market_data(90)
-        market_df.to_csv(f'{output_dir}/energy_market.csv', index=False)
-        print(f"✅ Saved {len(market_df)} market records to energy_market.csv")
+        market_df = self.generate_energy_market_data(days)
+        filename = self._save_dataset(market_df, output_dir, 'energy_market', file_format)
+        print(f"✅ Saved {len(market_df)} market records to {filename}")
         
         print("👥 Generating user data...")
         users_df = self.generate_user_data(1000)
-        users_df.to_csv(f'{output_dir}/users.csv', index=False)
-        print(f"✅ Saved {len(users_df)} users to users.csv")
+        filename = self._save_dataset(users_df, output_dir, 'users', file_format)
+        print(f"✅ Saved {len(users_df)} users to {filename}")
         
         # Generate summary statistics
         summary = {
             'generation_date': datetime.now().isoformat(),
+            'format': file_format,
             'datasets': {
                 'stations': len(stations_df),
-                'signals': len(signals_df),
+                'signals': n_signals,
                 'decisions': len(decisions_df),
                 'market_records': len(market_df),
                 'users': len(users_df)
             },
             'date_range': {
                 'start': self.base_date.isoformat(),
-                'end': (self.base_date + timedelta(days=90)).isoformat()
+                'end': (self.base_date + timedelta(days=days)).isoformat()
             },
             'description': 'Synthetic datasets for EV Copilot 5-Agent ML System'
         }
@@ -372,8 +632,24 @@ class EVCopilotDatasetGenerator:
         return summary
 
 if __name__ == "__main__":
-    generator = EVCopilotDatasetGenerator()
-    summary = generator.save_datasets()
+    parser = argparse.ArgumentParser(description="Generate synthetic EV Copilot datasets")
+    parser.add_argument("--output-dir", default="datasets")
+    parser.add_argument("--format", choices=list(DATASET_FORMATS), default="csv",
+                        help="On-disk format; parquet and feather need pyarrow")
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--stream", action="store_true",
+                        help="Write signals incrementally instead of building them in memory")
+    parser.add_argument("--max-memory-mb", type=float, default=STREAM_MEMORY_MB,
+                        help="Memory ceiling for the streamed blocks of signals")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes generating signals; output is identical for any count")
+    args = parser.parse_args()
+    
+    generator = EVCopilotDatasetGenerator(args.seed, args.workers)
+    summary = generator.save_datasets(args.output_dir, args.format, args.stations, args.days,
+                                      args.stream, args.max_memory_mb)
     
     print("\n📋 DATASET SUMMARY:")
     print("=" * 40)
@@ -0,0 +1,260 @@
+"""
+Inference execution layer for EV Copilot ML Service
+Runs blocking model and routing calls off the asyncio event loop
+"""
+
+import asyncio
+import functools
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import MLConfig
+from utils import logger
+
+MODELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+EXECUTOR_TYPES = ('thread', 'process')
+
+# Models held by each worker process: class name -> (artifact path, model)
+_worker_models: Dict[str, Any] = {}
+
+def _init_worker():
+    """Make the model modules importable inside worker processes"""
+    if MODELS_PATH not in sys.path:
+        sys.path.append(MODELS_PATH)
+
+def _call_model(model_cls, artifact_path: str, method: str, args: tuple, kwargs: dict):
+    """Run a model method inside a worker process
+
+    The artifact is loaded once per worker and reloaded only when a newer
+    version is requested, so steady-state calls pay just for the arguments
+    and the result crossing the process boundary.
+    """
+    cached = _worker_models.get(model_cls.__name__)
+    if cached is None or cached[0] != artifact_path:
+        model = model_cls()
+        model.load_model(artifact_path)
+        cached = (artifact_path, model)
+        _worker_models[model_cls.__name__] = cached
+
+    return getattr(cached[1], method)(*args, **kwargs)
+
+class InferenceExecutor:
+    """Dispatch blocking calls to a bounded thread pool or a process pool
+
+    The pool used for each endpoint comes from
+    MLConfig.INFERENCE_SETTINGS['endpoint_executors']. Thread workers share
+    the in-memory models; process workers load their own copy from the
+    model registry, which sidesteps the GIL for CPU-heavy batch calls.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings or MLConfig.INFERENCE_SETTINGS
+        self.thread_pool = None
+        self.process_pool = None
+
+        # Cap queued work per pool so overload surfaces as latency, not memory growth
+        self._slots = {
+            executor_type: asyncio.Semaphore(self.settings['max_pending'])
+            for executor_type in EXECUTOR_TYPES
+        }
+
+    def start(self):
+        """Create the worker pools"""
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPoolExecutor(
+                max_workers=self.settings['thread_workers'],
+                thread_name_prefix='inference'
+            )
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=self.settings['process_workers'],
+                initializer=_init_worker
+            )
+        logger.info(
+            f"Inference pools ready: {self.settings['thread_workers']} threads, "
+            f"{self.settings['process_workers']} processes"
+        )
+
+    def shutdown(self):
+        """Shut down the worker pools"""
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+            self.thread_pool = None
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+
+    def executor_for(self, endpoint: str) -> str:
+        """Get the executor type configured for an endpoint"""
+        executor_type = self.settings['endpoint_executors'].get(
+            endpoint, self.settings['default_executor']
+        )
+        if executor_type not in EXECUTOR_TYPES:
+            raise ValueError(f"Unknown executor type for {endpoint}: {executor_type}")
+        return executor_type
+
+    async def run(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the executor configured for the endpoint
+
+        Callables sent to the process pool must be picklable.
+        """
+        call = functools.partial(func, *args, **kwargs)
+        return await self._submit(self.executor_for(endpoint), call)
+
+    async def run_model(self, endpoint: str, model: Any, method: str, *args,
+                        artifact_path: Optional[str] = None, **kwargs) -> Any:
+        """Run a model method on the executor configured for the endpoint
+
+        Process execution needs a persisted artifact to load in the worker;
+        without one the call falls back to the thread pool.
+        """
+        if self.executor_for(endpoint) == 'process' and artifact_path:
+            call = functools.partial(
+                _call_model, type(model), artifact_path, method, args, kwargs
+            )
+            return await self._submit('process', call)
+
+        return await self._submit('thread', functools.partial(getattr(model, method), *args, **kwargs))
+
+    async def _submit(self, executor_type: str, call: Callable) -> Any:
+        if self.thread_pool is None:
+            self.start()
+
+        pool = self.process_pool if executor_type == 'process' else self.thread_pool
+        async with self._slots[executor_type]:
+            return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+async def run_with_deadlines(calls: Dict[str, Awaitable], deadlines: Dict[str, float],
+                             default_deadline: float) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Await named calls concurrently, each bounded by its own deadline
+
+    Returns the results and a status per name ('ok', 'timeout' or 'error').
+    A call that misses its deadline or raises is reported in place of its
+    result instead of failing the others. Work already handed to a thread
+    keeps running after a timeout; only the wait is abandoned.
+    """
+    names = list(calls)
+    limits = [deadlines.get(name, default_deadline) for name in names]
+    outcomes = await asyncio.gather(
+        *[asyncio.wait_for(calls[name], limit) for name, limit in zip(names, limits)],
+        return_exceptions=True
+    )
+
+    results = {}
+    status = {}
+    for name, limit, outcome in zip(names, limits, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            status[name] = 'timeout'
+            results[name] = {'status': 'timeout', 'deadline_seconds': limit}
+        elif isinstance(outcome, BaseException):
+            status[name] = 'error'
+            results[name] = {'status': 'error', 'error': str(outcome)}
+        else:
+            status[name] = 'ok'
+            results[name] = outcome
+
+    return results, status
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched calls
+
+    Items are collected until max_batch_size are waiting or max_wait_ms has
+    passed since the first one arrived. The batch is then handed to
+    run_batch, a coroutine function that takes a list of items and returns
+    one result per item in the same order. Each caller awaits only its own
+    result; a failing batch fails every caller in it.
+    """
+
+    def __init__(self, run_batch: Callable, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, max_concurrent_batches: int = 4):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self.stats = {'batches': 0, 'items': 0, 'max_batch_seen': 0}
+
+        self._queue = None
+        self._collector = None
+        self._batch_slots = None
+        self._collecting = []
+        self._inflight = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue()
+            self._batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._collector = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def close(self):
+        """Stop collecting, fail requests not yet dispatched and wait for running batches"""
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+            self._collector = None
+
+        # Items of the batch being collected have already left the queue
+        pending = self._collecting
+        self._collecting = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher closed"))
+
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self._collecting = batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Keep collecting the next batch while this one runs
+            await self._batch_slots.acquire()
+            self._collecting = []
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list):
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                # Results cannot be matched to callers, so the whole batch fails
+                raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} items")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._batch_slots.release()
+
+        self.stats['batches'] += 1
+        self.stats['items'] += len(batch)
+        self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(batch))
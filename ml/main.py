@@ -3,13 +3,18 @@ Main FastAPI service for EV Copilot ML Models
 Integrates all 5 agent ML models into a single API service
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import uvicorn
+import io
+import json
 import os
 import sys
 from datetime import datetime
+from collections import Counter
+import numpy as np
 
 # Add models directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'models'))
@@ -22,6 +27,13 @@ from energy_trader import EnergyTrader
 from audit_analyzer import AuditAnalyzer
 from route_optimizer import RouteOptimizer
 
+from model_registry import ModelRegistry
+from config import MLConfig
+from inference import InferenceExecutor, MicroBatcher, run_with_deadlines
+from training import TrainingJobManager, train_models
+from response_cache import ResponseCache, make_cache_key
+from utils import DataProcessor
+
 # Initialize FastAPI app
 app = FastAPI(
     title="EV Copilot ML Service",
@@ -30,12 +42,43 @@ app = FastAPI(
 )
 
 # Initialize ML models
-failure_model = FailurePredictor()
-traffic_model = TrafficOptimizer()
-logistics_model = LogisticsOptimizer()
-energy_model = EnergyTrader()
-audit_model = AuditAnalyzer()
-route_model = RouteOptimizer()
+failure_model = FailurePredictor(MLConfig.get_model_config('failure_predictor'))
+traffic_model = TrafficOptimizer(MLConfig.get_model_config('traffic_optimizer'))
+logistics_model = LogisticsOptimizer(MLConfig.get_model_config('logistics_optimizer'))
+energy_model = EnergyTrader(MLConfig.get_model_config('energy_trader'))
+audit_model = AuditAnalyzer(MLConfig.get_model_config('audit_analyzer'))
+route_model = RouteOptimizer(MLConfig.get_model_config('route_optimizer'))
+
+# Trainable models and the registry names their artifacts are stored under
+model_registry = ModelRegistry()
+trainable_models = {
+    'failure': failure_model,
+    'traffic': traffic_model,
+    'logistics': logistics_model,
+    'energy': energy_model,
+    'audit': audit_model
+}
+registry_names = {
+    'failure': 'failure_predictor',
+    'traffic': 'traffic_optimizer',
+    'logistics': 'logistics_optimizer',
+    'energy': 'energy_trader',
+    'audit': 'audit_analyzer'
+}
+model_versions = {}
+
+# Executor for blocking model and routing calls
+inference = InferenceExecutor()
+
+def publish_model(model_name: str, model: Any, metadata: Dict[str, Any]):
+    """Swap a freshly trained model into the serving slot"""
+    trainable_models[model_name] = model
+    model_versions[model_name] = metadata['version']
+    models_trained[model_name] = True
+    print(f"✅ {registry_names[model_name]} swapped to version {metadata['version']}")
+
+# Retraining runs in worker processes and publishes through publish_model
+training_jobs = TrainingJobManager(model_registry, publish_model)
 
 # Global model status
 models_trained = {
@@ -49,6 +92,7 @@ models_trained = {
 
 # Pydantic models for API requests/responses
 class SensorData(BaseModel):
+    charger_id: Optional[str] = None
     temperature: float = 25
     voltage: float = 220
     current: float = 30
@@ -107,7 +151,7 @@ class RouteRequest(BaseModel):
 
 class StationOptimizationRequest(BaseModel):
     user_location: List[float]  # [lat, lon]
-    stations: List[Dict[str, Any]]
+    stations: Optional[List[Dict[str, Any]]] = None  # Defaults to the station catalog
     preferences: Optional[Dict[str, Any]] = None
 
 class MultiStopRouteRequest(BaseModel):
@@ -115,6 +159,12 @@ class MultiStopRouteRequest(BaseModel):
     stops: List[List[float]]     # List of [lat, lon] coordinates
     end_location: Optional[List[float]] = None  # [lat, lon], if None returns to start
 
+class DistanceMatrixRequest(BaseModel):
+    sources: List[List[float]]                        # List of [lat, lon] coordinates
+    destinations: Optional[List[List[float]]] = None  # Defaults to sources
+    profile: str = 'driving'
+    road_network: bool = False  # OSRM road distances instead of great-circle
+
 class DecisionData(BaseModel):
     agent: str
     action: str
@@ -131,37 +181,92 @@ class DecisionData(BaseModel):
     api_calls: int = 5
     timestamp: str = None
 
-# Startup event to train models
+# Startup event to load models
 @app.on_event("startup")
 async def startup_event():
-    """Train all models on startup"""
+    """Load saved models on startup, training only those without an artifact"""
     print("🚀 Starting EV Copilot ML Service...")
+    inference.start()
+    route_model.async_client.open()
     
-    try:
-        print("Training Failure Predictor...")
-        failure_model.train()
-        models_trained['failure'] = True
-        
-        print("Training Traffic Optimizer...")
-        traffic_model.train()
-        models_trained['traffic'] = True
-        
-        print("Training Logistics Optimizer...")
-        logistics_model.train()
-        models_trained['logistics'] = True
-        
-        print("Training Energy Trader...")
-        energy_model.train()
-        models_trained['energy'] = True
-        
-        print("Training Audit Analyzer...")
-        audit_model.train()
-        models_trained['audit'] = True
-        
-        print("✅ All models trained successfully!")
+    missing = {}
+    for model_name, model in trainable_models.items():
+        artifact_name = registry_names[model_name]
+        metadata = model_registry.load_latest(artifact_name, model)
+        if metadata is None:
+            missing[artifact_name] = type(model)
+            continue
+        model_versions[model_name] = metadata['version']
+        models_trained[model_name] = True
+        print(f"✅ {artifact_name} ready (version {metadata['version']})")
+    
+    if missing:
+        # Models without a compatible artifact are trained together in worker processes
+        print(f"🏋️ Training {len(missing)} models: {', '.join(missing)}")
+        results = await inference.run('/models/retrain', train_models, missing, model_registry)
         
-    except Exception as e:
-        print(f"❌ Error training models: {e}")
+        for model_name, model in trainable_models.items():
+            artifact_name = registry_names[model_name]
+            if artifact_name not in missing:
+                continue
+            if 'error' in results[artifact_name]:
+                print(f"❌ Error preparing {artifact_name}: {results[artifact_name]['error']}")
+                continue
+            try:
+                metadata = model_registry.load_latest(artifact_name, model)
+                model_versions[model_name] = metadata['version']
+                models_trained[model_name] = True
+                print(f"✅ {artifact_name} ready (version {metadata['version']})")
+            except Exception as e:
+                print(f"❌ Error preparing {artifact_name}: {e}")
+    
+    catalog = DataProcessor.load_datasets(MLConfig.DATA_SETTINGS['datasets_dir'], ['stations'])
+    if 'stations' in catalog:
+        route_model.load_station_catalog(catalog['stations'].to_dict('records'))
+        print(f"✅ Station catalog indexed ({len(route_model.station_index)} stations)")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release inference worker pools and routing connections"""
+    await failure_batcher.close()
+    await route_model.async_client.close()
+    training_jobs.shutdown()
+    inference.shutdown()
+
+async def run_model(endpoint: str, model_name: str, method: str, *args):
+    """Run a model method on the executor configured for the endpoint"""
+    version = model_versions.get(model_name)
+    artifact_path = (
+        model_registry.artifact_path(registry_names[model_name], version)
+        if version else None
+    )
+    return await inference.run_model(
+        endpoint, trainable_models[model_name], method, *args,
+        artifact_path=artifact_path
+    )
+
+# Forecasts depend only on the request body, the hour and the model version
+response_cache = ResponseCache() if MLConfig.CACHE_SETTINGS['enabled'] else None
+
+async def run_forecast(endpoint: str, model_name: str, method: str, payload: BaseModel, forecast_hours: int):
+    """Run a forecast model method, serving repeated requests from the response cache"""
+    compute = lambda: run_model(endpoint, model_name, method, payload.dict(), forecast_hours)
+    if response_cache is None:
+        return await compute()
+    
+    key = make_cache_key(endpoint, payload, forecast_hours, model_versions.get(model_name))
+    return await response_cache.get_or_compute(key, compute)
+
+# Concurrent failure predictions are scored together in micro-batches
+failure_batching = MLConfig.BATCHING_SETTINGS['/mechanic/predict-failure']
+failure_batcher = MicroBatcher(
+    lambda sensor_batch: run_model(
+        '/mechanic/predict-failure', 'failure', 'predict_failure_batch', sensor_batch
+    ),
+    max_batch_size=failure_batching['max_batch_size'],
+    max_wait_ms=failure_batching['max_wait_ms'],
+    max_concurrent_batches=failure_batching['max_concurrent_batches']
+)
 
 # Health check endpoint
 @app.get("/health")
@@ -182,7 +287,12 @@ async def predict_failure(sensor_data: SensorData):
         raise HTTPException(status_code=503, detail="Failure model not trained")
     
     try:
-        result = failure_model.predict_failure(sensor_data.dict())
+        if failure_batching['enabled']:
+            result = await failure_batcher.submit(sensor_data.dict())
+        else:
+            result = await run_model(
+                '/mechanic/predict-failure', 'failure', 'predict_failure', sensor_data.dict()
+            )
         return {
             "success": True,
             "prediction": result,
@@ -191,6 +301,37 @@ async def predict_failure(sensor_data: SensorData):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/mechanic/predict-failure/batch")
+async def predict_failure_batch(sensor_batch: List[SensorData]):
+    """Predict hardware failure probability for a fleet of chargers in one call"""
+    if not models_trained['failure']:
+        raise HTTPException(status_code=503, detail="Failure model not trained")
+    
+    max_batch_size = MLConfig.DATA_SETTINGS['max_fleet_batch_size']
+    if len(sensor_batch) > max_batch_size:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_batch_size} readings")
+    
+    try:
+        readings = [reading.dict() for reading in sensor_batch]
+        predictions = await run_model(
+            '/mechanic/predict-failure/batch', 'failure', 'predict_failure_batch', readings
+        )
+        
+        for reading, prediction in zip(readings, predictions):
+            if reading['charger_id'] is not None:
+                prediction['charger_id'] = reading['charger_id']
+        
+        # Predictions are plain JSON types already, so skip FastAPI's per-field encoding
+        return JSONResponse({
+            "success": True,
+            "predictions": predictions,
+            "total_analyzed": len(predictions),
+            "risk_distribution": dict(Counter(p['risk_level'] for p in predictions)),
+            "agent": "MechanicAgent"
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # TRAFFIC AGENT ENDPOINTS
 @app.post("/traffic/predict-demand")
 async def predict_traffic_demand(station_data: StationData, forecast_hours: int = 4):
@@ -199,7 +340,10 @@ async def predict_traffic_demand(station_data: StationData, forecast_hours: int
         raise HTTPException(status_code=503, detail="Traffic model not trained")
     
     try:
-        predictions = traffic_model.predict_traffic(station_data.dict(), forecast_hours)
+        predictions = await run_forecast(
+            '/traffic/predict-demand', 'traffic', 'predict_traffic',
+            station_data, forecast_hours
+        )
         return {
             "success": True,
             "predictions": predictions,
@@ -218,7 +362,8 @@ async def calculate_incentive(request: IncentiveRequest):
         # Add distance to alternative station data
         request.alternative_station.distance_km = 2.5  # Default
         
-        incentive = traffic_model.calculate_optimal_incentive(
+        incentive = await run_model(
+            '/traffic/calculate-incentive', 'traffic', 'calculate_optimal_incentive',
             request.current_station.dict(),
             request.alternative_station.dict(),
             request.user_profile
@@ -239,8 +384,9 @@ async def predict_stockout(logistics_data: LogisticsData, forecast_hours: int =
         raise HTTPException(status_code=503, detail="Logistics model not trained")
     
     try:
-        predictions = logistics_model.predict_stockout_risk(
-            logistics_data.dict(), forecast_hours
+        predictions = await run_forecast(
+            '/logistics/predict-stockout', 'logistics', 'predict_stockout_risk',
+            logistics_data, forecast_hours
         )
         return {
             "success": True,
@@ -263,7 +409,8 @@ async def optimize_dispatch(logistics_data: LogisticsData):
             {'id': 'V002', 'capacity': 30, 'distance_to_station': 8, 'available': True}
         ]
         
-        decision = logistics_model.optimize_dispatch_decision(
+        decision = await run_model(
+            '/logistics/optimize-dispatch', 'logistics', 'optimize_dispatch_decision',
             logistics_data.dict(), available_vehicles
         )
         return {
@@ -282,8 +429,9 @@ async def predict_energy_prices(market_data: MarketData, forecast_hours: int = 2
         raise HTTPException(status_code=503, detail="Energy model not trained")
     
     try:
-        predictions = energy_model.predict_energy_prices(
-            market_data.dict(), forecast_hours
+        predictions = await run_forecast(
+            '/energy/predict-prices', 'energy', 'predict_energy_prices',
+            market_data, forecast_hours
         )
         return {
             "success": True,
@@ -300,7 +448,8 @@ async def optimize_trading(market_data: MarketData, station_data: Dict[str, Any]
         raise HTTPException(status_code=503, detail="Energy model not trained")
     
     try:
-        decision = energy_model.optimize_trading_decision(
+        decision = await run_model(
+            '/energy/optimize-trading', 'energy', 'optimize_trading_decision',
             market_data.dict(), station_data
         )
         return {
@@ -322,7 +471,9 @@ async def analyze_decision(decision_data: DecisionData):
         if decision_data.timestamp is None:
             decision_data.timestamp = datetime.now().isoformat()
         
-        analysis = audit_model.analyze_decision(decision_data.dict())
+        analysis = await run_model(
+            '/audit/analyze-decision', 'audit', 'analyze_decision', decision_data.dict()
+        )
         return {
             "success": True,
             "analysis": analysis,
@@ -346,7 +497,9 @@ async def batch_analyze_decisions(decisions: List[DecisionData]):
             decision_dict['id'] = f"decision_{i}"
             decisions_dict.append(decision_dict)
         
-        analysis = audit_model.batch_audit_analysis(decisions_dict)
+        analysis = await run_model(
+            '/audit/batch-analyze', 'audit', 'batch_audit_analysis', decisions_dict
+        )
         return {
             "success": True,
             "analysis": analysis,
@@ -363,7 +516,7 @@ async def calculate_route(request: RouteRequest):
         start_coords = tuple(request.start_coords)
         end_coords = tuple(request.end_coords)
         
-        route = route_model.get_route_osrm(start_coords, end_coords, request.profile)
+        route = await route_model.get_route_osrm_async(start_coords, end_coords, request.profile)
         
         return {
             "success": True,
@@ -379,10 +532,8 @@ async def optimize_station_selection(request: StationOptimizationRequest):
     try:
         user_location = tuple(request.user_location)
         
-        result = route_model.find_optimal_station(
-            user_location, 
-            request.stations, 
-            request.preferences
+        result = await route_model.find_optimal_station_async(
+            user_location, request.stations, request.preferences
         )
         
         return {
@@ -393,6 +544,25 @@ async def optimize_station_selection(request: StationOptimizationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/route/stations/nearby")
+async def find_nearby_stations(lat: float, lon: float, k: int = Query(10, ge=1),
+                               radius_km: Optional[float] = None):
+    """Find catalog stations nearest to a point"""
+    if route_model.station_index is None:
+        raise HTTPException(status_code=503, detail="Station catalog not loaded")
+    
+    try:
+        stations = route_model.find_nearby_stations((lat, lon), k, radius_km)
+        
+        return {
+            "success": True,
+            "stations": stations,
+            "total_found": len(stations),
+            "service": "RouteOptimizer"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/route/multi-stop")
 async def optimize_multi_stop_route(request: MultiStopRouteRequest):
     """Optimize multi-stop route (TSP)"""
@@ -401,7 +571,7 @@ async def optimize_multi_stop_route(request: MultiStopRouteRequest):
         stops = [tuple(stop) for stop in request.stops]
         end_location = tuple(request.end_location) if request.end_location else None
         
-        result = route_model.optimize_multi_stop_route(
+        result = await route_model.optimize_multi_stop_route_async(
             start_location, stops, end_location
         )
         
@@ -413,6 +583,69 @@ async def optimize_multi_stop_route(request: MultiStopRouteRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/route/matrix")
+async def calculate_distance_matrix(request: DistanceMatrixRequest):
+    """Distance and duration matrix from every source to every destination"""
+    destinations = request.destinations if request.destinations is not None else request.sources
+    if any(len(point) != 2 for point in request.sources + destinations):
+        raise HTTPException(status_code=400, detail="Coordinates must be [lat, lon]")
+    
+    max_cells = MLConfig.DATA_SETTINGS['max_matrix_cells']
+    if len(request.sources) * len(destinations) > max_cells:
+        raise HTTPException(status_code=413, detail=f"Matrix exceeds {max_cells} cells")
+    
+    try:
+        if request.road_network:
+            matrix = await route_model.get_distance_matrix_async(
+                request.sources, destinations, request.profile
+            )
+        else:
+            matrix = await inference.run(
+                '/route/matrix', route_model.get_distance_matrix,
+                request.sources, destinations, request.profile, False
+            )
+        
+        
+        return StreamingResponse(
+            _matrix_response_chunks(matrix, [len(request.sources), len(destinations)]),
+            media_type='application/json'
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Cells formatted per chunk of a streamed /route/matrix response
+MATRIX_RESPONSE_BLOCK_CELLS = 250_000
+
+def _matrix_response_chunks(matrix: Dict, shape: List[int]):
+    """Encode a /route/matrix response body a block of rows at a time
+    
+    Starlette runs synchronous iterators in its thread pool, so formatting
+    never blocks the event loop and only one block is encoded at once.
+    Values have metre / 0.06 s resolution; pairs OSRM cannot route are null.
+    """
+    header = json.dumps({
+        "success": True,
+        "source": matrix['source'],
+        "shape": shape,
+        "service": "RouteOptimizer"
+    })
+    yield header[:-1].encode()
+    
+    for key in ('distances_km', 'durations_minutes'):
+        values = matrix[key]
+        block_rows = max(1, MATRIX_RESPONSE_BLOCK_CELLS // max(values.shape[1], 1))
+        yield f', "{key}": ['.encode()
+        
+        for start in range(0, len(values), block_rows):
+            buffer = io.BytesIO()
+            buffer.write(b',[' if start else b'[')
+            np.savetxt(buffer, values[start:start + block_rows], fmt='%.3f', delimiter=',', newline='],[')
+            yield buffer.getvalue()[:-2].replace(b'nan', b'null')
+        
+        yield b']'
+    
+    yield b'}'
+
 @app.post("/route/alternatives")
 async def get_alternative_routes(request: RouteRequest, num_alternatives: int = 3):
     """Get alternative routes between two points"""
@@ -420,7 +653,7 @@ async def get_alternative_routes(request: RouteRequest, num_alternatives: int =
         start_coords = tuple(request.start_coords)
         end_coords = tuple(request.end_coords)
         
-        routes = route_model.get_alternative_routes(
+        routes = await route_model.get_alternative_routes_async(
             start_coords, end_coords, num_alternatives
         )
         
@@ -441,7 +674,7 @@ async def assess_route_risk(request: RouteRequest, weather_conditions: Optional[
         end_coords = tuple(request.end_coords)
         
         # Get route first
-        route = route_model.get_route_osrm(start_coords, end_coords, request.profile)
+        route = await route_model.get_route_osrm_async(start_coords, end_coords, request.profile)
         
         if not route['success']:
             raise HTTPException(status_code=400, detail="Could not calculate route")
@@ -467,25 +700,38 @@ async def comprehensive_analysis(
     market_data: MarketData,
     user_location: Optional[List[float]] = None
 ):
-    """Run analysis for all agents including route optimization"""
-    results = {}
+    """Run analysis for all agents including route optimization
+    
+    Agents run concurrently, each with its own deadline; an agent that times
+    out or fails is reported in agent_status instead of failing the request.
+    """
+    endpoint = '/agents/comprehensive-analysis'
+    calls = {}
     
     try:
         # Mechanic Agent
         if models_trained['failure']:
-            results['mechanic'] = failure_model.predict_failure(sensor_data.dict())
+            calls['mechanic'] = run_model(
+                endpoint, 'failure', 'predict_failure', sensor_data.dict()
+            )
         
         # Traffic Agent
         if models_trained['traffic']:
-            results['traffic'] = traffic_model.predict_traffic(station_data.dict(), 4)
+            calls['traffic'] = run_model(
+                endpoint, 'traffic', 'predict_traffic', station_data.dict(), 4
+            )
         
         # Logistics Agent
         if models_trained['logistics']:
-            results['logistics'] = logistics_model.predict_stockout_risk(logistics_data.dict(), 6)
+            calls['logistics'] = run_model(
+                endpoint, 'logistics', 'predict_stockout_risk', logistics_data.dict(), 6
+            )
         
         # Energy Agent
         if models_trained['energy']:
-            results['energy'] = energy_model.predict_energy_prices(market_data.dict(), 8)
+            calls['energy'] = run_model(
+                endpoint, 'energy', 'predict_energy_prices', market_data.dict(), 8
+            )
         
         # Route Optimizer (if user location provided)
         if user_location and models_trained['route']:
@@ -511,54 +757,84 @@ async def comprehensive_analysis(
                 }
             ]
             
-            results['route_optimization'] = route_model.find_optimal_station(
+            calls['route_optimization'] = route_model.find_optimal_station_async(
                 tuple(user_location), sample_stations
             )
         
+        results, agent_status = await run_with_deadlines(
+            calls,
+            MLConfig.ANALYSIS_SETTINGS['agent_deadlines'],
+            MLConfig.ANALYSIS_SETTINGS['default_deadline']
+        )
+        
         return {
             "success": True,
             "results": results,
+            "agent_status": agent_status,
+            "partial": any(status != 'ok' for status in agent_status.values()),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Model management endpoints
-@app.post("/models/retrain/{model_name}")
+@app.post("/models/retrain/{model_name}", status_code=202)
 async def retrain_model(model_name: str):
-    """Retrain a specific model"""
+    """Start retraining a specific model in the background"""
+    if model_name not in trainable_models:
+        raise HTTPException(status_code=400, detail="Invalid model name")
+    
+    active_job = training_jobs.active_job(model_name)
+    if active_job is not None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{model_name} retraining already in progress (job {active_job['job_id']})"
+        )
+    
     try:
-        if model_name == "failure":
-            failure_model.train()
-            models_trained['failure'] = True
-        elif model_name == "traffic":
-            traffic_model.train()
-            models_trained['traffic'] = True
-        elif model_name == "logistics":
-            logistics_model.train()
-            models_trained['logistics'] = True
-        elif model_name == "energy":
-            energy_model.train()
-            models_trained['energy'] = True
-        elif model_name == "audit":
-            audit_model.train()
-            models_trained['audit'] = True
-        else:
-            raise HTTPException(status_code=400, detail="Invalid model name")
+        job = training_jobs.submit(
+            model_name, type(trainable_models[model_name]), registry_names[model_name]
+        )
         
         return {
             "success": True,
-            "message": f"{model_name} model retrained successfully",
+            "message": f"{model_name} retraining started",
+            "job": job,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/models/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Get the status of a retraining job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "success": True,
+        "job": job,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get forecast response and route cache statistics"""
+    return {
+        "enabled": response_cache is not None,
+        "stats": response_cache.stats() if response_cache is not None else None,
+        "route_cache": route_model.cache.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/models/status")
 async def get_models_status():
     """Get status of all models"""
     return {
         "models_trained": models_trained,
+        "model_versions": model_versions,
+        "batching": {"/mechanic/predict-failure": failure_batcher.stats},
         "timestamp": datetime.now().isoformat(),
         "total_models": len(models_trained),
         "trained_models": sum(models_trained.values())
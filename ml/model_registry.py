@@ -0,0 +1,134 @@
+"""
+Versioned model registry for EV Copilot ML Service
+Persists trained agent models so the service can start without retraining
+"""
+
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import sklearn
+
+from config import MLConfig
+from utils import logger, ModelUtils
+
+class ModelRegistry:
+    """Store and load versioned model artifacts under the models directory
+
+    Layout::
+
+        <models_dir>/<model_name>/<version>/<model_name>.pkl
+        <models_dir>/<model_name>/<version>/<model_name>_metadata.json
+
+    Versions are timestamp strings, so lexical order is chronological order.
+    """
+
+    def __init__(self, models_dir: Optional[str] = None, max_versions: Optional[int] = None):
+        self.models_dir = models_dir or MLConfig.DATA_SETTINGS['models_dir']
+        self.max_versions = max_versions or MLConfig.DATA_SETTINGS['max_model_versions']
+
+    def _model_dir(self, model_name: str) -> str:
+        return os.path.join(self.models_dir, model_name)
+
+    def artifact_path(self, model_name: str, version: str) -> str:
+        """Path of the pickled model for a given version"""
+        return os.path.join(self._model_dir(model_name), version, f"{model_name}.pkl")
+
+    def list_versions(self, model_name: str) -> List[str]:
+        """List stored versions, newest first"""
+        model_dir = self._model_dir(model_name)
+        if not os.path.isdir(model_dir):
+            return []
+
+        versions = [
+            entry for entry in os.listdir(model_dir)
+            if not entry.startswith('.') and os.path.isdir(os.path.join(model_dir, entry))
+        ]
+        return sorted(versions, reverse=True)
+
+    def get_metadata(self, model_name: str, version: str) -> Optional[Dict[str, Any]]:
+        """Load metadata for a stored version"""
+        return ModelUtils.load_model_metadata(
+            model_name, os.path.join(self._model_dir(model_name), version)
+        )
+
+    def is_compatible(self, metadata: Optional[Dict[str, Any]], model: Any) -> bool:
+        """Check whether a stored artifact can be loaded into this model
+
+        Each model class declares an ARTIFACT_SCHEMA. Bump it whenever the
+        attributes that save_model writes or load_model reads change, so
+        artifacts in the old layout are skipped instead of loaded.
+        """
+        if not metadata:
+            return False
+
+        return (
+            metadata.get('model_class') == type(model).__name__ and
+            metadata.get('artifact_schema') == getattr(model, 'ARTIFACT_SCHEMA', 1) and
+            metadata.get('sklearn_version') == sklearn.__version__
+        )
+
+    def save(self, model_name: str, model: Any, metrics: Optional[Dict[str, Any]] = None) -> str:
+        """Persist a trained model as a new version and return the version"""
+        if not getattr(model, 'is_trained', False):
+            raise ValueError(f"Cannot register untrained model: {model_name}")
+
+        model_dir = self._model_dir(model_name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        version = datetime.now().strftime('v%Y%m%d%H%M%S%f')
+        staging_dir = os.path.join(model_dir, f".staging-{version}-{os.getpid()}")
+        os.makedirs(staging_dir)
+
+        try:
+            model.save_model(os.path.join(staging_dir, f"{model_name}.pkl"))
+
+            metadata = {
+                'model_name': model_name,
+                'version': version,
+                'model_class': type(model).__name__,
+                'artifact_schema': getattr(model, 'ARTIFACT_SCHEMA', 1),
+                'sklearn_version': sklearn.__version__,
+                'metrics': {
+                    key: float(value) for key, value in (metrics or {}).items()
+                    if isinstance(value, (int, float))
+                }
+            }
+            ModelUtils.save_model_metadata(model_name, metadata, staging_dir)
+
+            # Publish the version in one step so readers never see a partial artifact
+            os.rename(staging_dir, os.path.join(model_dir, version))
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        self._prune(model_name)
+        logger.info(f"Registered {model_name} version {version}")
+        return version
+
+    def load_latest(self, model_name: str, model: Any) -> Optional[Dict[str, Any]]:
+        """Load the newest compatible version into model
+
+        Returns the metadata of the loaded version, or None when no
+        compatible artifact exists.
+        """
+        for version in self.list_versions(model_name):
+            metadata = self.get_metadata(model_name, version)
+            if not self.is_compatible(metadata, model):
+                logger.info(f"Skipping incompatible {model_name} version {version}")
+                continue
+
+            try:
+                model.load_model(self.artifact_path(model_name, version))
+                return metadata
+            except Exception as e:
+                logger.warning(f"Failed to load {model_name} version {version}: {e}")
+
+        return None
+
+    def _prune(self, model_name: str):
+        """Remove versions beyond the retention limit"""
+        for version in self.list_versions(model_name)[self.max_versions:]:
+            shutil.rmtree(os.path.join(self._model_dir(model_name), version), ignore_errors=True)
+            logger.info(f"Pruned {model_name} version {version}")
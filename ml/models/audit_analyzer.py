@@ -16,18 +16,45 @@ import json
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import MLConfig
+
 class AuditAnalyzer:
-    def __init__(self):
-        self.anomaly_detector = IsolationForest(
-            contamination=0.05,  # 5% anomaly rate
-            random_state=42,
-            n_estimators=150
-        )
-        self.compliance_classifier = RandomForestClassifier(
-            n_estimators=200,
-            random_state=42,
-            max_depth=15
-        )
+    ARTIFACT_SCHEMA = 1
+    
+    DECISION_DEFAULTS = {
+        'agent': 'MechanicAgent',
+        'action': 'restart_charger',
+        'confidence_score': 0.8,
+        'execution_time': 1000,
+        'cost_impact': 0,
+        'revenue_impact': 0,
+        'success_rate': 0.9,
+        'user_satisfaction': 0.8,
+        'risk_score': 0.2,
+        'human_override': 0,
+        'system_cpu': 50,
+        'system_memory': 60,
+        'api_calls': 5
+    }
+    
+    # Tags emitted by _determine_required_actions, in output order
+    REQUIRED_ACTIONS = [
+        'flag_for_review',
+        'immediate_escalation',
+        'compliance_review',
+        'generate_incident_report',
+        'financial_audit',
+        'model_review'
+    ]
+
+    def __init__(self, config=None):
+        # Per-estimator overrides on top of MLConfig.MODEL_SETTINGS
+        config = {
+            estimator: {**params, **(config or {}).get(estimator, {})}
+            for estimator, params in MLConfig.get_model_config('audit_analyzer').items()
+        }
+        self.anomaly_detector = IsolationForest(**config['anomaly_detector'])
+        self.compliance_classifier = RandomForestClassifier(**config['compliance_classifier'])
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.is_trained = False
@@ -192,75 +219,33 @@ class AuditAnalyzer:
     
     def analyze_decision(self, decision_data):
         """Analyze a single decision for anomalies and compliance"""
-        if not self.is_trained:
-            raise ValueError("Model not trained. Call train() first.")
-        
-        # Prepare input features
-        features = np.array([[
-            self.label_encoders['agent'].transform([decision_data.get('agent', 'MechanicAgent')])[0],
-            self.label_encoders['action'].transform([decision_data.get('action', 'restart_charger')])[0],
-            decision_data.get('confidence_score', 0.8),
-            decision_data.get('execution_time', 1000),
-            decision_data.get('cost_impact', 0),
-            decision_data.get('revenue_impact', 0),
-            decision_data.get('success_rate', 0.9),
-            decision_data.get('user_satisfaction', 0.8),
-            decision_data.get('hour', datetime.now().hour),
-            decision_data.get('day_of_week', datetime.now().weekday()),
-            decision_data.get('risk_score', 0.2),
-            decision_data.get('human_override', 0),
-            decision_data.get('system_cpu', 50),
-            decision_data.get('system_memory', 60),
-            decision_data.get('api_calls', 5),
-            decision_data.get('revenue_impact', 0) + decision_data.get('cost_impact', 0),
-            decision_data.get('success_rate', 0.9) / (decision_data.get('execution_time', 1000) / 1000 + 1),
-            (decision_data.get('system_cpu', 50) + decision_data.get('system_memory', 60)) / 2,
-            decision_data.get('risk_score', 0.2) / (decision_data.get('confidence_score', 0.8) + 0.01)
-        ]])
-        
-        # Scale features
-        features_scaled = self.scaler.transform(features)
-        
-        # Get predictions
-        anomaly_score = self.anomaly_detector.decision_function(features_scaled)[0]
-        is_anomaly = self.anomaly_detector.predict(features_scaled)[0] == -1
-        
-        compliance_prob = self.compliance_classifier.predict_proba(features_scaled)[0][1]
-        is_violation = compliance_prob > 0.5
-        
-        # Generate audit hash
-        audit_hash = self._generate_audit_hash(decision_data)
-        
-        # Determine required actions
-        required_actions = self._determine_required_actions(
-            is_anomaly, is_violation, decision_data
-        )
-        
-        return {
-            'anomaly_detected': bool(is_anomaly),
-            'anomaly_score': float(anomaly_score),
-            'compliance_violation': bool(is_violation),
-            'violation_probability': float(compliance_prob),
-            'audit_hash': audit_hash,
-            'risk_level': self._calculate_risk_level(anomaly_score, compliance_prob),
-            'required_actions': required_actions,
-            'audit_timestamp': datetime.now().isoformat(),
-            'confidence': 0.88
-        }
+        return self._build_analyses([decision_data], self._score_decisions([decision_data]))[0]
     
     def batch_audit_analysis(self, decisions_batch):
         """Analyze multiple decisions in batch"""
-        results = []
-        
-        for decision in decisions_batch:
-            analysis = self.analyze_decision(decision)
-            results.append({
+        if len(decisions_batch) > 0:
+            scores = self._score_decisions(decisions_batch)
+            analyses = self._build_analyses(decisions_batch, scores)
+        else:
+            scores = {
+                'is_anomaly': np.zeros(0, dtype=bool),
+                'is_violation': np.zeros(0, dtype=bool),
+                'risk_level': np.zeros(0, dtype=str)
+            }
+            analyses = []
+        
+        results = [
+            {
                 'decision_id': decision.get('id'),
                 'analysis': analysis
-            })
+            }
+            for decision, analysis in zip(decisions_batch, analyses)
+        ]
         
         # Generate batch summary
-        summary = self._generate_batch_summary(results)
+        summary = self._generate_batch_summary(
+            scores['is_anomaly'], scores['is_violation'], scores['risk_level']
+        )
         
         return {
             'individual_results': results,
@@ -269,6 +254,99 @@ class AuditAnalyzer:
             'analysis_timestamp': datetime.now().isoformat()
         }
     
+    def _score_decisions(self, decisions):
+        """Score a batch of decisions with one call per model
+        
+        Returns arrays with one entry per decision, plus the required
+        actions for each.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train() first.")
+        
+        columns = self._decision_columns(decisions)
+        
+        # Prepare input features
+        features = np.column_stack([
+            self.label_encoders['agent'].transform(columns['agent']),
+            self.label_encoders['action'].transform(columns['action']),
+            columns['confidence_score'],
+            columns['execution_time'],
+            columns['cost_impact'],
+            columns['revenue_impact'],
+            columns['success_rate'],
+            columns['user_satisfaction'],
+            columns['hour'],
+            columns['day_of_week'],
+            columns['risk_score'],
+            columns['human_override'],
+            columns['system_cpu'],
+            columns['system_memory'],
+            columns['api_calls'],
+            columns['revenue_impact'] + columns['cost_impact'],
+            columns['success_rate'] / (columns['execution_time'] / 1000 + 1),
+            (columns['system_cpu'] + columns['system_memory']) / 2,
+            columns['risk_score'] / (columns['confidence_score'] + 0.01)
+        ])
+        
+        # Scale features
+        features_scaled = self.scaler.transform(features)
+        
+        # Get predictions; IsolationForest flags negative decision scores as outliers
+        anomaly_scores = self.anomaly_detector.decision_function(features_scaled)
+        is_anomaly = anomaly_scores < 0
+        
+        compliance_probs = self.compliance_classifier.predict_proba(features_scaled)[:, 1]
+        is_violation = compliance_probs > 0.5
+        
+        return {
+            'anomaly_score': anomaly_scores,
+            'is_anomaly': is_anomaly,
+            'violation_probability': compliance_probs,
+            'is_violation': is_violation,
+            'risk_level': self._calculate_risk_level(anomaly_scores, compliance_probs),
+            'required_actions': self._determine_required_actions(is_anomaly, is_violation, columns)
+        }
+    
+    def _build_analyses(self, decisions, scores):
+        """Assemble per-decision analysis dicts from batch scores"""
+        audit_timestamp = datetime.now().isoformat()
+        is_anomaly = scores['is_anomaly'].tolist()
+        anomaly_scores = scores['anomaly_score'].tolist()
+        is_violation = scores['is_violation'].tolist()
+        violation_probs = scores['violation_probability'].tolist()
+        risk_levels = scores['risk_level'].tolist()
+        
+        return [
+            {
+                'anomaly_detected': is_anomaly[i],
+                'anomaly_score': anomaly_scores[i],
+                'compliance_violation': is_violation[i],
+                'violation_probability': violation_probs[i],
+                'audit_hash': self._generate_audit_hash(decision),
+                'risk_level': risk_levels[i],
+                'required_actions': scores['required_actions'][i],
+                'audit_timestamp': audit_timestamp,
+                'confidence': 0.88
+            }
+            for i, decision in enumerate(decisions)
+        ]
+    
+    def _decision_columns(self, decisions):
+        """Collect decision fields into arrays, filling missing values with defaults"""
+        frame = pd.DataFrame(list(decisions))
+        now = datetime.now()
+        defaults = {**self.DECISION_DEFAULTS, 'hour': now.hour, 'day_of_week': now.weekday()}
+        columns = {}
+        
+        for field, default in defaults.items():
+            dtype = object if isinstance(default, str) else float
+            if field in frame:
+                columns[field] = frame[field].fillna(default).to_numpy(dtype=dtype)
+            else:
+                columns[field] = np.full(len(frame), default, dtype=dtype)
+        
+        return columns
+    
     def detect_pattern_anomalies(self, historical_decisions, window_hours=24):
         """Detect pattern-based anomalies in historical data"""
         
@@ -311,55 +389,49 @@ class AuditAnalyzer:
         hash_string = json.dumps(hash_data, sort_keys=True)
         return hashlib.sha256(hash_string.encode()).hexdigest()
     
-    def _determine_required_actions(self, is_anomaly, is_violation, decision_data):
-        """Determine what actions are required based on analysis"""
-        actions = []
-        
-        if is_anomaly:
-            actions.append('flag_for_review')
-            if decision_data.get('risk_score', 0) > 0.7:
-                actions.append('immediate_escalation')
-        
-        if is_violation:
-            actions.append('compliance_review')
-            actions.append('generate_incident_report')
-            
-            if decision_data.get('cost_impact', 0) < -5000:
-                actions.append('financial_audit')
-        
-        if decision_data.get('confidence_score', 1) < 0.3:
-            actions.append('model_review')
-        
-        if not actions:
-            actions.append('routine_logging')
-        
-        return actions
+    def _determine_required_actions(self, is_anomaly, is_violation, columns):
+        """Determine what actions are required for each analyzed decision"""
+        flags = np.column_stack([
+            is_anomaly,
+            is_anomaly & (columns['risk_score'] > 0.7),
+            is_violation,
+            is_violation,
+            is_violation & (columns['cost_impact'] < -5000),
+            columns['confidence_score'] < 0.3
+        ])
+        
+        # Few distinct flag combinations occur, so build each action list once
+        patterns, inverse = np.unique(flags, axis=0, return_inverse=True)
+        pattern_actions = [
+            [action for action, flagged in zip(self.REQUIRED_ACTIONS, pattern) if flagged]
+            or ['routine_logging']
+            for pattern in patterns
+        ]
+        
+        return [list(pattern_actions[i]) for i in inverse.ravel()]
     
-    def _calculate_risk_level(self, anomaly_score, compliance_prob):
-        """Calculate overall risk level"""
+    def _calculate_risk_level(self, anomaly_scores, compliance_probs):
+        """Calculate overall risk level for each decision"""
         # Normalize anomaly score (more negative = more anomalous)
-        normalized_anomaly = max(0, -anomaly_score / 2)
+        normalized_anomaly = np.maximum(0, -np.asarray(anomaly_scores) / 2)
         
         # Combine scores
-        combined_risk = (normalized_anomaly + compliance_prob) / 2
-        
-        if combined_risk > 0.8:
-            return 'critical'
-        elif combined_risk > 0.6:
-            return 'high'
-        elif combined_risk > 0.4:
-            return 'medium'
-        else:
-            return 'low'
+        combined_risk = (normalized_anomaly + compliance_probs) / 2
+        
+        return np.select(
+            [combined_risk > 0.8, combined_risk > 0.6, combined_risk > 0.4],
+            ['critical', 'high', 'medium'],
+            default='low'
+        )
     
-    def _generate_batch_summary(self, results):
+    def _generate_batch_summary(self, is_anomaly, is_violation, risk_levels):
         """Generate summary statistics for batch analysis"""
-        total = len(results)
-        anomalies = sum(1 for r in results if r['analysis']['anomaly_detected'])
-        violations = sum(1 for r in results if r['analysis']['compliance_violation'])
+        total = len(risk_levels)
+        anomalies = int(np.count_nonzero(is_anomaly))
+        violations = int(np.count_nonzero(is_violation))
         
-        risk_levels = [r['analysis']['risk_level'] for r in results]
-        risk_distribution = {level: risk_levels.count(level) for level in set(risk_levels)}
+        levels, counts = np.unique(risk_levels, return_counts=True)
+        risk_distribution = dict(zip(levels.tolist(), counts.tolist()))
         
         return {
             'total_decisions': total,
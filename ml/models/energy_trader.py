@@ -14,19 +14,19 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import MLConfig
+
 class EnergyTrader:
-    def __init__(self):
-        self.price_predictor = GradientBoostingRegressor(
-            n_estimators=200,
-            random_state=42,
-            max_depth=8,
-            learning_rate=0.1
-        )
-        self.demand_predictor = RandomForestRegressor(
-            n_estimators=150,
-            random_state=42,
-            max_depth=12
-        )
+    ARTIFACT_SCHEMA = 1
+
+    def __init__(self, config=None):
+        # Per-estimator overrides on top of MLConfig.MODEL_SETTINGS
+        config = {
+            estimator: {**params, **(config or {}).get(estimator, {})}
+            for estimator, params in MLConfig.get_model_config('energy_trader').items()
+        }
+        self.price_predictor = GradientBoostingRegressor(**config['price_predictor'])
+        self.demand_predictor = RandomForestRegressor(**config['demand_predictor'])
         self.scaler = StandardScaler()
         self.is_trained = False
         
@@ -215,52 +215,59 @@ class EnergyTrader:
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
         
-        predictions = []
+        if forecast_hours <= 0:
+            return []
+        
         current_time = datetime.now()
+        future_times = [current_time + timedelta(hours=h) for h in range(forecast_hours)]
+        
+        # Market features are fixed over the horizon; only the calendar columns vary
+        time_features = np.array(
+            [[t.hour, t.weekday(), t.month] for t in future_times], dtype=float
+        ).reshape(forecast_hours, 3)
+        market_features = np.array([
+            market_data.get('grid_demand', 1000),
+            market_data.get('grid_supply', 1100),
+            market_data.get('grid_frequency', 50),
+            market_data.get('temperature', 25),
+            market_data.get('solar_irradiance', 500),
+            market_data.get('wind_speed', 10),
+            market_data.get('station_load', 50),
+            market_data.get('battery_soc', 60),
+            market_data.get('charging_sessions', 4),
+            market_data.get('coal_price', 3000),
+            market_data.get('gas_price', 40),
+            market_data.get('carbon_price', 2000),
+            market_data.get('grid_supply', 1100) / market_data.get('grid_demand', 1000),
+            (market_data.get('solar_irradiance', 500) / 1000 + 
+             market_data.get('wind_speed', 10) / 20) / 2,
+            market_data.get('station_load', 50) / max(market_data.get('charging_sessions', 1), 1)
+        ], dtype=float)
+        
+        features = np.hstack([time_features, np.tile(market_features, (forecast_hours, 1))])
         
-        for h in range(forecast_hours):
-            future_time = current_time + timedelta(hours=h)
-            
-            # Prepare input features
-            features = np.array([[
-                future_time.hour,
-                future_time.weekday(),
-                future_time.month,
-                market_data.get('grid_demand', 1000),
-                market_data.get('grid_supply', 1100),
-                market_data.get('grid_frequency', 50),
-                market_data.get('temperature', 25),
-                market_data.get('solar_irradiance', 500),
-                market_data.get('wind_speed', 10),
-                market_data.get('station_load', 50),
-                market_data.get('battery_soc', 60),
-                market_data.get('charging_sessions', 4),
-                market_data.get('coal_price', 3000),
-                market_data.get('gas_price', 40),
-                market_data.get('carbon_price', 2000),
-                market_data.get('grid_supply', 1100) / market_data.get('grid_demand', 1000),
-                (market_data.get('solar_irradiance', 500) / 1000 + 
-                 market_data.get('wind_speed', 10) / 20) / 2,
-                market_data.get('station_load', 50) / max(market_data.get('charging_sessions', 1), 1)
-            ]])
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Get predictions
-            predicted_price = self.price_predictor.predict(features_scaled)[0]
-            predicted_demand = self.demand_predictor.predict(features_scaled)[0]
-            
-            predictions.append({
+        # Scale features
+        features_scaled = self.scaler.transform(features)
+        
+        # Get predictions for the whole horizon
+        predicted_prices = self.price_predictor.predict(features_scaled)
+        predicted_demand = self.demand_predictor.predict(features_scaled)
+        
+        price_categories = self._categorize_price(predicted_prices).tolist()
+        predicted_prices = np.maximum(predicted_prices, 1.0).tolist()  # Minimum ₹1/kWh
+        predicted_demand = np.maximum(predicted_demand, 0).tolist()
+        
+        return [
+            {
                 'hour_ahead': h,
                 'timestamp': future_time.isoformat(),
-                'predicted_price': max(1.0, float(predicted_price)),  # Minimum ₹1/kWh
-                'predicted_demand': max(0, float(predicted_demand)),
-                'price_category': self._categorize_price(predicted_price),
+                'predicted_price': predicted_prices[h],
+                'predicted_demand': predicted_demand[h],
+                'price_category': price_categories[h],
                 'confidence': 0.85
-            })
-        
-        return predictions
+            }
+            for h, future_time in enumerate(future_times)
+        ]
     
     def optimize_trading_decision(self, market_data, station_data):
         """Optimize energy trading decision"""
@@ -354,18 +361,14 @@ class EnergyTrader:
         else:
             return 0
     
-    def _categorize_price(self, price):
-        """Categorize price level"""
-        if price < 3.5:
-            return 'very_low'
-        elif price < 4.5:
-            return 'low'
-        elif price < 5.5:
-            return 'medium'
-        elif price < 6.5:
-            return 'high'
-        else:
-            return 'very_high'
+    def _categorize_price(self, prices):
+        """Categorize price levels for an array of prices"""
+        prices = np.asarray(prices)
+        return np.select(
+            [prices < 3.5, prices < 4.5, prices < 5.5, prices < 6.5],
+            ['very_low', 'low', 'medium', 'high'],
+            default='very_high'
+        )
     
     def calculate_arbitrage_opportunity(self, station_data, nearby_stations):
         """Calculate arbitrage opportunities with nearby stations"""
@@ -15,18 +15,30 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import MLConfig
+
 class FailurePredictor:
-    def __init__(self):
-        self.anomaly_detector = IsolationForest(
-            contamination=0.1,
-            random_state=42,
-            n_estimators=100
-        )
-        self.failure_classifier = RandomForestClassifier(
-            n_estimators=200,
-            random_state=42,
-            max_depth=10
-        )
+    ARTIFACT_SCHEMA = 1
+    
+    # Values assumed for sensor fields missing from a reading
+    SENSOR_DEFAULTS = {
+        'temperature': 25,
+        'voltage': 220,
+        'current': 30,
+        'vibration': 0.1,
+        'humidity': 45,
+        'uptime': 95,
+        'error_rate': 0.1
+    }
+
+    def __init__(self, config=None):
+        # Per-estimator overrides on top of MLConfig.MODEL_SETTINGS
+        config = {
+            estimator: {**params, **(config or {}).get(estimator, {})}
+            for estimator, params in MLConfig.get_model_config('failure_predictor').items()
+        }
+        self.anomaly_detector = IsolationForest(**config['anomaly_detector'])
+        self.failure_classifier = RandomForestClassifier(**config['failure_classifier'])
         self.scaler = StandardScaler()
         self.is_trained = False
         
@@ -128,70 +140,112 @@ class FailurePredictor:
     
     def predict_failure(self, sensor_data):
         """Predict failure probability and anomaly score"""
+        return self.predict_failure_batch([sensor_data])[0]
+    
+    def predict_failure_batch(self, sensor_batch):
+        """Predict failure probability and anomaly score for many sensor readings
+        
+        Accepts a list of sensor dicts or a DataFrame with one row per
+        charger. Feature derivation, scoring and the action/risk rules all
+        run as array operations, so the scaler and each model are called
+        once per batch instead of once per reading.
+        """
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
         
+        if len(sensor_batch) == 0:
+            return []
+        
         # Prepare input data
-        features = np.array([[
-            sensor_data.get('temperature', 25),
-            sensor_data.get('voltage', 220),
-            sensor_data.get('current', 30),
-            sensor_data.get('vibration', 0.1),
-            sensor_data.get('humidity', 45),
-            sensor_data.get('uptime', 95),
-            sensor_data.get('error_rate', 0.1),
-            sensor_data.get('temperature', 25) / sensor_data.get('voltage', 220),
-            sensor_data.get('voltage', 220) * sensor_data.get('current', 30),
-            sensor_data.get('uptime', 95) / (1 + sensor_data.get('error_rate', 0.1))
-        ]])
+        sensors = self._sensor_columns(sensor_batch)
+        features = np.column_stack([
+            sensors['temperature'],
+            sensors['voltage'],
+            sensors['current'],
+            sensors['vibration'],
+            sensors['humidity'],
+            sensors['uptime'],
+            sensors['error_rate'],
+            sensors['temperature'] / sensors['voltage'],
+            sensors['voltage'] * sensors['current'],
+            sensors['uptime'] / (1 + sensors['error_rate'])
+        ])
         
         # Scale features
         features_scaled = self.scaler.transform(features)
         
-        # Get predictions
-        failure_prob = self.failure_classifier.predict_proba(features_scaled)[0][1]
-        anomaly_score = self.anomaly_detector.decision_function(features_scaled)[0]
-        is_anomaly = self.anomaly_detector.predict(features_scaled)[0] == -1
+        # Get predictions (IsolationForest.predict flags exactly the negative scores)
+        failure_probs = self.failure_classifier.predict_proba(features_scaled)[:, 1]
+        anomaly_scores = self.anomaly_detector.decision_function(features_scaled)
+        anomaly_flags = anomaly_scores < 0
         
-        # Determine action needed
-        action_needed = self._determine_action(failure_prob, is_anomaly, sensor_data)
+        # Determine actions needed
+        actions = self._determine_action(
+            failure_probs, anomaly_flags, sensors['temperature'], sensors['voltage']
+        )
+        risk_levels = self._get_risk_level(failure_probs)
+        confidences = np.maximum(failure_probs, 1 - failure_probs)
         
-        return {
-            'failure_probability': float(failure_prob),
-            'anomaly_score': float(anomaly_score),
-            'is_anomaly': bool(is_anomaly),
-            'risk_level': self._get_risk_level(failure_prob),
-            'recommended_action': action_needed,
-            'confidence': float(max(failure_prob, 1-failure_prob)),
-            'timestamp': datetime.now().isoformat()
-        }
+        timestamp = datetime.now().isoformat()
+        
+        return [
+            {
+                'failure_probability': failure_prob,
+                'anomaly_score': anomaly_score,
+                'is_anomaly': is_anomaly,
+                'risk_level': risk_level,
+                'recommended_action': action,
+                'confidence': confidence,
+                'timestamp': timestamp
+            }
+            for failure_prob, anomaly_score, is_anomaly, risk_level, action, confidence in zip(
+                failure_probs.tolist(), anomaly_scores.tolist(), anomaly_flags.tolist(),
+                risk_levels.tolist(), actions.tolist(), confidences.tolist()
+            )
+        ]
     
-    def _determine_action(self, failure_prob, is_anomaly, sensor_data):
-        """Determine what action the Mechanic Agent should take"""
-        if failure_prob > 0.8 or is_anomaly:
-            if sensor_data.get('temperature', 25) > 60:
-                return 'emergency_shutdown'
-            elif sensor_data.get('voltage', 220) < 180:
-                return 'voltage_stabilization'
+    def _sensor_columns(self, sensor_batch):
+        """Collect sensor readings into float arrays, filling missing values with defaults"""
+        frame = pd.DataFrame(sensor_batch)
+        columns = {}
+        
+        for field, default in self.SENSOR_DEFAULTS.items():
+            if field in frame:
+                columns[field] = frame[field].fillna(default).to_numpy(dtype=float)
             else:
-                return 'preventive_restart'
-        elif failure_prob > 0.6:
-            return 'diagnostic_check'
-        elif failure_prob > 0.4:
-            return 'schedule_maintenance'
-        else:
-            return 'monitor'
+                columns[field] = np.full(len(frame), default, dtype=float)
+        
+        return columns
+    
+    def _determine_action(self, failure_probs, anomaly_flags, temperature, voltage):
+        """Determine what action the Mechanic Agent should take for each reading"""
+        urgent = (failure_probs > 0.8) | anomaly_flags
+        
+        return np.select(
+            [
+                urgent & (temperature > 60),
+                urgent & (voltage < 180),
+                urgent,
+                failure_probs > 0.6,
+                failure_probs > 0.4
+            ],
+            [
+                'emergency_shutdown',
+                'voltage_stabilization',
+                'preventive_restart',
+                'diagnostic_check',
+                'schedule_maintenance'
+            ],
+            default='monitor'
+        )
     
-    def _get_risk_level(self, failure_prob):
-        """Convert failure probability to risk level"""
-        if failure_prob > 0.8:
-            return 'critical'
-        elif failure_prob > 0.6:
-            return 'high'
-        elif failure_prob > 0.4:
-            return 'medium'
-        else:
-            return 'low'
+    def _get_risk_level(self, failure_probs):
+        """Convert failure probabilities to risk levels"""
+        return np.select(
+            [failure_probs > 0.8, failure_probs > 0.6, failure_probs > 0.4],
+            ['critical', 'high', 'medium'],
+            default='low'
+        )
     
     def save_model(self, filepath='models/failure_predictor.pkl'):
         """Save trained model"""
@@ -14,18 +14,19 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import MLConfig
+
 class LogisticsOptimizer:
-    def __init__(self):
-        self.stockout_predictor = GradientBoostingClassifier(
-            n_estimators=200,
-            random_state=42,
-            max_depth=8
-        )
-        self.demand_predictor = RandomForestRegressor(
-            n_estimators=150,
-            random_state=42,
-            max_depth=12
-        )
+    ARTIFACT_SCHEMA = 1
+
+    def __init__(self, config=None):
+        # Per-estimator overrides on top of MLConfig.MODEL_SETTINGS
+        config = {
+            estimator: {**params, **(config or {}).get(estimator, {})}
+            for estimator, params in MLConfig.get_model_config('logistics_optimizer').items()
+        }
+        self.stockout_predictor = GradientBoostingClassifier(**config['stockout_predictor'])
+        self.demand_predictor = RandomForestRegressor(**config['demand_predictor'])
         self.scaler = StandardScaler()
         self.is_trained = False
         
@@ -193,56 +194,77 @@ class LogisticsOptimizer:
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
         
-        predictions = []
+        if forecast_hours <= 0:
+            return []
+        
         current_time = datetime.now()
-        current_inventory = station_data.get('current_inventory', 50)
+        future_times = [current_time + timedelta(hours=h) for h in range(forecast_hours)]
+        hours = np.array([t.hour for t in future_times])
+        
+        # Roll the inventory forward first; consumption does not depend on model output.
+        # Consumption is non-negative, so flooring the running total at zero matches
+        # flooring after every hour.
+        consumption = self._estimate_hourly_consumption(station_data, hours)
+        inventory_after = np.maximum(
+            station_data.get('current_inventory', 50) - np.cumsum(consumption), 0
+        )
+        inventory_before = np.concatenate(
+            [[station_data.get('current_inventory', 50)], inventory_after[:-1]]
+        )
         
-        for h in range(forecast_hours):
-            future_time = current_time + timedelta(hours=h)
-            
-            # Prepare input features
-            features = np.array([[
-                future_time.hour,
-                future_time.weekday(),
-                future_time.month,
-                current_inventory,
-                station_data.get('max_capacity', 100),
-                station_data.get('station_popularity', 0.5),
-                station_data.get('avg_daily_consumption', 25),
-                station_data.get('consumption_trend', 0),
-                station_data.get('weather_impact', 1.0),
-                station_data.get('event_impact', 1.0),
-                station_data.get('supplier_distance', 20),
-                station_data.get('delivery_time', 45),
-                station_data.get('available_vehicles', 3),
-                station_data.get('vehicle_capacity', 50),
-                current_inventory / station_data.get('max_capacity', 100),
-                station_data.get('avg_daily_consumption', 25) / station_data.get('station_popularity', 0.5),
-                station_data.get('vehicle_capacity', 50) / station_data.get('delivery_time', 45)
-            ]])
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Get predictions
-            stockout_prob = self.stockout_predictor.predict_proba(features_scaled)[0][1]
-            optimal_dispatch = max(0, self.demand_predictor.predict(features_scaled)[0])
-            
-            # Update inventory for next iteration (simulate consumption)
-            estimated_consumption = self._estimate_hourly_consumption(station_data, future_time)
-            current_inventory = max(0, current_inventory - estimated_consumption)
-            
-            predictions.append({
+        # Prepare input features, one row per forecast hour
+        max_capacity = station_data.get('max_capacity', 100)
+        station_features = np.array([
+            max_capacity,
+            station_data.get('station_popularity', 0.5),
+            station_data.get('avg_daily_consumption', 25),
+            station_data.get('consumption_trend', 0),
+            station_data.get('weather_impact', 1.0),
+            station_data.get('event_impact', 1.0),
+            station_data.get('supplier_distance', 20),
+            station_data.get('delivery_time', 45),
+            station_data.get('available_vehicles', 3),
+            station_data.get('vehicle_capacity', 50)
+        ], dtype=float)
+        derived_features = np.array([
+            station_data.get('avg_daily_consumption', 25) / station_data.get('station_popularity', 0.5),
+            station_data.get('vehicle_capacity', 50) / station_data.get('delivery_time', 45)
+        ], dtype=float)
+        
+        features = np.column_stack([
+            hours,
+            [t.weekday() for t in future_times],
+            [t.month for t in future_times],
+            inventory_before,
+            np.tile(station_features, (forecast_hours, 1)),
+            inventory_before / max_capacity,
+            np.tile(derived_features, (forecast_hours, 1))
+        ])
+        
+        # Scale features
+        features_scaled = self.scaler.transform(features)
+        
+        # Get predictions for the whole horizon
+        stockout_probs = self.stockout_predictor.predict_proba(features_scaled)[:, 1]
+        optimal_dispatch = np.maximum(self.demand_predictor.predict(features_scaled), 0)
+        risk_levels = self._get_risk_level(stockout_probs).tolist()
+        
+        stockout_probs = stockout_probs.tolist()
+        inventory_after = inventory_after.tolist()
+        optimal_dispatch = optimal_dispatch.tolist()
+        
+        return [
+            {
                 'hour_ahead': h,
                 'timestamp': future_time.isoformat(),
-                'stockout_probability': float(stockout_prob),
-                'estimated_inventory': float(current_inventory),
-                'recommended_dispatch': float(optimal_dispatch),
-                'risk_level': self._get_risk_level(stockout_prob),
+                'stockout_probability': stockout_probs[h],
+                'estimated_inventory': inventory_after[h],
+                'recommended_dispatch': optimal_dispatch[h],
+                'risk_level': risk_levels[h],
                 'confidence': 0.87
-            })
-        
-        return predictions
+            }
+            for h, future_time in enumerate(future_times)
+        ]
     
     def optimize_dispatch_decision(self, station_data, available_vehicles):
         """Optimize dispatch decision based on current conditions"""
@@ -285,17 +307,17 @@ class LogisticsOptimizer:
             'confidence': 0.85
         }
     
-    def _estimate_hourly_consumption(self, station_data, future_time):
-        """Estimate hourly consumption based on time and conditions"""
+    def _estimate_hourly_consumption(self, station_data, hours):
+        """Estimate hourly consumption for an array of hours of day"""
         base_rate = station_data.get('avg_daily_consumption', 25) / 24
         
         # Hour-based multiplier
-        if future_time.hour in [8, 9, 17, 18]:
-            hour_multiplier = 2.0
-        elif future_time.hour in [7, 10, 16, 19]:
-            hour_multiplier = 1.5
-        else:
-            hour_multiplier = 0.8
+        hours = np.asarray(hours)
+        hour_multiplier = np.select(
+            [np.isin(hours, [8, 9, 17, 18]), np.isin(hours, [7, 10, 16, 19])],
+            [2.0, 1.5],
+            default=0.8
+        )
         
         return base_rate * hour_multiplier * station_data.get('weather_impact', 1.0)
     
@@ -355,16 +377,14 @@ class LogisticsOptimizer:
         else:
             return 'low'
     
-    def _get_risk_level(self, probability):
-        """Convert probability to risk level"""
-        if probability > 0.8:
-            return 'critical'
-        elif probability > 0.6:
-            return 'high'
-        elif probability > 0.4:
-            return 'medium'
-        else:
-            return 'low'
+    def _get_risk_level(self, probabilities):
+        """Convert an array of probabilities to risk levels"""
+        probabilities = np.asarray(probabilities)
+        return np.select(
+            [probabilities > 0.8, probabilities > 0.6, probabilities > 0.4],
+            ['critical', 'high', 'medium'],
+            default='low'
+        )
     
     def save_model(self, filepath='models/logistics_optimizer.pkl'):
         """Save trained model"""
@@ -0,0 +1,197 @@
+"""
+Route cache for the Route Optimizer
+Bounded in-memory LRU cache with an optional SQLite tier shared across processes
+"""
+
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+METERS_PER_DEGREE = 111320
+
+class RouteCache:
+    """LRU + TTL route cache keyed on quantized coordinates
+
+    Coordinates are snapped to a grid of precision_m metres, so requests a
+    few metres apart share an entry. The memory tier is bounded by entry
+    count and by the JSON-encoded size of its values. When sqlite_path is
+    set, entries are also written to a SQLite database that survives
+    restarts and is shared by every process using the same file. The
+    SQLite tier has its own lock, so memory lookups never wait on disk,
+    and get_async/set_async run its queries in a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 32 * 1024 * 1024,
+                 ttl_seconds: float = 6 * 3600, precision_m: float = 50,
+                 sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.precision_m = precision_m
+        self.sqlite_path = sqlite_path or None
+        self._open()
+
+    def _open(self):
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        self._db = None
+
+        if self.sqlite_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.sqlite_path)), exist_ok=True)
+            self._db = sqlite3.connect(self.sqlite_path, timeout=5, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS routes '
+                '(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)'
+            )
+            self._db.execute('DELETE FROM routes WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+
+    def __getstate__(self):
+        # Locks and connections cannot cross process boundaries; workers reopen their own
+        return {
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'precision_m': self.precision_m,
+            'sqlite_path': self.sqlite_path
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def make_key(self, start_coords: Tuple[float, float], end_coords: Tuple[float, float],
+                 profile: str = 'driving') -> str:
+        """Build a cache key from coordinates snapped to the quantization grid
+
+        A degree of longitude shrinks with cos(latitude), so longitude cells
+        are widened by the cosine of the snapped latitude to stay
+        precision_m across everywhere.
+        """
+        step = self.precision_m / METERS_PER_DEGREE
+        cells = []
+        for lat, lon in (start_coords, end_coords):
+            lat_cell = round(float(lat) / step)
+            cells += [lat_cell, round(float(lon) * math.cos(math.radians(lat_cell * step)) / step)]
+        return f"{profile}:{cells[0]},{cells[1]};{cells[2]},{cells[3]}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get a cached route, checking memory first and then SQLite"""
+        value = self._memory_get(key)
+        return value if value is not None else self._disk_get(key)
+
+    async def get_async(self, key: str) -> Optional[Dict]:
+        """Get a cached route without blocking the event loop on SQLite"""
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if self._db is None:
+            return self._disk_get(key)  # only records the miss
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def set(self, key: str, value: Dict):
+        """Cache a route in memory and, when enabled, in SQLite"""
+        encoded, expires_at = self._memory_set(key, value)
+        if self._db is not None:
+            self._disk_set(key, encoded, expires_at)
+
+    async def set_async(self, key: str, value: Dict):
+        """Cache a route without blocking the event loop on the SQLite write"""
+        encoded, expires_at = self._memory_set(key, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, encoded, expires_at)
+
+    def clear(self):
+        """Drop all cached routes from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM routes')
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and memory usage"""
+        with self._lock:
+            return {
+                **self._counters,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'precision_m': self.precision_m,
+                'sqlite_path': self.sqlite_path
+            }
+
+    def _memory_get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    # Shallow copy so callers can annotate the route without touching the cache
+                    return dict(entry[2])
+                self._remove(key)
+            return None
+
+    def _disk_get(self, key: str) -> Optional[Dict]:
+        """Look a key up in SQLite after a memory miss, counting the miss if it is not there either"""
+        row = None
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT expires_at, value FROM routes WHERE key = ? AND expires_at > ?',
+                    (key, time.time())
+                ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+            value = json.loads(row[1])
+            self._store(key, value, len(row[1]), row[0])
+            self._counters['disk_hits'] += 1
+            return dict(value)
+
+    def _memory_set(self, key: str, value: Dict) -> Tuple[str, float]:
+        encoded = json.dumps(value)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            if len(encoded) <= self.max_bytes:
+                self._store(key, value, len(encoded), expires_at)
+        return encoded, expires_at
+
+    def _disk_set(self, key: str, encoded: str, expires_at: float):
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO routes (key, expires_at, value) VALUES (?, ?, ?)',
+                (key, expires_at, encoded)
+            )
+            self._db.commit()
+
+    def _store(self, key: str, value: Dict, size: int, expires_at: float):
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._counters['evictions'] += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -3,6 +3,7 @@ Route Optimizer using OpenStreetMap data
 Integrates with Traffic Agent and Logistics Agent for optimal routing
 """
 
+import asyncio
 import numpy as np
 import pandas as pd
 import requests
@@ -10,14 +11,98 @@ import json
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 import math
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .route_cache import RouteCache
+    from .routing_client import OSRMClient, AsyncOSRMClient, gather_limited
+    from .tsp_solver import held_karp, HELD_KARP_MAX_STOPS, nearest_neighbor, improve_path, path_cost, path_lower_bound
+    from .station_index import StationIndex
+except ImportError:
+    from route_cache import RouteCache
+    from routing_client import OSRMClient, AsyncOSRMClient, gather_limited
+    from tsp_solver import held_karp, HELD_KARP_MAX_STOPS, nearest_neighbor, improve_path, path_cost, path_lower_bound
+    from station_index import StationIndex
+
+EARTH_RADIUS_KM = 6371
+
+# Average city speed used when only great-circle distances are available
+FALLBACK_SPEED_KMH = 25
+
+# Fallback alternatives detour sideways by multiples of this fraction of the trip length
+DETOUR_OFFSET_STEP = 0.15
+
+# Leg cost for pairs the router cannot connect, so solvers route around them
+UNREACHABLE_LEG_KM = 1e6
+
+# Rows per block in haversine_matrix, bounding its working memory on large inputs
+MATRIX_BLOCK_ROWS = 1024
+
+def haversine_matrix(sources: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Great-circle distances in kilometers between every source and destination
+
+    Both arguments are (n, 2) arrays of (lat, lon) in degrees; the result
+    is an (n_sources, n_destinations) matrix. The haversine half-angle
+    differences are expanded as sin(a/2)cos(b/2) - cos(a/2)sin(b/2), so
+    sines and cosines are taken once per point and each cell needs only
+    products and a single arcsin, without losing precision near zero.
+    """
+    src = np.radians(np.asarray(sources, dtype=float).reshape(-1, 2))
+    dst = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+    
+    src_sin, src_cos, src_cos_lat = np.sin(src / 2), np.cos(src / 2), np.cos(src[:, 0:1])
+    dst_sin, dst_cos, dst_cos_lat = np.sin(dst / 2), np.cos(dst / 2), np.cos(dst[:, 0])
+    
+    distances = np.empty((src.shape[0], dst.shape[0]))
+    scratch = np.empty((min(src.shape[0], MATRIX_BLOCK_ROWS), dst.shape[0]))
+    lon_term = np.empty_like(scratch)
+    
+    for i in range(0, src.shape[0], MATRIX_BLOCK_ROWS):
+        rows = slice(i, i + MATRIX_BLOCK_ROWS)
+        block = distances[rows]
+        tmp = scratch[:block.shape[0]]
+        lon = lon_term[:block.shape[0]]
+        
+        # sin^2(dlat / 2)
+        np.multiply(src_sin[rows, 0:1], dst_cos[:, 0], out=block)
+        np.multiply(src_cos[rows, 0:1], dst_sin[:, 0], out=tmp)
+        np.subtract(block, tmp, out=block)
+        np.square(block, out=block)
+        
+        # cos(lat1) cos(lat2) sin^2(dlon / 2)
+        np.multiply(src_sin[rows, 1:2], dst_cos[:, 1], out=lon)
+        np.multiply(src_cos[rows, 1:2], dst_sin[:, 1], out=tmp)
+        np.subtract(lon, tmp, out=lon)
+        np.square(lon, out=lon)
+        np.multiply(lon, src_cos_lat[rows], out=lon)
+        np.multiply(lon, dst_cos_lat, out=lon)
+        
+        np.add(block, lon, out=block)
+        np.sqrt(block, out=block)
+        np.minimum(block, 1, out=block)
+        np.arcsin(block, out=block)
+        np.multiply(block, 2 * EARTH_RADIUS_KM, out=block)
+    
+    return distances
+
 class RouteOptimizer:
-    def __init__(self):
-        self.osrm_base_url = "http://router.project-osrm.org"
+    def __init__(self, config=None):
+        config = config or {}
+        self.client = OSRMClient(**config.get('osrm', {}))
+        self.async_client = AsyncOSRMClient(self.client)
+        self.request_concurrency = config.get('request_concurrency', 8)
+        self.osrm_base_url = self.client.base_url
         self.overpass_url = "http://overpass-api.de/api/interpreter"
-        self.cache = {}  # Simple caching for API calls
+        self.cache = RouteCache(**config.get('route_cache', {}))
+        self.tsp_settings = {'exact_max_stops': 15, 'time_budget_ms': 250, **config.get('tsp', {})}
+        # Larger exact solves would allocate gigabytes per request
+        self.tsp_settings['exact_max_stops'] = min(
+            max(int(self.tsp_settings['exact_max_stops']), 0), HELD_KARP_MAX_STOPS
+        )
+        self.station_search = {'max_candidates': 25, 'radius_km': None, **config.get('station_search', {})}
+        self.station_index = None
         
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate haversine distance between two points in kilometers"""
@@ -43,50 +128,64 @@ class RouteOptimizer:
         """Get route from OSRM API"""
         
         # Create cache key
-        cache_key = f"{start_coords}_{end_coords}_{profile}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cache_key = self.cache.make_key(start_coords, end_coords, profile)
+        cached_route = self.cache.get(cache_key)
+        if cached_route is not None:
+            return cached_route
         
         try:
-            # OSRM expects lon,lat format
-            start_lon, start_lat = start_coords[1], start_coords[0]
-            end_lon, end_lat = end_coords[1], end_coords[0]
-            
-            url = f"{self.osrm_base_url}/route/v1/{profile}/{start_lon},{start_lat};{end_lon},{end_lat}"
-            params = {
-                'overview': 'full',
-                'geometries': 'geojson',
-                'steps': 'true'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
+            data = self.client.route(
+                [start_coords, end_coords], profile,
+                overview='full', geometries='geojson', steps='true'
+            )
+            if not data['routes']:
+                return self._fallback_route_calculation(start_coords, end_coords)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data['code'] == 'Ok' and data['routes']:
-                    route = data['routes'][0]
-                    
-                    result = {
-                        'distance_km': route['distance'] / 1000,
-                        'duration_minutes': route['duration'] / 60,
-                        'geometry': route['geometry'],
-                        'steps': route['legs'][0]['steps'] if route['legs'] else [],
-                        'success': True,
-                        'source': 'osrm'
-                    }
-                    
-                    # Cache the result
-                    self.cache[cache_key] = result
-                    return result
+            result = self._summarize_osrm_route(data['routes'][0])
+            self.cache.set(cache_key, result)
+            return dict(result)
             
-            # Fallback to haversine calculation
+        except Exception as e:
+            print(f"OSRM API error: {e}")
             return self._fallback_route_calculation(start_coords, end_coords)
+    
+    async def get_route_osrm_async(self, start_coords: Tuple[float, float],
+                                   end_coords: Tuple[float, float],
+                                   profile: str = "driving") -> Dict:
+        """Get route from OSRM API without blocking the event loop"""
+        
+        cache_key = self.cache.make_key(start_coords, end_coords, profile)
+        cached_route = await self.cache.get_async(cache_key)
+        if cached_route is not None:
+            return cached_route
+        
+        try:
+            data = await self.async_client.route(
+                [start_coords, end_coords], profile,
+                overview='full', geometries='geojson', steps='true'
+            )
+            if not data['routes']:
+                return self._fallback_route_calculation(start_coords, end_coords)
+            
+            result = self._summarize_osrm_route(data['routes'][0])
+            await self.cache.set_async(cache_key, result)
+            return dict(result)
             
         except Exception as e:
             print(f"OSRM API error: {e}")
             return self._fallback_route_calculation(start_coords, end_coords)
     
+    def _summarize_osrm_route(self, route: Dict) -> Dict:
+        """Convert one route of an OSRM response to a route dict"""
+        return {
+            'distance_km': route['distance'] / 1000,
+            'duration_minutes': route['duration'] / 60,
+            'geometry': route['geometry'],
+            'steps': route['legs'][0]['steps'] if route['legs'] else [],
+            'success': True,
+            'source': 'osrm'
+        }
+    
     def _fallback_route_calculation(self, start_coords: Tuple[float, float], 
                                    end_coords: Tuple[float, float]) -> Dict:
         """Fallback route calculation using haversine distance"""
@@ -96,8 +195,8 @@ class RouteOptimizer:
             end_coords[0], end_coords[1]
         )
         
-        # Estimate duration based on average city speed (25 km/h)
-        duration_minutes = (distance_km / 25) * 60
+        # Estimate duration based on average city speed
+        duration_minutes = (distance_km / FALLBACK_SPEED_KMH) * 60
         
         return {
             'distance_km': distance_km,
@@ -108,15 +207,199 @@ class RouteOptimizer:
             'source': 'fallback'
         }
     
+    def get_distance_matrix(self, sources: List[Tuple[float, float]],
+                            destinations: List[Tuple[float, float]],
+                            profile: str = "driving", use_routing: bool = True) -> Dict:
+        """Get distances (km) and durations (minutes) from every source to every destination
+        
+        With use_routing=False, or when OSRM is unavailable, distances are
+        great-circle and durations assume the average city speed.
+        """
+        
+        tables = None
+        if use_routing:
+            try:
+                tables = [
+                    (block, self.client.table(coords, profile, **params))
+                    for block, coords, params in self._table_requests(sources, destinations)
+                ]
+            except Exception as e:
+                print(f"OSRM table error: {e}")
+        
+        return self._assemble_matrix(sources, destinations, tables, use_routing)
+    
+    async def get_distance_matrix_async(self, sources: List[Tuple[float, float]],
+                                        destinations: List[Tuple[float, float]],
+                                        profile: str = "driving", use_routing: bool = True) -> Dict:
+        """Get a distance matrix without blocking the event loop, sending table requests concurrently"""
+        
+        tables = None
+        if use_routing:
+            try:
+                table_requests = self._table_requests(sources, destinations)
+                responses = await gather_limited([
+                    self.async_client.table(coords, profile, **params)
+                    for _, coords, params in table_requests
+                ], self.request_concurrency)
+                tables = [(block, data) for (block, _, _), data in zip(table_requests, responses)]
+            except Exception as e:
+                print(f"OSRM table error: {e}")
+        
+        return self._assemble_matrix(sources, destinations, tables, use_routing)
+    
+    def _table_requests(self, sources: List[Tuple[float, float]],
+                        destinations: List[Tuple[float, float]]) -> List[Tuple]:
+        """Split a matrix into (block, coords, params) OSRM table requests that fit the server's size limit"""
+        
+        sources = [tuple(point) for point in sources]
+        destinations = [tuple(point) for point in destinations]
+        
+        # Split the coordinate budget between sources and destinations
+        limit = max(self.client.max_table_size, 2)
+        source_chunk = min(len(sources), limit // 2) or 1
+        destination_chunk = limit - source_chunk
+        
+        table_requests = []
+        for i in range(0, len(sources), source_chunk):
+            source_block = sources[i:i + source_chunk]
+            for j in range(0, len(destinations), destination_chunk):
+                destination_block = destinations[j:j + destination_chunk]
+                table_requests.append((
+                    np.s_[i:i + len(source_block), j:j + len(destination_block)],
+                    source_block + destination_block,
+                    {
+                        'sources': ';'.join(str(k) for k in range(len(source_block))),
+                        'destinations': ';'.join(
+                            str(len(source_block) + k) for k in range(len(destination_block))
+                        ),
+                        'annotations': 'distance,duration'
+                    }
+                ))
+        
+        return table_requests
+    
+    def _assemble_matrix(self, sources: List[Tuple[float, float]],
+                         destinations: List[Tuple[float, float]],
+                         tables: Optional[List[Tuple]], use_routing: bool) -> Dict:
+        """Build the matrix from OSRM table responses, or great-circle distances without them"""
+        
+        if tables is not None:
+            distances_km = np.full((len(sources), len(destinations)), np.nan)
+            durations_minutes = np.full((len(sources), len(destinations)), np.nan)
+            for block, data in tables:
+                # Unreachable pairs come back as null, which becomes NaN
+                distances_km[block] = np.array(data['distances'], dtype=float) / 1000
+                durations_minutes[block] = np.array(data['durations'], dtype=float) / 60
+            source = 'osrm'
+        else:
+            distances_km = haversine_matrix(sources, destinations)
+            durations_minutes = distances_km * (60 / FALLBACK_SPEED_KMH)
+            source = 'fallback' if use_routing else 'great_circle'
+        
+        return {
+            'distances_km': distances_km,
+            'durations_minutes': durations_minutes,
+            'source': source
+        }
+    
+    def load_station_catalog(self, stations: List[Dict]):
+        """Index the station catalog used when requests do not list stations"""
+        self.station_index = StationIndex(stations)
+    
+    def find_nearby_stations(self, location: Tuple[float, float], k: Optional[int] = None,
+                             radius_km: Optional[float] = None) -> List[Dict]:
+        """Get catalog stations nearest first, with their great-circle distance"""
+        if self.station_index is None:
+            return []
+        
+        return [
+            {**station, 'straight_line_km': distance_km}
+            for station, distance_km in self.station_index.query(location, k, radius_km)
+        ]
+    
     def find_optimal_station(self, user_location: Tuple[float, float],
-                           stations: List[Dict],
+                           stations: Optional[List[Dict]] = None,
                            preferences: Dict = None) -> Dict:
-        """Find optimal charging station based on multiple criteria"""
+        """Find optimal charging station based on multiple criteria
+        
+        Only the max_candidates stations nearest to the user (optionally
+        within radius_km) are routed and scored. Without a station list,
+        candidates come from the loaded catalog.
+        """
+        
+        selection = self._select_station_candidates(user_location, stations, preferences or {})
+        if 'error' in selection:
+            return selection
+        
+        # One matrix lookup for every candidate instead of a full route per station
+        coords = [point for _, point in selection['candidates']]
+        matrix = self.get_distance_matrix([user_location], coords)
+        result, winner = self._rank_stations(selection['candidates'], matrix, preferences or {})
+        
+        if winner is not None:
+            # Only the winner needs turn-by-turn geometry
+            result['optimal_station']['route'] = self.get_route_osrm(user_location, coords[winner])
+        return result
+    
+    async def find_optimal_station_async(self, user_location: Tuple[float, float],
+                                         stations: Optional[List[Dict]] = None,
+                                         preferences: Dict = None) -> Dict:
+        """Find optimal charging station without blocking the event loop"""
+        
+        selection = self._select_station_candidates(user_location, stations, preferences or {})
+        if 'error' in selection:
+            return selection
+        
+        coords = [point for _, point in selection['candidates']]
+        matrix = await self.get_distance_matrix_async([user_location], coords)
+        result, winner = self._rank_stations(selection['candidates'], matrix, preferences or {})
+        
+        if winner is not None:
+            result['optimal_station']['route'] = await self.get_route_osrm_async(user_location, coords[winner])
+        return result
+    
+    def _select_station_candidates(self, user_location: Tuple[float, float],
+                                   stations: Optional[List[Dict]], preferences: Dict) -> Dict:
+        """Get (station, coords) candidates nearest to the user, or an error"""
+        
+        max_candidates = max(int(preferences.get('max_candidates', self.station_search['max_candidates'])), 1)
+        radius_km = preferences.get('radius_km', self.station_search['radius_km'])
+        
+        if stations is None and self.station_index is not None:
+            stations = [
+                station for station, _ in self.station_index.query(user_location, max_candidates, radius_km)
+            ]
         
         if not stations:
             return {'error': 'No stations provided'}
         
-        preferences = preferences or {}
+        candidates = []
+        for station in stations:
+            try:
+                candidates.append((station, (float(station['latitude']), float(station['longitude']))))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Error processing station {station.get('station_id')}: {e}")
+        
+        if not candidates:
+            return {'error': 'No valid stations found'}
+        
+        # Prune to the nearest candidates by straight-line distance before routing
+        if len(candidates) > max_candidates or radius_km:
+            straight_line_km = haversine_matrix([user_location], [coords for _, coords in candidates])[0]
+            keep = np.flatnonzero(straight_line_km <= radius_km) if radius_km else np.arange(len(candidates))
+            if len(keep) > max_candidates:
+                keep = keep[np.argpartition(straight_line_km[keep], max_candidates - 1)[:max_candidates]]
+            # Request order is kept so equal scores rank as before
+            candidates = [candidates[i] for i in np.sort(keep).tolist()]
+            
+            if not candidates:
+                return {'error': 'No valid stations found'}
+        
+        return {'candidates': candidates}
+    
+    def _rank_stations(self, candidates: List[Tuple[Dict, Tuple[float, float]]],
+                       matrix: Dict, preferences: Dict) -> Tuple[Dict, Optional[int]]:
+        """Score candidates from their matrix row; returns the result and the winner's index"""
         
         # Weight factors
         distance_weight = preferences.get('distance_weight', 0.4)
@@ -124,200 +407,195 @@ class RouteOptimizer:
         price_weight = preferences.get('price_weight', 0.2)
         rating_weight = preferences.get('rating_weight', 0.1)
         
-        station_scores = []
+        distances_km = matrix['distances_km'][0]
+        durations_minutes = matrix['durations_minutes'][0]
+        
+        queue_length = np.array([station.get('queue_length', 0) for station, _ in candidates], dtype=float)
+        price_per_kwh = np.array([station.get('price_per_kwh', 5) for station, _ in candidates], dtype=float)
+        rating = np.array([station.get('rating', 3) for station, _ in candidates], dtype=float)
+        
+        # Calculate individual scores (0-1, lower is better)
+        distance_scores = np.minimum(distances_km / 50, 1.0)  # Normalize to 50km max
+        queue_scores = np.minimum(queue_length / 20, 1.0)  # Normalize to 20 cars max
+        price_scores = np.minimum(price_per_kwh / 10, 1.0)  # Normalize to ₹10/kWh max
+        rating_scores = 1 - rating / 5  # Invert rating (5 stars = 0 score)
+        
+        # Calculate weighted total score
+        total_scores = (
+            distance_scores * distance_weight +
+            queue_scores * queue_weight +
+            price_scores * price_weight +
+            rating_scores * rating_weight
+        )
         
-        for station in stations:
-            try:
-                # Get route to station
-                station_coords = (station['latitude'], station['longitude'])
-                route = self.get_route_osrm(user_location, station_coords)
-                
-                if not route['success']:
-                    continue
-                
-                # Calculate individual scores (0-1, lower is better)
-                distance_score = min(route['distance_km'] / 50, 1.0)  # Normalize to 50km max
-                queue_score = min(station.get('queue_length', 0) / 20, 1.0)  # Normalize to 20 cars max
-                price_score = min(station.get('price_per_kwh', 5) / 10, 1.0)  # Normalize to ₹10/kWh max
-                rating_score = 1 - (station.get('rating', 3) / 5)  # Invert rating (5 stars = 0 score)
-                
-                # Calculate weighted total score
-                total_score = (
-                    distance_score * distance_weight +
-                    queue_score * queue_weight +
-                    price_score * price_weight +
-                    rating_score * rating_weight
-                )
-                
-                station_info = {
-                    'station_id': station.get('station_id'),
-                    'name': station.get('name'),
-                    'distance_km': route['distance_km'],
-                    'duration_minutes': route['duration_minutes'],
-                    'queue_length': station.get('queue_length', 0),
-                    'price_per_kwh': station.get('price_per_kwh', 5),
-                    'rating': station.get('rating', 3),
-                    'total_score': total_score,
-                    'route': route,
-                    'scores': {
-                        'distance': distance_score,
-                        'queue': queue_score,
-                        'price': price_score,
-                        'rating': rating_score
-                    }
+        # Stations the router cannot reach have no distance and are skipped
+        reachable = np.flatnonzero(~np.isnan(total_scores))
+        ranked = reachable[np.argsort(total_scores[reachable], kind='stable')]
+        
+        station_scores = []
+        for i in ranked[:5].tolist():
+            station = candidates[i][0]
+            station_scores.append({
+                'station_id': station.get('station_id'),
+                'name': station.get('name'),
+                'distance_km': float(distances_km[i]),
+                'duration_minutes': float(durations_minutes[i]),
+                'queue_length': station.get('queue_length', 0),
+                'price_per_kwh': station.get('price_per_kwh', 5),
+                'rating': station.get('rating', 3),
+                'total_score': float(total_scores[i]),
+                'route': {
+                    'distance_km': float(distances_km[i]),
+                    'duration_minutes': float(durations_minutes[i]),
+                    'geometry': None,
+                    'steps': [],
+                    'success': True,
+                    'source': matrix['source']
+                },
+                'scores': {
+                    'distance': float(distance_scores[i]),
+                    'queue': float(queue_scores[i]),
+                    'price': float(price_scores[i]),
+                    'rating': float(rating_scores[i])
                 }
-                
-                station_scores.append(station_info)
-                
-            except Exception as e:
-                print(f"Error processing station {station.get('station_id')}: {e}")
-                continue
+            })
         
         if not station_scores:
-            return {'error': 'No valid stations found'}
-        
-        # Sort by total score (lower is better)
-        station_scores.sort(key=lambda x: x['total_score'])
+            return {'error': 'No valid stations found'}, None
         
         return {
             'optimal_station': station_scores[0],
             'alternatives': station_scores[1:5],  # Top 5 alternatives
-            'total_stations_evaluated': len(station_scores)
-        }
+            'total_stations_evaluated': len(ranked)
+        }, int(ranked[0])
     
     def optimize_multi_stop_route(self, start_location: Tuple[float, float],
                                  stops: List[Tuple[float, float]],
                                  end_location: Tuple[float, float] = None) -> Dict:
-        """Optimize route for multiple stops (Traveling Salesman Problem)"""
+        """Optimize route for multiple stops (Traveling Salesman Problem)
+        
+        Legs are looked up once as a matrix. Up to exact_max_stops stops are
+        solved exactly with Held-Karp; larger instances start from nearest
+        neighbour and improve with 2-opt/Or-opt until time_budget_ms runs out.
+        """
         
         if not stops:
             return {'error': 'No stops provided'}
         
-        # If no end location, return to start
-        if end_location is None:
-            end_location = start_location
-        
-        # For small number of stops, use brute force
-        if len(stops) <= 8:
-            return self._brute_force_tsp(start_location, stops, end_location)
-        else:
-            return self._nearest_neighbor_tsp(start_location, stops, end_location)
+        points = self._multi_stop_points(start_location, stops, end_location)
+        started = time.perf_counter()
+        matrix = self.get_distance_matrix(points, points)
+        return self._solve_multi_stop(points, matrix, (time.perf_counter() - started) * 1000)
     
-    def _brute_force_tsp(self, start: Tuple[float, float], 
-                        stops: List[Tuple[float, float]],
-                        end: Tuple[float, float]) -> Dict:
-        """Brute force solution for small TSP instances"""
+    async def optimize_multi_stop_route_async(self, start_location: Tuple[float, float],
+                                              stops: List[Tuple[float, float]],
+                                              end_location: Tuple[float, float] = None) -> Dict:
+        """Optimize a multi-stop route without blocking the event loop"""
         
-        from itertools import permutations
+        if not stops:
+            return {'error': 'No stops provided'}
         
-        best_distance = float('inf')
-        best_route = None
-        best_duration = 0
+        points = self._multi_stop_points(start_location, stops, end_location)
+        started = time.perf_counter()
+        matrix = await self.get_distance_matrix_async(points, points)
         
-        # Try all permutations of stops
-        for perm in permutations(stops):
-            total_distance = 0
-            total_duration = 0
-            route_segments = []
-            
-            # Start to first stop
-            current_location = start
-            for next_location in list(perm) + [end]:
-                route = self.get_route_osrm(current_location, next_location)
-                if route['success']:
-                    total_distance += route['distance_km']
-                    total_duration += route['duration_minutes']
-                    route_segments.append({
-                        'from': current_location,
-                        'to': next_location,
-                        'distance_km': route['distance_km'],
-                        'duration_minutes': route['duration_minutes']
-                    })
-                    current_location = next_location
-                else:
-                    total_distance = float('inf')
-                    break
-            
-            if total_distance < best_distance:
-                best_distance = total_distance
-                best_duration = total_duration
-                best_route = {
-                    'stops_order': list(perm),
-                    'segments': route_segments,
-                    'total_distance_km': total_distance,
-                    'total_duration_minutes': total_duration
-                }
+        # Solving is CPU-bound, so it runs in a worker thread
+        return await asyncio.to_thread(
+            self._solve_multi_stop, points, matrix, (time.perf_counter() - started) * 1000
+        )
+    
+    def _multi_stop_points(self, start_location: Tuple[float, float],
+                           stops: List[Tuple[float, float]],
+                           end_location: Optional[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        """Matrix points in solver order: start, stops, end"""
         
-        return {
-            'optimized_route': best_route,
-            'method': 'brute_force',
-            'stops_count': len(stops)
-        }
+        # If no end location, return to start
+        if end_location is None:
+            end_location = start_location
+        
+        return [tuple(start_location), *[tuple(stop) for stop in stops], tuple(end_location)]
     
-    def _nearest_neighbor_tsp(self, start: Tuple[float, float],
-                             stops: List[Tuple[float, float]],
-                             end: Tuple[float, float]) -> Dict:
-        """Nearest neighbor heuristic for larger TSP instances"""
-        
-        unvisited = stops.copy()
-        route_order = []
-        current_location = start
-        total_distance = 0
-        total_duration = 0
-        route_segments = []
-        
-        # Visit nearest unvisited stop
-        while unvisited:
-            nearest_stop = None
-            nearest_distance = float('inf')
-            nearest_route = None
-            
-            for stop in unvisited:
-                route = self.get_route_osrm(current_location, stop)
-                if route['success'] and route['distance_km'] < nearest_distance:
-                    nearest_distance = route['distance_km']
-                    nearest_stop = stop
-                    nearest_route = route
-            
-            if nearest_stop is None:
-                break
-            
-            # Move to nearest stop
-            route_order.append(nearest_stop)
-            unvisited.remove(nearest_stop)
-            total_distance += nearest_route['distance_km']
-            total_duration += nearest_route['duration_minutes']
-            route_segments.append({
-                'from': current_location,
-                'to': nearest_stop,
-                'distance_km': nearest_route['distance_km'],
-                'duration_minutes': nearest_route['duration_minutes']
-            })
-            current_location = nearest_stop
-        
-        # Return to end location
-        final_route = self.get_route_osrm(current_location, end)
-        if final_route['success']:
-            total_distance += final_route['distance_km']
-            total_duration += final_route['duration_minutes']
-            route_segments.append({
-                'from': current_location,
-                'to': end,
-                'distance_km': final_route['distance_km'],
-                'duration_minutes': final_route['duration_minutes']
-            })
+    def _solve_multi_stop(self, points: List[Tuple[float, float]], matrix: Dict, matrix_ms: float) -> Dict:
+        """Order the stops from the leg matrix and describe the resulting route"""
+        
+        stops_count = len(points) - 2
+        distances_km, durations_minutes, unreachable = self._estimate_unreachable_legs(points, matrix)
+        # Solvers see unreachable legs at a prohibitive cost so they route around them
+        distances = np.where(unreachable, UNREACHABLE_LEG_KM, distances_km)
+        
+        started = time.perf_counter()
+        if stops_count <= self.tsp_settings['exact_max_stops']:
+            method = 'held_karp'
+            order = held_karp(distances)
+            initial_distance = None
+        else:
+            method = 'nearest_neighbor_2opt'
+            deadline = started + self.tsp_settings['time_budget_ms'] / 1000
+            initial = nearest_neighbor(distances)
+            initial_distance = path_cost(distances_km, initial)
+            order = improve_path(distances, initial, deadline)
+        solve_ms = (time.perf_counter() - started) * 1000
+        
+        route = [0, *order, len(points) - 1]
+        route_segments = [
+            {
+                'from': points[a],
+                'to': points[b],
+                'distance_km': float(distances_km[a, b]),
+                'duration_minutes': float(durations_minutes[a, b]),
+                'source': 'fallback' if unreachable[a, b] else matrix['source']
+            }
+            for a, b in zip(route, route[1:])
+        ]
+        
+        total_distance = sum(segment['distance_km'] for segment in route_segments)
+        lower_bound = path_lower_bound(distances_km)
+        if method == 'held_karp' or not total_distance:
+            max_gap = 0.0
+        else:
+            max_gap = (total_distance - lower_bound) / total_distance
         
         return {
             'optimized_route': {
-                'stops_order': route_order,
+                'stops_order': [points[i] for i in order],
+                'stop_indices': [i - 1 for i in order],
                 'segments': route_segments,
                 'total_distance_km': total_distance,
-                'total_duration_minutes': total_duration
+                'total_duration_minutes': sum(segment['duration_minutes'] for segment in route_segments)
+            },
+            'method': method,
+            'stops_count': stops_count,
+            'quality': {
+                'optimal': method == 'held_karp',
+                'initial_distance_km': initial_distance,
+                'lower_bound_km': lower_bound,
+                # How far the route can be from optimal, measured against the lower bound
+                'max_optimality_gap': round(max_gap, 4)
             },
-            'method': 'nearest_neighbor',
-            'stops_count': len(stops)
+            'timing': {
+                'matrix_ms': round(matrix_ms, 2),
+                'solve_ms': round(solve_ms, 2),
+                'matrix_source': matrix['source']
+            }
         }
     
+    def _estimate_unreachable_legs(self, points: List[Tuple[float, float]],
+                                   matrix: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Leg distances and durations with unreachable (NaN) legs estimated from great-circle distance
+        
+        Returns the filled distance and duration matrices and the mask of
+        legs that were estimated.
+        """
+        
+        distances_km, durations_minutes = matrix['distances_km'], matrix['durations_minutes']
+        unreachable = np.isnan(distances_km) | np.isnan(durations_minutes)
+        if unreachable.any():
+            estimated_km = haversine_matrix(points, points)
+            distances_km = np.where(unreachable, estimated_km, distances_km)
+            durations_minutes = np.where(unreachable, estimated_km * (60 / FALLBACK_SPEED_KMH), durations_minutes)
+        
+        return distances_km, durations_minutes, unreachable
+    
     def get_traffic_conditions(self, route_coords: List[Tuple[float, float]]) -> Dict:
         """Get traffic conditions along a route (mock implementation)"""
         
@@ -467,49 +745,131 @@ class RouteOptimizer:
     
     def get_alternative_routes(self, start_coords: Tuple[float, float],
                               end_coords: Tuple[float, float],
-                              num_alternatives: int = 3) -> List[Dict]:
-        """Get alternative routes between two points"""
+                              num_alternatives: int = 3,
+                              profile: str = "driving") -> List[Dict]:
+        """Get alternative routes between two points from a single OSRM request"""
         
-        routes = []
+        cache_key = self._alternatives_cache_key(start_coords, end_coords, num_alternatives, profile)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return [dict(route) for route in cached['routes']]
         
-        # Get primary route
-        primary_route = self.get_route_osrm(start_coords, end_coords)
-        if primary_route['success']:
-            primary_route['route_type'] = 'primary'
-            primary_route['route_id'] = 1
-            routes.append(primary_route)
+        try:
+            data = self.client.route(
+                [start_coords, end_coords], profile,
+                **self._alternatives_params(num_alternatives)
+            )
+            if not data['routes']:
+                return self._fallback_alternatives(start_coords, end_coords, num_alternatives)
+            
+            routes = self._summarize_alternatives(data, num_alternatives)
+            self.cache.set(cache_key, {'routes': routes})
+            return [dict(route) for route in routes]
+            
+        except Exception as e:
+            print(f"OSRM API error: {e}")
+            return self._fallback_alternatives(start_coords, end_coords, num_alternatives)
+    
+    async def get_alternative_routes_async(self, start_coords: Tuple[float, float],
+                                           end_coords: Tuple[float, float],
+                                           num_alternatives: int = 3,
+                                           profile: str = "driving") -> List[Dict]:
+        """Get alternative routes without blocking the event loop"""
         
-        # Generate alternative routes by adding waypoints
-        for i in range(num_alternatives - 1):
-            try:
-                # Create intermediate waypoint
-                lat_offset = np.random.uniform(-0.01, 0.01)
-                lon_offset = np.random.uniform(-0.01, 0.01)
-                
-                mid_lat = (start_coords[0] + end_coords[0]) / 2 + lat_offset
-                mid_lon = (start_coords[1] + end_coords[1]) / 2 + lon_offset
-                waypoint = (mid_lat, mid_lon)
-                
-                # Route via waypoint
-                route1 = self.get_route_osrm(start_coords, waypoint)
-                route2 = self.get_route_osrm(waypoint, end_coords)
-                
-                if route1['success'] and route2['success']:
-                    alternative_route = {
-                        'distance_km': route1['distance_km'] + route2['distance_km'],
-                        'duration_minutes': route1['duration_minutes'] + route2['duration_minutes'],
-                        'route_type': 'alternative',
-                        'route_id': i + 2,
-                        'waypoint': waypoint,
-                        'segments': [route1, route2],
-                        'success': True,
-                        'source': 'generated'
-                    }
-                    routes.append(alternative_route)
-                    
-            except Exception as e:
-                print(f"Error generating alternative route {i+1}: {e}")
-                continue
+        cache_key = self._alternatives_cache_key(start_coords, end_coords, num_alternatives, profile)
+        cached = await self.cache.get_async(cache_key)
+        if cached is not None:
+            return [dict(route) for route in cached['routes']]
+        
+        try:
+            data = await self.async_client.route(
+                [start_coords, end_coords], profile,
+                **self._alternatives_params(num_alternatives)
+            )
+            if not data['routes']:
+                return self._fallback_alternatives(start_coords, end_coords, num_alternatives)
+            
+            routes = self._summarize_alternatives(data, num_alternatives)
+            await self.cache.set_async(cache_key, {'routes': routes})
+            return [dict(route) for route in routes]
+            
+        except Exception as e:
+            print(f"OSRM API error: {e}")
+            return self._fallback_alternatives(start_coords, end_coords, num_alternatives)
+    
+    def _alternatives_cache_key(self, start_coords: Tuple[float, float],
+                                end_coords: Tuple[float, float],
+                                num_alternatives: int, profile: str) -> str:
+        """Cache key for a set of alternatives, distinct from single-route keys"""
+        return self.cache.make_key(start_coords, end_coords, f"{profile}:alternatives:{num_alternatives}")
+    
+    def _alternatives_params(self, num_alternatives: int) -> Dict:
+        """OSRM route parameters for the primary route plus num_alternatives - 1 alternatives"""
+        return {
+            'alternatives': num_alternatives - 1 if num_alternatives > 1 else 'false',
+            'overview': 'full',
+            'geometries': 'geojson',
+            'steps': 'true'
+        }
+    
+    def _summarize_alternatives(self, data: Dict, num_alternatives: int) -> List[Dict]:
+        """Convert an OSRM response with alternatives to route dicts"""
+        routes = []
+        for i, route in enumerate(data['routes'][:max(num_alternatives, 1)]):
+            routes.append({
+                **self._summarize_osrm_route(route),
+                'route_type': 'primary' if i == 0 else 'alternative',
+                'route_id': i + 1
+            })
+        
+        return routes
+    
+    def _fallback_alternatives(self, start_coords: Tuple[float, float],
+                               end_coords: Tuple[float, float],
+                               num_alternatives: int) -> List[Dict]:
+        """Deterministic detours for when only great-circle distances are available
+        
+        Each alternative goes through a waypoint offset sideways from the
+        midpoint by a growing fraction of the trip length, alternating sides.
+        """
+        
+        primary_route = self._fallback_route_calculation(start_coords, end_coords)
+        routes = [{**primary_route, 'route_type': 'primary', 'route_id': 1}]
+        
+        count = max(num_alternatives, 1) - 1
+        if count == 0:
+            return routes
+        
+        # Perpendicular to the trip in a local plane where a degree of longitude is cos(lat) degrees
+        start_lat, start_lon = start_coords
+        end_lat, end_lon = end_coords
+        mid_lat, mid_lon = (start_lat + end_lat) / 2, (start_lon + end_lon) / 2
+        lon_scale = max(math.cos(math.radians(mid_lat)), 1e-6)
+        d_lat, d_lon = end_lat - start_lat, (end_lon - start_lon) * lon_scale
+        
+        steps = np.arange(1, count + 1)
+        offsets = DETOUR_OFFSET_STEP * ((steps + 1) // 2) * np.where(steps % 2, 1, -1)
+        waypoints = np.column_stack([mid_lat + offsets * d_lon, mid_lon - offsets * d_lat / lon_scale])
+        
+        first_legs = haversine_matrix([start_coords], waypoints)[0]
+        second_legs = haversine_matrix(waypoints, [end_coords])[:, 0]
+        distances_km = first_legs + second_legs
+        
+        for i, (waypoint, distance_km) in enumerate(zip(waypoints.tolist(), distances_km.tolist())):
+            routes.append({
+                'distance_km': distance_km,
+                'duration_minutes': distance_km / FALLBACK_SPEED_KMH * 60,
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[start_lon, start_lat], waypoint[::-1], [end_lon, end_lat]]
+                },
+                'steps': [],
+                'waypoint': tuple(waypoint),
+                'route_type': 'alternative',
+                'route_id': i + 2,
+                'success': True,
+                'source': 'fallback'
+            })
         
         return routes
 
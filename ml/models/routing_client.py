@@ -0,0 +1,229 @@
+"""
+OSRM routing client for the Route Optimizer
+Pooled keep-alive HTTP connections with bounded, jittered retries, sync and async
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # The async client falls back to running the sync client in a thread
+    httpx = None
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class RoutingError(Exception):
+    """Raised when OSRM cannot produce a result after all retries"""
+
+def _osrm_path(service: str, profile: str, coords: List[Tuple[float, float]]) -> str:
+    # OSRM expects lon,lat pairs
+    points = ';'.join(f"{lon},{lat}" for lat, lon in coords)
+    return f"/{service}/v1/{profile}/{points}"
+
+def _parse_response(status_code: int, data: Optional[Dict]) -> Dict:
+    if status_code != 200:
+        raise RoutingError(f"OSRM returned HTTP {status_code}")
+    if not data or data.get('code') != 'Ok':
+        raise RoutingError(f"OSRM error: {(data or {}).get('code', 'empty response')}")
+    return data
+
+async def gather_limited(calls: List[Awaitable], limit: int) -> List[Any]:
+    """Await calls with at most limit running at once, in order
+
+    The first failure cancels the calls still pending and is re-raised.
+    """
+    slots = asyncio.Semaphore(max(limit, 1))
+
+    async def run(call):
+        try:
+            async with slots:
+                return await call
+        finally:
+            # Calls cancelled before they started would otherwise warn that they were never awaited
+            if asyncio.iscoroutine(call):
+                call.close()
+
+    tasks = [asyncio.ensure_future(run(call)) for call in calls]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+class OSRMClient:
+    """Synchronous OSRM client over a pooled requests session
+
+    Connection errors, connect timeouts and retryable status codes are
+    retried up to max_retries times with full-jitter exponential backoff.
+    Read timeouts and other failures raise RoutingError immediately, so a
+    slow server costs one timeout rather than one per attempt. max_table_size is the most
+    coordinates the server accepts in one table request (OSRM's
+    --max-table-size, 100 by default).
+    """
+
+    def __init__(self, base_url: str = "http://router.project-osrm.org", timeout: float = 10,
+                 max_retries: int = 2, backoff_seconds: float = 0.2, backoff_max: float = 2.0,
+                 pool_size: int = 16, max_table_size: int = 100):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.max_table_size = max_table_size
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+        self._session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_session']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._session = self._create_session()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before the given retry attempt (1-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_seconds * 2 ** (attempt - 1)))
+
+    def request(self, service: str, coords: List[Tuple[float, float]], profile: str = 'driving',
+                params: Optional[Dict] = None) -> Dict:
+        """Call an OSRM service (route, table, ...) for (lat, lon) coordinates"""
+        url = self.base_url + _osrm_path(service, profile, coords)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                time.sleep(self.backoff(attempt))
+
+            self.stats['requests'] += 1
+            try:
+                response = self._session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = RoutingError(f"OSRM request failed: {e}")
+                if isinstance(e, requests.ReadTimeout):
+                    break
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES:
+                last_error = RoutingError(f"OSRM returned HTTP {response.status_code}")
+                continue
+
+            try:
+                return _parse_response(response.status_code, response.json())
+            except ValueError as e:
+                raise RoutingError(f"Invalid OSRM response: {e}")
+
+        self.stats['failures'] += 1
+        raise last_error
+
+    def route(self, coords: List[Tuple[float, float]], profile: str = 'driving', **params) -> Dict:
+        """Get OSRM routes through the given (lat, lon) coordinates"""
+        return self.request('route', coords, profile, params)
+
+    def table(self, coords: List[Tuple[float, float]], profile: str = 'driving', **params) -> Dict:
+        """Get an OSRM duration/distance table between the given (lat, lon) coordinates"""
+        return self.request('table', coords, profile, params)
+
+    def close(self):
+        """Close pooled connections"""
+        self._session.close()
+
+class AsyncOSRMClient:
+    """Asyncio OSRM client with the same retry policy as OSRMClient
+
+    Uses a pooled httpx.AsyncClient when httpx is installed; otherwise each
+    call runs the synchronous client in a worker thread.
+    """
+
+    def __init__(self, sync_client: OSRMClient):
+        self.sync_client = sync_client
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.sync_client.base_url,
+                timeout=self.sync_client.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.sync_client.pool_size,
+                    max_keepalive_connections=self.sync_client.pool_size
+                )
+            )
+        return self._client
+
+    def __getstate__(self):
+        return {'sync_client': self.sync_client, '_client': None}
+
+    def open(self):
+        """Create the HTTP client up front; building its TLS context takes a noticeable pause"""
+        if httpx is not None:
+            self._get_client()
+
+    async def request(self, service: str, coords: List[Tuple[float, float]], profile: str = 'driving',
+                      params: Optional[Dict] = None) -> Dict:
+        """Call an OSRM service without blocking the event loop"""
+        if httpx is None:
+            return await asyncio.to_thread(self.sync_client.request, service, coords, profile, params)
+
+        client = self._get_client()
+        stats = self.sync_client.stats
+        path = _osrm_path(service, profile, coords)
+        last_error = None
+
+        for attempt in range(self.sync_client.max_retries + 1):
+            if attempt:
+                stats['retries'] += 1
+                await asyncio.sleep(self.sync_client.backoff(attempt))
+
+            stats['requests'] += 1
+            try:
+                response = await client.get(path, params=params)
+            except httpx.TransportError as e:
+                last_error = RoutingError(f"OSRM request failed: {e}")
+                if isinstance(e, httpx.TimeoutException) and not isinstance(e, httpx.ConnectTimeout):
+                    break
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES:
+                last_error = RoutingError(f"OSRM returned HTTP {response.status_code}")
+                continue
+
+            try:
+                return _parse_response(response.status_code, response.json())
+            except ValueError as e:
+                raise RoutingError(f"Invalid OSRM response: {e}")
+
+        stats['failures'] += 1
+        raise last_error
+
+    async def route(self, coords: List[Tuple[float, float]], profile: str = 'driving', **params) -> Dict:
+        """Get OSRM routes through the given (lat, lon) coordinates"""
+        return await self.request('route', coords, profile, params)
+
+    async def table(self, coords: List[Tuple[float, float]], profile: str = 'driving', **params) -> Dict:
+        """Get an OSRM duration/distance table between the given (lat, lon) coordinates"""
+        return await self.request('table', coords, profile, params)
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
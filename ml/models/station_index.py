@@ -0,0 +1,63 @@
+"""
+Station spatial index for the Route Optimizer
+BallTree over station coordinates for k-nearest and radius candidate lookups
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371
+
+class StationIndex:
+    """Great-circle nearest-neighbour index over a station catalog
+
+    Queries cost O(log n), so candidate lookup stays flat as the network
+    grows. Stations without usable coordinates are left out.
+    """
+
+    def __init__(self, stations: List[Dict]):
+        self.stations = []
+        coords = []
+        for station in stations:
+            try:
+                point = (float(station['latitude']), float(station['longitude']))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if np.isfinite(point).all():
+                self.stations.append(station)
+                coords.append(point)
+
+        self._tree = BallTree(np.radians(coords), metric='haversine') if coords else None
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def query(self, location: Tuple[float, float], k: Optional[int] = None,
+              radius_km: Optional[float] = None) -> List[Tuple[Dict, float]]:
+        """Get (station, great-circle km) pairs nearest first
+
+        Returns the k nearest stations, only those within radius_km, or
+        the k nearest within radius_km when both are given. An empty
+        catalog or k=0 finds nothing.
+        """
+        if k is None and radius_km is None:
+            raise ValueError("Query needs k or radius_km")
+        if self._tree is None or k == 0:
+            return []
+
+        point = np.radians([location])
+        if radius_km:
+            indices, distances = self._tree.query_radius(
+                point, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+            )
+            indices, distances = indices[0][:k], distances[0][:k]
+        else:
+            distances, indices = self._tree.query(point, k=min(k, len(self.stations)))
+            indices, distances = indices[0], distances[0]
+
+        return [
+            (self.stations[i], distance * EARTH_RADIUS_KM)
+            for i, distance in zip(indices.tolist(), distances.tolist())
+        ]
@@ -14,18 +14,19 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import MLConfig
+
 class TrafficOptimizer:
-    def __init__(self):
-        self.demand_predictor = RandomForestRegressor(
-            n_estimators=200,
-            random_state=42,
-            max_depth=15
-        )
-        self.wait_time_predictor = GradientBoostingRegressor(
-            n_estimators=150,
-            random_state=42,
-            max_depth=8
-        )
+    ARTIFACT_SCHEMA = 1
+
+    def __init__(self, config=None):
+        # Per-estimator overrides on top of MLConfig.MODEL_SETTINGS
+        config = {
+            estimator: {**params, **(config or {}).get(estimator, {})}
+            for estimator, params in MLConfig.get_model_config('traffic_optimizer').items()
+        }
+        self.demand_predictor = RandomForestRegressor(**config['demand_predictor'])
+        self.wait_time_predictor = GradientBoostingRegressor(**config['wait_time_predictor'])
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.is_trained = False
@@ -205,54 +206,89 @@ class TrafficOptimizer:
     
     def predict_traffic(self, station_data, forecast_hours=4):
         """Predict traffic demand and wait times"""
+        return self.predict_traffic_batch([station_data], forecast_hours)[0]
+    
+    def predict_traffic_batch(self, stations, forecast_hours=4):
+        """Predict traffic for several stations over the whole horizon in one model call each"""
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
         
-        predictions = []
+        if not stations or forecast_hours <= 0:
+            return [[] for _ in stations]
+        
         current_time = datetime.now()
+        future_times = [current_time + timedelta(hours=h) for h in range(forecast_hours)]
         
-        for h in range(forecast_hours):
-            future_time = current_time + timedelta(hours=h)
-            
-            # Prepare input features
-            features = np.array([[
-                future_time.hour,
-                future_time.weekday(),
-                future_time.month,
-                self.label_encoders['weather'].transform([station_data.get('weather', 'sunny')])[0],
-                station_data.get('temperature', 25),
-                station_data.get('station_capacity', 8),
-                self.label_encoders['station_type'].transform([station_data.get('station_type', 'standard')])[0],
-                station_data.get('is_highway', 0),
-                station_data.get('is_mall', 0),
-                station_data.get('is_office', 0),
-                station_data.get('is_holiday', 0),
-                station_data.get('nearby_event', 0)
-            ]])
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Get predictions
-            predicted_demand = self.demand_predictor.predict(features_scaled)[0]
-            predicted_wait = self.wait_time_predictor.predict(features_scaled)[0]
-            
-            predictions.append({
-                'hour_ahead': h,
-                'timestamp': future_time.isoformat(),
-                'predicted_demand': max(0, float(predicted_demand)),
-                'predicted_wait_time': max(0, float(predicted_wait)),
-                'confidence': self._calculate_confidence(features_scaled)
-            })
+        features = self._build_forecast_features(stations, future_times)
+        features_scaled = self.scaler.transform(features)
+        
+        # Rows are station-major: forecast_hours consecutive rows per station
+        predicted_demand = np.maximum(self.demand_predictor.predict(features_scaled), 0).tolist()
+        predicted_wait = np.maximum(self.wait_time_predictor.predict(features_scaled), 0).tolist()
+        confidence = self._calculate_confidence(features_scaled)
+        timestamps = [future_time.isoformat() for future_time in future_times]
+        
+        predictions = []
+        for s in range(len(stations)):
+            offset = s * forecast_hours
+            predictions.append([
+                {
+                    'hour_ahead': h,
+                    'timestamp': timestamps[h],
+                    'predicted_demand': predicted_demand[offset + h],
+                    'predicted_wait_time': predicted_wait[offset + h],
+                    'confidence': confidence
+                }
+                for h in range(forecast_hours)
+            ])
         
         return predictions
     
+    def _build_forecast_features(self, stations, future_times):
+        """Build the feature matrix for every (station, forecast hour) pair"""
+        n_hours = len(future_times)
+        
+        # Calendar columns are shared by every station
+        time_features = np.array(
+            [[t.hour, t.weekday(), t.month] for t in future_times], dtype=float
+        ).reshape(n_hours, 3)
+        
+        # Encode each station's categoricals once for all stations, not once per hour
+        weather = self.label_encoders['weather'].transform(
+            [station.get('weather', 'sunny') for station in stations]
+        )
+        station_type = self.label_encoders['station_type'].transform(
+            [station.get('station_type', 'standard') for station in stations]
+        )
+        station_features = np.array([
+            [
+                weather[i],
+                station.get('temperature', 25),
+                station.get('station_capacity', 8),
+                station_type[i],
+                station.get('is_highway', 0),
+                station.get('is_mall', 0),
+                station.get('is_office', 0),
+                station.get('is_holiday', 0),
+                station.get('nearby_event', 0)
+            ]
+            for i, station in enumerate(stations)
+        ], dtype=float).reshape(len(stations), 9)
+        
+        return np.hstack([
+            np.tile(time_features, (len(stations), 1)),
+            np.repeat(station_features, n_hours, axis=0)
+        ])
+    
     def calculate_optimal_incentive(self, current_station, alternative_station, user_profile=None):
         """Calculate optimal incentive to move user to alternative station"""
         
         # Get current predictions for both stations
-        current_pred = self.predict_traffic(current_station, forecast_hours=1)[0]
-        alt_pred = self.predict_traffic(alternative_station, forecast_hours=1)[0]
+        current_forecast, alt_forecast = self.predict_traffic_batch(
+            [current_station, alternative_station], forecast_hours=1
+        )
+        current_pred = current_forecast[0]
+        alt_pred = alt_forecast[0]
         
         # Calculate time savings
         time_saved = current_pred['predicted_wait_time'] - alt_pred['predicted_wait_time']
@@ -0,0 +1,164 @@
+"""
+Multi-stop route solvers for the Route Optimizer
+Exact Held-Karp for small instances, nearest neighbour with 2-opt/Or-opt above that
+"""
+
+import time
+from typing import List
+
+import numpy as np
+
+# Or-opt moves chains of up to this many consecutive stops
+OR_OPT_MAX_CHAIN = 3
+
+# Improvements smaller than this are rounding noise
+EPSILON = 1e-9
+
+# Held-Karp tables hold 2^n * n entries (about 50 MB at 18 stops, doubling per stop)
+HELD_KARP_MAX_STOPS = 18
+
+# Every solver works on an (n + 2, n + 2) cost matrix over
+# [start, stop_1 .. stop_n, end] and returns stop indices 1..n in visiting
+# order. The matrix may be asymmetric, as road networks usually are.
+
+def path_cost(cost: np.ndarray, order: List[int]) -> float:
+    """Total cost of start -> stops in order -> end"""
+    route = [0, *order, cost.shape[0] - 1]
+    return float(cost[route[:-1], route[1:]].sum())
+
+def path_lower_bound(cost: np.ndarray) -> float:
+    """Lower bound on any path's cost
+
+    Every stop and the end are entered exactly once and the start and
+    every stop are left exactly once, so the cheapest incoming (or
+    outgoing) edge of each node bounds the total from below.
+    """
+    n = cost.shape[0] - 2
+
+    incoming = cost[:n + 1, 1:].copy()
+    incoming[np.arange(1, n + 1), np.arange(n)] = np.inf
+    outgoing = cost[:n + 1, 1:].copy()
+    outgoing[np.arange(1, n + 1), np.arange(n)] = np.inf
+    if n:
+        # The start only connects straight to the end when there are no stops
+        incoming[0, n] = outgoing[0, n] = np.inf
+
+    return float(max(incoming.min(axis=0).sum(), outgoing.min(axis=1).sum()))
+
+def held_karp(cost: np.ndarray) -> List[int]:
+    """Optimal stop order by dynamic programming over subsets, O(2^n n^2)
+
+    best[mask, j] is the cheapest way to leave the start, visit exactly
+    the stops in mask and finish at stop j. Each subset size is filled
+    in one vectorized step per final stop.
+    """
+    n = cost.shape[0] - 2
+    if n == 0:
+        return []
+
+    stops = np.arange(n)
+    masks = np.arange(1 << n)
+    members = ((masks[:, None] >> stops) & 1).astype(bool)
+    sizes = members.sum(axis=1)
+    legs = cost[1:n + 1, 1:n + 1]
+
+    best = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int8)
+    best[1 << stops, stops] = cost[0, 1:n + 1]
+
+    for size in range(2, n + 1):
+        layer = masks[sizes == size]
+        for j in range(n):
+            targets = layer[members[layer, j]]
+            # best[previous, j] is inf because j is not in previous, so no masking is needed
+            candidates = best[targets ^ (1 << j)] + legs[:, j]
+            choice = candidates.argmin(axis=1)
+            best[targets, j] = candidates[np.arange(len(targets)), choice]
+            parent[targets, j] = choice
+
+    mask = (1 << n) - 1
+    last = int(np.argmin(best[mask] + cost[1:n + 1, n + 1]))
+    order = []
+    while last >= 0:
+        order.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+
+    return order[::-1]
+
+def nearest_neighbor(cost: np.ndarray) -> List[int]:
+    """Greedy stop order that always drives to the closest unvisited stop"""
+    n = cost.shape[0] - 2
+    unvisited = np.ones(n + 2, dtype=bool)
+    unvisited[[0, n + 1]] = False
+
+    order = []
+    current = 0
+    for _ in range(n):
+        current = int(np.argmin(np.where(unvisited, cost[current], np.inf)))
+        unvisited[current] = False
+        order.append(current)
+
+    return order
+
+def improve_path(cost: np.ndarray, order: List[int], deadline: float) -> List[int]:
+    """Apply 2-opt and Or-opt moves until no move helps or time.perf_counter() passes deadline"""
+    route = np.array([0, *order, cost.shape[0] - 1])
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = _two_opt_pass(cost, route, deadline)
+        improved = _or_opt_pass(cost, route, deadline) or improved
+
+    return route[1:-1].tolist()
+
+def _two_opt_pass(cost: np.ndarray, route: np.ndarray, deadline: float) -> bool:
+    """Reverse the best segment starting at each position, in place"""
+    improved = False
+
+    for i in range(1, len(route) - 2):
+        if time.perf_counter() >= deadline:
+            break
+
+        # Prefix sums of the legs in both directions price reversed segments exactly
+        forward = np.concatenate([[0], np.cumsum(cost[route[:-1], route[1:]])])
+        backward = np.concatenate([[0], np.cumsum(cost[route[1:], route[:-1]])])
+
+        k = np.arange(i + 1, len(route) - 1)
+        before, first, last, after = route[i - 1], route[i], route[k], route[k + 1]
+        delta = (
+            cost[before, last] + cost[first, after] - cost[before, first] - cost[last, after] +
+            (backward[k] - backward[i]) - (forward[k] - forward[i])
+        )
+
+        best = int(np.argmin(delta))
+        if delta[best] < -EPSILON:
+            end = k[best] + 1
+            route[i:end] = route[i:end][::-1].copy()
+            improved = True
+
+    return improved
+
+def _or_opt_pass(cost: np.ndarray, route: np.ndarray, deadline: float) -> bool:
+    """Move chains of consecutive stops to their cheapest position, in place"""
+    improved = False
+
+    for length in range(1, OR_OPT_MAX_CHAIN + 1):
+        for i in range(1, len(route) - length):
+            if time.perf_counter() >= deadline:
+                return improved
+
+            chain = route[i:i + length].copy()
+            before, after = route[i - 1], route[i + length]
+            removal_gain = cost[before, chain[0]] + cost[chain[-1], after] - cost[before, after]
+
+            rest = np.concatenate([route[:i], route[i + length:]])
+            insertion_cost = cost[rest[:-1], chain[0]] + cost[chain[-1], rest[1:]] - cost[rest[:-1], rest[1:]]
+
+            j = int(np.argmin(insertion_cost))
+            if insertion_cost[j] < removal_gain - EPSILON:
+                route[:] = np.concatenate([rest[:j + 1], chain, rest[j + 1:]])
+                improved = True
+
+    return improved
@@ -0,0 +1,126 @@
+"""
+Response cache for EV Copilot ML Service
+Bounded LRU + TTL cache for forecast responses keyed on normalized inputs
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import MLConfig
+
+def make_cache_key(namespace: str, payload: Any, *extra: Any) -> str:
+    """Hash a request payload into a cache key
+
+    The payload (a Pydantic model or dict) is serialized with sorted keys,
+    so field order does not matter. The current hour bucket is included
+    because forecasts are anchored to the hour they are made in.
+    """
+    if hasattr(payload, 'dict'):
+        payload = payload.dict()
+
+    normalized = json.dumps(
+        [namespace, payload, extra, datetime.now().strftime('%Y-%m-%dT%H')],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+class ResponseCache:
+    """In-memory LRU cache with a time-to-live and an approximate memory cap
+
+    Entry sizes are estimated from their JSON encoding. Meant to be used
+    from the event loop; concurrent misses for the same key share one
+    computation.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        settings = MLConfig.CACHE_SETTINGS
+        self.max_entries = max_entries or settings['max_entries']
+        self.max_bytes = max_bytes or settings['max_bytes']
+        self.ttl_seconds = ttl_seconds or settings['ttl_seconds']
+
+        # key -> (expires_at, size, value), least recently used first
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None when missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters['misses'] += 1
+            return None
+
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self._counters['expirations'] += 1
+            self._counters['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._counters['hits'] += 1
+        return entry[2]
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting least recently used entries to stay within bounds"""
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counters['evictions'] += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.ensure_future(compute())
+        self._inflight[key] = future
+        try:
+            value = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current usage"""
+        lookups = self._counters['hits'] + self._counters['misses']
+        return {
+            **self._counters,
+            'hit_rate': round(self._counters['hits'] / lookups, 3) if lookups else 0,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Routing client benchmark for EV Copilot ML Service
+Compares per-call connections, the pooled client and the async client
+against the local OSRM stub, with and without injected failures
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+# Add parent and models directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'models'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from osrm_stub import start_stub_server
+from routing_client import OSRMClient, AsyncOSRMClient, RoutingError
+
+def random_legs(n: int, seed: int = 7):
+    """Random (start, end) pairs around Bengaluru"""
+    rng = random.Random(seed)
+    point = lambda: (12.9 + rng.uniform(-0.2, 0.2), 77.6 + rng.uniform(-0.2, 0.2))
+    return [(point(), point()) for _ in range(n)]
+
+def run_unpooled(base_url: str, legs):
+    """One new connection per call, as get_route_osrm used to do"""
+    ok = 0
+    for (lat1, lon1), (lat2, lon2) in legs:
+        try:
+            response = requests.get(
+                f"{base_url}/route/v1/driving/{lon1},{lat1};{lon2},{lat2}",
+                params={'overview': 'full', 'geometries': 'geojson', 'steps': 'true'},
+                timeout=10
+            )
+            ok += response.status_code == 200
+        except requests.RequestException:
+            pass
+    return ok
+
+def run_pooled(client: OSRMClient, legs):
+    ok = 0
+    for start, end in legs:
+        try:
+            client.route([start, end], overview='full', geometries='geojson', steps='true')
+            ok += 1
+        except RoutingError:
+            pass
+    return ok
+
+async def run_async(client: AsyncOSRMClient, legs, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(start, end):
+        async with slots:
+            try:
+                await client.route([start, end], overview='full', geometries='geojson', steps='true')
+                return 1
+            except RoutingError:
+                return 0
+
+    results = await asyncio.gather(*[one(start, end) for start, end in legs])
+    await client.close()
+    return sum(results)
+
+def report(name: str, calls: int, ok: int, elapsed: float, stats=None):
+    line = f"{name:<28} {calls / elapsed:>9.1f} calls/s   {ok}/{calls} ok"
+    if stats:
+        line += f"   retries={stats['retries']} failures={stats['failures']}"
+    print(line)
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark OSRM routing clients against the local stub")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--failure-rate", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    legs = random_legs(args.calls)
+
+    for failure_rate in (0.0, args.failure_rate):
+        server, base_url = start_stub_server(latency_ms=args.latency_ms, failure_rate=failure_rate)
+        print(f"\nStub latency {args.latency_ms}ms, failure rate {failure_rate:.0%}, {args.calls} calls")
+
+        started = time.perf_counter()
+        ok = run_unpooled(base_url, legs)
+        report("requests.get per call", args.calls, ok, time.perf_counter() - started)
+
+        client = OSRMClient(base_url, max_retries=2, backoff_seconds=0.01)
+        started = time.perf_counter()
+        ok = run_pooled(client, legs)
+        report("pooled OSRMClient", args.calls, ok, time.perf_counter() - started, client.stats)
+
+        client = OSRMClient(base_url, max_retries=2, backoff_seconds=0.01, pool_size=args.concurrency)
+        started = time.perf_counter()
+        ok = asyncio.run(run_async(AsyncOSRMClient(client), legs, args.concurrency))
+        report(f"AsyncOSRMClient x{args.concurrency}", args.calls, ok, time.perf_counter() - started, client.stats)
+
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
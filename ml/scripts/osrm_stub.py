@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Stand-in OSRM server for EV Copilot ML Service
+Serves OSRM-shaped route and table responses from great-circle distances so
+routing can be exercised and benchmarked offline
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Road distance is longer than the great-circle distance; speed in km/h
+DETOUR_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 40
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometers"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+class OSRMStubHandler(BaseHTTPRequestHandler):
+    """Handle /route/v1 and /table/v1 requests"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, so pooled clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        settings = self.server.settings
+        if settings['latency_ms']:
+            time.sleep(settings['latency_ms'] / 1000)
+
+        with self.server.lock:
+            self.server.stats['requests'] += 1
+            fail = self.server.random.random() < settings['failure_rate']
+            if fail:
+                self.server.stats['failures'] += 1
+
+        if fail:
+            self._send(503, {'code': 'ServiceUnavailable'})
+            return
+
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 4 or parts[1] != 'v1':
+            self._send(400, {'code': 'InvalidUrl'})
+            return
+
+        try:
+            coords = [tuple(map(float, pair.split(','))) for pair in parts[3].split(';')]
+        except ValueError:
+            self._send(400, {'code': 'InvalidQuery'})
+            return
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if parts[0] == 'route':
+            self._send(200, self._route(coords, query))
+        elif parts[0] == 'table':
+            self._send(200, self._table(coords, query))
+        else:
+            self._send(400, {'code': 'InvalidService'})
+
+    def _route(self, coords, query):
+        alternatives = query.get('alternatives', 'false')
+        count = 1 + (1 if alternatives == 'true' else 0 if alternatives == 'false' else int(alternatives))
+
+        routes = []
+        for rank in range(count):
+            # Each alternative is 10% longer than the one before it
+            factor = DETOUR_FACTOR * 1.1 ** rank
+            legs = []
+            for (lon1, lat1), (lon2, lat2) in zip(coords, coords[1:]):
+                distance = haversine_km(lat1, lon1, lat2, lon2) * factor * 1000
+                legs.append({
+                    'distance': distance,
+                    'duration': distance / (AVERAGE_SPEED_KMH / 3.6),
+                    'steps': []
+                })
+            routes.append({
+                'distance': sum(leg['distance'] for leg in legs),
+                'duration': sum(leg['duration'] for leg in legs),
+                'geometry': {'type': 'LineString', 'coordinates': [list(c) for c in coords]},
+                'legs': legs
+            })
+
+        return {
+            'code': 'Ok',
+            'routes': routes,
+            'waypoints': [{'location': list(c)} for c in coords]
+        }
+
+    def _table(self, coords, query):
+        def indices(name):
+            value = query.get(name, 'all')
+            return list(range(len(coords))) if value == 'all' else [int(i) for i in value.split(';')]
+
+        sources, destinations = indices('sources'), indices('destinations')
+        distances = [
+            [
+                haversine_km(coords[s][1], coords[s][0], coords[d][1], coords[d][0]) * DETOUR_FACTOR * 1000
+                for d in destinations
+            ]
+            for s in sources
+        ]
+
+        response = {'code': 'Ok', 'durations': [
+            [distance / (AVERAGE_SPEED_KMH / 3.6) for distance in row] for row in distances
+        ]}
+        if 'distance' in query.get('annotations', 'duration'):
+            response['distances'] = distances
+        return response
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(port: int = 0, latency_ms: float = 0, failure_rate: float = 0,
+                      seed: int = 42):
+    """Start the stub in a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), OSRMStubHandler)
+    server.daemon_threads = True
+    server.settings = {'latency_ms': latency_ms, 'failure_rate': failure_rate}
+    server.stats = {'requests': 0, 'failures': 0}
+    server.lock = threading.Lock()
+    server.random = random.Random(seed)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main():
+    """Run the stub server in the foreground"""
+    parser = argparse.ArgumentParser(description="Stand-in OSRM server")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added delay per request")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, args.latency_ms, args.failure_rate)
+    print(f"OSRM stub listening on {base_url} (set OSRM_BASE_URL to use it)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,21 @@ class MLSetup:
         
         return True
     
+    def train_models(self):
+        """Train all ML models in parallel and register them"""
+        logger.info("🏋️ Training ML models...")
+        
+        try:
+            subprocess.run([
+                sys.executable, str(self.root_dir / "training.py")
+            ], check=True, cwd=self.root_dir)
+            logger.info("✅ Models trained successfully")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"❌ Model training failed: {e}")
+            return False
+        
+        return True
+    
     def test_models(self):
         """Test all ML models"""
         logger.info("🧪 Testing ML models...")
@@ -121,6 +136,7 @@ class MLSetup:
             ("Create Directories", self.create_directories),
             ("Install Dependencies", self.install_dependencies),
             ("Generate Datasets", self.generate_datasets),
+            ("Train Models", self.train_models),
             ("Test Models", self.test_models)
         ]
         
@@ -143,7 +159,7 @@ def main():
     """Main setup function"""
     parser = argparse.ArgumentParser(description="EV Copilot ML Service Setup")
     parser.add_argument("--step", choices=[
-        "deps", "datasets", "test", "dirs", "env", "all"
+        "deps", "datasets", "train", "test", "dirs", "env", "all"
     ], default="all", help="Run specific setup step")
     
     args = parser.parse_args()
@@ -153,6 +169,8 @@ def main():
         setup.install_dependencies()
     elif args.step == "datasets":
         setup.generate_datasets()
+    elif args.step == "train":
+        setup.train_models()
     elif args.step == "test":
         setup.test_models()
     elif args.step == "dirs":
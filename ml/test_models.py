@@ -5,20 +5,42 @@ Run this to test the complete ML pipeline
 
 import sys
 import os
+import asyncio
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
 sys.path.append(os.path.join(os.path.dirname(__file__), 'models'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
 from failure_predictor import FailurePredictor
 from traffic_optimizer import TrafficOptimizer
 from logistics_optimizer import LogisticsOptimizer
 from energy_trader import EnergyTrader
 from audit_analyzer import AuditAnalyzer
-from route_optimizer import RouteOptimizer
+from route_optimizer import RouteOptimizer, haversine_matrix
+from route_cache import RouteCache
+from tsp_solver import held_karp, path_cost, path_lower_bound, HELD_KARP_MAX_STOPS
+from routing_client import OSRMClient, AsyncOSRMClient, RoutingError
+from osrm_stub import start_stub_server
+from model_registry import ModelRegistry
+from inference import InferenceExecutor, MicroBatcher, run_with_deadlines
+from training import TrainingJobManager
+from response_cache import ResponseCache, make_cache_key
+import generate_datasets
+from generate_datasets import EVCopilotDatasetGenerator
+from utils import DataProcessor
 from datetime import datetime
 
 def test_failure_predictor():
     """Test Mechanic Agent ML model"""
     print("🔧 Testing Failure Predictor (Mechanic Agent)...")
     
+    # Partial configs override only the parameters they name
+    tuned = FailurePredictor({'failure_classifier': {'max_depth': 4}}).failure_classifier.get_params()
+    assert tuned['max_depth'] == 4 and tuned['n_estimators'] == 200
+    
     predictor = FailurePredictor()
     metrics = predictor.train()
     
@@ -300,6 +322,675 @@ def test_route_optimizer():
     
     return True
 
+def test_model_registry():
+    """Test saving and reloading versioned model artifacts"""
+    print("\n🗄️ Testing Model Registry...")
+    
+    with tempfile.TemporaryDirectory() as models_dir:
+        registry = ModelRegistry(models_dir, max_versions=2)
+        
+        predictor = FailurePredictor()
+        assert registry.load_latest('failure_predictor', predictor) is None
+        
+        predictor.train(predictor.generate_training_data(2000))
+        versions = [registry.save('failure_predictor', predictor) for _ in range(3)]
+        assert registry.list_versions('failure_predictor') == versions[:0:-1]
+        
+        restored = FailurePredictor()
+        metadata = registry.load_latest('failure_predictor', restored)
+        assert metadata['version'] == versions[-1]
+        
+        sensor_data = {'temperature': 75, 'voltage': 170, 'current': 50}
+        expected = predictor.predict_failure(sensor_data)['failure_probability']
+        assert restored.predict_failure(sensor_data)['failure_probability'] == expected
+        print(f"✅ Restored version {metadata['version']} with identical predictions")
+        
+        # Artifacts for a different model class are never loaded
+        assert registry.load_latest('failure_predictor', AuditAnalyzer()) is None
+    
+    return True
+
+def test_failure_micro_batching():
+    """Test that micro-batched failure predictions match single predictions"""
+    print("\n📦 Testing Failure Prediction Micro-Batching...")
+    
+    predictor = FailurePredictor()
+    predictor.train(predictor.generate_training_data(2000))
+    
+    readings = [
+        {'temperature': 20 + i * 3, 'voltage': 240 - i * 4, 'current': 30 + i, 'error_rate': i * 0.2}
+        for i in range(20)
+    ]
+    
+    async def run_batch(sensor_batch):
+        return predictor.predict_failure_batch(sensor_batch)
+    
+    async def predict_concurrently():
+        batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*[batcher.submit(reading) for reading in readings])
+        await batcher.close()
+        return results, batcher.stats
+    
+    results, stats = asyncio.run(predict_concurrently())
+    
+    for reading, result in zip(readings, results):
+        expected = predictor.predict_failure(reading)
+        assert result['failure_probability'] == expected['failure_probability']
+        assert result['recommended_action'] == expected['recommended_action']
+    
+    assert stats['items'] == len(readings) and stats['max_batch_seen'] == 8
+    
+    async def slow_batch(items):
+        await asyncio.sleep(0.05)
+        return items
+    
+    async def short_batch(items):
+        return items[:-1]
+    
+    async def shut_down():
+        # Closing fails the batch still being collected and waits for the one already running
+        batcher = MicroBatcher(slow_batch, max_batch_size=2, max_wait_ms=1000)
+        running = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0.01)
+        collecting = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(batcher.close(), 1)
+        
+        # A batch function that returns too few results fails every caller in the batch
+        short = MicroBatcher(short_batch, max_batch_size=2, max_wait_ms=1000)
+        shortened = await asyncio.gather(short.submit('a'), short.submit('b'), return_exceptions=True)
+        await short.close()
+        return [task.result() for task in running], collecting.exception(), shortened
+    
+    finished, closed_error, shortened = asyncio.run(shut_down())
+    assert finished == [0, 1]
+    assert isinstance(closed_error, RuntimeError)
+    assert all(isinstance(result, RuntimeError) for result in shortened)
+    
+    print(f"✅ {stats['items']} requests served in {stats['batches']} batches")
+    
+    return True
+
+def test_inference_executor():
+    """Test per-endpoint pools, pending-call backpressure and worker model reloads"""
+    print("\n🧵 Testing Inference Executor...")
+    
+    executor = InferenceExecutor({
+        'thread_workers': 4,
+        'process_workers': 1,
+        'max_pending': 2,
+        'default_executor': 'thread',
+        'endpoint_executors': {'/failure/predict-batch': 'process'}
+    })
+    readings = [{'temperature': 75, 'voltage': 170, 'error_rate': 3}, {'temperature': 25}]
+    running = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+    
+    def slow_call():
+        with lock:
+            running['now'] += 1
+            running['max'] = max(running['max'], running['now'])
+        time.sleep(0.05)
+        with lock:
+            running['now'] -= 1
+    
+    with tempfile.TemporaryDirectory() as models_dir:
+        registry = ModelRegistry(models_dir)
+        first = FailurePredictor()
+        first.train(first.generate_training_data(2000))
+        first_path = registry.artifact_path('failure_predictor', registry.save('failure_predictor', first))
+        
+        async def run():
+            try:
+                thread_name = await executor.run('/traffic/predict', lambda: threading.current_thread().name)
+                process_id = await executor.run('/failure/predict-batch', os.getpid)
+                
+                # Four free threads, but only max_pending calls are let through at once
+                await asyncio.gather(*[executor.run('/traffic/predict', slow_call) for _ in range(6)])
+                
+                before = await executor.run_model(
+                    '/failure/predict-batch', first, 'predict_failure_batch', readings, artifact_path=first_path
+                )
+                
+                # A new registry version is loaded by the worker that cached the previous one
+                second = FailurePredictor({
+                    'anomaly_detector': {'contamination': 0.3, 'random_state': 1},
+                    'failure_classifier': {'n_estimators': 5, 'max_depth': 2, 'random_state': 1}
+                })
+                second.train(second.generate_training_data(500))
+                second_path = registry.artifact_path(
+                    'failure_predictor', registry.save('failure_predictor', second)
+                )
+                after = await executor.run_model(
+                    '/failure/predict-batch', first, 'predict_failure_batch', readings, artifact_path=second_path
+                )
+                return thread_name, process_id, before, after, second
+            finally:
+                executor.shutdown()
+        
+        thread_name, process_id, before, after, second = asyncio.run(run())
+    
+    assert thread_name.startswith('inference') and process_id != os.getpid()
+    assert running['max'] == 2
+    scores = lambda results: [(r['failure_probability'], r['anomaly_score']) for r in results]
+    assert scores(before) == scores(first.predict_failure_batch(readings))
+    assert scores(after) == scores(second.predict_failure_batch(readings)) != scores(before)
+    
+    print(f"✅ Inference executor: thread {thread_name}, process {process_id}, "
+          f"{running['max']} calls in flight at most, reloaded on a new version")
+    return True
+
+def test_agent_deadlines():
+    """Test that a slow or failing agent is reported without holding back the others"""
+    print("\n⏱️ Testing Agent Deadlines...")
+    
+    executor = InferenceExecutor({
+        'thread_workers': 4,
+        'process_workers': 1,
+        'max_pending': 8,
+        'default_executor': 'thread',
+        'endpoint_executors': {}
+    })
+    
+    def failing_agent():
+        raise ValueError("sensor feed unavailable")
+    
+    async def analyze():
+        try:
+            calls = {
+                'traffic': executor.run('/agents/comprehensive-analysis', lambda: {'demand': 12}),
+                'energy': executor.run('/agents/comprehensive-analysis', time.sleep, 1),
+                'mechanic': executor.run('/agents/comprehensive-analysis', failing_agent)
+            }
+            started = time.perf_counter()
+            outcome = await run_with_deadlines(calls, {'energy': 0.1}, 0.5)
+            return outcome, time.perf_counter() - started
+        finally:
+            executor.shutdown()
+    
+    (results, status), elapsed = asyncio.run(analyze())
+    
+    assert status == {'traffic': 'ok', 'energy': 'timeout', 'mechanic': 'error'}
+    assert results['traffic'] == {'demand': 12}
+    assert results['energy'] == {'status': 'timeout', 'deadline_seconds': 0.1}
+    assert results['mechanic'] == {'status': 'error', 'error': 'sensor feed unavailable'}
+    assert elapsed < 0.5
+    
+    print(f"✅ Agent deadlines: {status} in {elapsed * 1000:.0f} ms")
+    return True
+
+def test_background_retraining():
+    """Test that a retraining job publishes a new model instance"""
+    print("\n🔁 Testing Background Retraining...")
+    
+    with tempfile.TemporaryDirectory() as models_dir:
+        registry = ModelRegistry(models_dir, max_versions=2)
+        published = {}
+        
+        def on_complete(model_name, model, metadata):
+            published[model_name] = (model, metadata)
+        
+        async def retrain():
+            manager = TrainingJobManager(
+                registry, on_complete, {'workers': 1, 'niceness': 0, 'max_jobs': 10}
+            )
+            job = manager.submit('failure', FailurePredictor, 'failure_predictor')
+            assert manager.active_job('failure')['job_id'] == job['job_id']
+            
+            while manager.get(job['job_id'])['status'] in ('queued', 'running'):
+                await asyncio.sleep(0.1)
+            
+            manager.shutdown()
+            return manager.get(job['job_id'])
+        
+        job = asyncio.run(retrain())
+        assert job['status'] == 'completed', job['error']
+        
+        model, metadata = published['failure']
+        assert model.is_trained and metadata['version'] == job['version']
+        assert registry.list_versions('failure_predictor') == [job['version']]
+        
+        prediction = model.predict_failure({'temperature': 75, 'voltage': 170, 'error_rate': 3})
+        print(f"✅ Job {job['status']}, version {job['version']}, risk {prediction['risk_level']}")
+    
+    return True
+
+def test_response_cache():
+    """Test LRU, TTL and memory bounds of the forecast response cache"""
+    print("\n🗃️ Testing Response Cache...")
+    
+    key_a = make_cache_key('/traffic/predict-demand', {'weather': 'rainy', 'temperature': 30}, 4)
+    key_b = make_cache_key('/traffic/predict-demand', {'temperature': 30, 'weather': 'rainy'}, 4)
+    assert key_a == key_b
+    assert key_a != make_cache_key('/traffic/predict-demand', {'weather': 'rainy', 'temperature': 30}, 8)
+    
+    cache = ResponseCache(max_entries=2, max_bytes=10_000, ttl_seconds=60)
+    cache.set('a', [1])
+    cache.set('b', [2])
+    assert cache.get('a') == [1]
+    cache.set('c', [3])  # evicts 'b', the least recently used
+    assert cache.get('b') is None and cache.get('c') == [3]
+    
+    cache.set('big', 'x' * 20_000)  # larger than the memory cap, never stored
+    assert cache.get('big') is None
+    
+    expiring = ResponseCache(max_entries=10, max_bytes=10_000, ttl_seconds=0.01)
+    expiring.set('a', [1])
+    time.sleep(0.02)
+    assert expiring.get('a') is None and expiring.stats()['expirations'] == 1
+    
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'forecast': 42}
+    
+    async def concurrent_lookups():
+        return await asyncio.gather(*[cache.get_or_compute('shared', compute) for _ in range(5)])
+    
+    results = asyncio.run(concurrent_lookups())
+    assert len(calls) == 1 and all(result == {'forecast': 42} for result in results)
+    
+    stats = cache.stats()
+    print(f"✅ hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']}")
+    
+    return True
+
+def test_route_cache():
+    """Test quantized keys, eviction and the SQLite tier of the route cache"""
+    print("\n🧭 Testing Route Cache...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        db_path = os.path.join(cache_dir, 'routes.db')
+        cache = RouteCache(max_entries=2, precision_m=50, sqlite_path=db_path)
+        
+        key = cache.make_key((12.9716, 77.5946), (12.9352, 77.6245))
+        assert key == cache.make_key((12.97162, 77.59461), (12.93522, 77.62452))
+        assert key != cache.make_key((12.9816, 77.5946), (12.9352, 77.6245))
+        
+        # Longitude cells stay about 50 m wide at high latitudes: a 1 km sweep spans ~20 cells
+        for lat in (0.0, 60.0):
+            span = 1000 / (111320 * np.cos(np.radians(lat)))
+            sweep = {cache.make_key((lat, lon), (lat, 10.0)) for lon in np.linspace(10.0, 10.0 + span, 2000)}
+            assert 20 <= len(sweep) <= 21, (lat, len(sweep))
+        
+        route = {'distance_km': 5.2, 'duration_minutes': 14.0, 'source': 'osrm'}
+        cache.set(key, route)
+        cache.set('b', route)
+        cache.set('c', route)  # evicts key from memory; SQLite still has it
+        assert cache.stats()['entries'] == 2
+        
+        restarted = RouteCache(sqlite_path=db_path)
+        assert restarted.get(key) == route
+        assert restarted.stats()['disk_hits'] == 1
+        
+        # The coroutine versions read and write SQLite from a worker thread
+        async def round_trip():
+            await cache.set_async('async', route)
+            reopened = RouteCache(max_entries=2, sqlite_path=db_path)
+            return reopened, await reopened.get_async('async'), await reopened.get_async('missing')
+        
+        reopened, restored, missing = asyncio.run(round_trip())
+        assert restored == route and missing is None
+        assert reopened.stats()['disk_hits'] == 1 and reopened.stats()['misses'] == 1
+
+        print(f"✅ Route cache: {cache.stats()['evictions']} evictions, restored from SQLite")
+    
+    return True
+
+def test_routing_client():
+    """Test retries and the async client against the local OSRM stub"""
+    print("\n🛰️ Testing Routing Client...")
+    
+    server, base_url = start_stub_server(failure_rate=0.2)
+    try:
+        client = OSRMClient(base_url, max_retries=6, backoff_seconds=0.001)
+        route = client.route([(12.9716, 77.5946), (12.9352, 77.6245)])
+        assert route['routes'][0]['distance'] > 0
+        
+        async_client = AsyncOSRMClient(client)
+        
+        async def run():
+            try:
+                return await asyncio.gather(*[
+                    async_client.route([(12.97, 77.59), (12.90 + i / 100, 77.62)]) for i in range(10)
+                ])
+            finally:
+                await async_client.close()
+        
+        routes = asyncio.run(run())
+        assert len(routes) == 10
+        assert client.stats['retries'] > 0
+        
+        # Chunked table requests agree with the great-circle fallback up to the stub's detour factor
+        optimizer = RouteOptimizer({'osrm': {'base_url': base_url, 'max_retries': 6,
+                                             'backoff_seconds': 0.001, 'max_table_size': 8}})
+        points = [(12.9 + i / 100, 77.6 - i / 100) for i in range(12)]
+        matrix = optimizer.get_distance_matrix(points[:3], points)
+        assert matrix['source'] == 'osrm' and matrix['distances_km'].shape == (3, 12)
+        assert np.allclose(matrix['distances_km'], haversine_matrix(points[:3], points) * 1.3)
+        
+        # The coroutine versions fan out table chunks and legs but agree with the blocking ones
+        stations = [{'station_id': i, 'latitude': lat, 'longitude': lon} for i, (lat, lon) in enumerate(points)]
+        
+        async def run_async():
+            try:
+                return await asyncio.gather(
+                    optimizer.get_distance_matrix_async(points[:3], points),
+                    optimizer.find_optimal_station_async((12.95, 77.58), stations),
+                    optimizer.optimize_multi_stop_route_async(points[0], points[1:6])
+                )
+            finally:
+                await optimizer.async_client.close()
+        
+        async_matrix, station, multi_stop = asyncio.run(run_async())
+        assert np.allclose(async_matrix['distances_km'], matrix['distances_km'])
+        assert station['optimal_station']['station_id'] == \
+            optimizer.find_optimal_station((12.95, 77.58), stations)['optimal_station']['station_id']
+        assert multi_stop['optimized_route']['stop_indices'] == \
+            optimizer.optimize_multi_stop_route(points[0], points[1:6])['optimized_route']['stop_indices']
+        
+        # Alternatives come back from one route request and are then served from the cache
+        alternatives = optimizer.get_alternative_routes(points[0], points[5], 3)
+        requests_made = optimizer.client.stats['requests']
+        assert [route['route_type'] for route in alternatives] == ['primary', 'alternative', 'alternative']
+        assert alternatives[0]['distance_km'] < alternatives[1]['distance_km'] < alternatives[2]['distance_km']
+        assert optimizer.get_alternative_routes(points[0], points[5], 3) == alternatives
+        assert optimizer.client.stats['requests'] == requests_made
+        
+        # A server slower than the timeout is given up on after one attempt, not one per retry
+        slow_server, slow_url = start_stub_server(latency_ms=300)
+        slow_client = OSRMClient(slow_url, timeout=0.05, max_retries=3, backoff_seconds=0.001)
+        started = time.perf_counter()
+        try:
+            slow_client.route([(12.97, 77.59), (12.93, 77.62)])
+            assert False, "expected a read timeout"
+        except RoutingError:
+            elapsed = time.perf_counter() - started
+        finally:
+            slow_server.shutdown()
+        assert slow_client.stats == {'requests': 1, 'retries': 0, 'failures': 1}
+        assert elapsed < 0.3
+        
+        print(f"✅ Routing client: {client.stats['requests']} requests, {client.stats['retries']} retries, "
+              f"{optimizer.client.stats['requests']} optimizer requests")
+    finally:
+        server.shutdown()
+    
+    return True
+
+def test_distance_matrix():
+    """Test the vectorized great-circle matrix against the scalar distance"""
+    print("\n📐 Testing Distance Matrix...")
+    
+    optimizer = RouteOptimizer()
+    rng = np.random.default_rng(0)
+    sources = np.column_stack([rng.uniform(8, 30, 200), rng.uniform(68, 90, 200)])
+    destinations = np.column_stack([rng.uniform(8, 30, 50), rng.uniform(68, 90, 50)])
+    
+    distances = haversine_matrix(sources, destinations)
+    assert distances.shape == (200, 50)
+    for i, j in [(0, 0), (17, 3), (199, 49)]:
+        expected = optimizer.calculate_distance(*sources[i], *destinations[j])
+        assert abs(distances[i, j] - expected) < 1e-6
+    assert np.allclose(np.diag(haversine_matrix(sources, sources)), 0, atol=1e-6)
+    
+    matrix = optimizer.get_distance_matrix(sources, destinations, use_routing=False)
+    assert matrix['source'] == 'great_circle'
+    assert np.allclose(matrix['durations_minutes'], distances / 25 * 60)
+    
+    print(f"✅ Distance matrix: {distances.size} pairs, max {distances.max():.0f} km")
+    return True
+
+def test_tsp_solver():
+    """Test Held-Karp against brute force and the heuristic's route validity"""
+    print("\n🧮 Testing Multi-Stop Solvers...")
+    
+    from itertools import permutations
+    
+    rng = np.random.default_rng(3)
+    for n in range(6):
+        cost = rng.uniform(1, 100, (n + 2, n + 2))  # asymmetric, like road legs
+        brute_force = min(path_cost(cost, list(p)) for p in permutations(range(1, n + 1)))
+        assert abs(path_cost(cost, held_karp(cost)) - brute_force) < 1e-9
+        assert path_lower_bound(cost) <= brute_force + 1e-9
+    
+    assert RouteOptimizer({'tsp': {'exact_max_stops': 25}}).tsp_settings['exact_max_stops'] == HELD_KARP_MAX_STOPS
+    optimizer = RouteOptimizer({'tsp': {'exact_max_stops': 10, 'time_budget_ms': 200}})
+    stops = [tuple(point) for point in np.column_stack([rng.uniform(12.8, 13.1, 30), rng.uniform(77.4, 77.8, 30)])]
+    result = optimizer.optimize_multi_stop_route((12.97, 77.59), stops)
+    route = result['optimized_route']
+    
+    assert result['method'] == 'nearest_neighbor_2opt'
+    assert sorted(route['stop_indices']) == list(range(30))
+    assert route['total_distance_km'] <= result['quality']['initial_distance_km']
+    
+    # A leg OSRM reports as null is avoided, and any use of it is priced from great-circle distance
+    points = [(12.97, 77.59), *stops[:3], (12.97, 77.59)]
+    matrix = optimizer.get_distance_matrix(points, points, use_routing=False)
+    matrix['distances_km'][:, 1] = matrix['durations_minutes'][:, 1] = np.nan
+    matrix['source'] = 'osrm'
+    unreachable = optimizer._solve_multi_stop(points, matrix, 0)['optimized_route']
+    segments = unreachable['segments']
+    [estimated] = [segment for segment in segments if segment['source'] == 'fallback']
+    assert estimated['to'] == stops[0]
+    assert abs(estimated['distance_km'] - haversine_matrix([estimated['from']], [stops[0]])[0, 0]) < 1e-9
+    assert unreachable['total_distance_km'] == sum(segment['distance_km'] for segment in segments)
+    assert np.isfinite(unreachable['total_duration_minutes'])
+    
+    print(f"✅ Multi-stop: {route['total_distance_km']:.1f} km "
+          f"(nearest neighbour {result['quality']['initial_distance_km']:.1f} km) in {result['timing']['solve_ms']:.0f} ms")
+    return True
+
+def test_station_index():
+    """Test catalog k-nearest and radius lookups against brute force"""
+    print("\n📍 Testing Station Index...")
+    
+    rng = np.random.default_rng(11)
+    coords = np.column_stack([rng.uniform(8, 35, 2000), rng.uniform(68, 97, 2000)])
+    stations = [
+        {'station_id': f'ST{i:04d}', 'latitude': lat, 'longitude': lon}
+        for i, (lat, lon) in enumerate(coords.tolist())
+    ]
+    stations.append({'station_id': 'NO_COORDS'})
+    
+    optimizer = RouteOptimizer({'osrm': {'max_retries': 0}})
+    optimizer.load_station_catalog(stations)
+    assert len(optimizer.station_index) == 2000
+    
+    user = (19.07, 72.87)
+    expected = haversine_matrix([user], coords)[0]
+    
+    nearest = optimizer.find_nearby_stations(user, k=10)
+    assert [s['station_id'] for s in nearest] == [f'ST{i:04d}' for i in np.argsort(expected)[:10]]
+    assert abs(nearest[0]['straight_line_km'] - expected.min()) < 1e-6
+    
+    within = optimizer.find_nearby_stations(user, radius_km=300)
+    assert len(within) == int((expected <= 300).sum())
+    
+    assert optimizer.find_nearby_stations(user, k=0) == []
+    empty = RouteOptimizer({'osrm': {'max_retries': 0}})
+    empty.load_station_catalog([{'station_id': 'NO_COORDS'}])
+    assert empty.find_nearby_stations(user, k=10) == []
+    
+    result = optimizer.find_optimal_station(user, preferences={'max_candidates': 5})
+    assert result['total_stations_evaluated'] == 5
+    assert result['optimal_station']['station_id'] in {s['station_id'] for s in nearest[:5]}
+    
+    print(f"✅ Station index: nearest {nearest[0]['straight_line_km']:.1f} km, {len(within)} within 300 km")
+    return True
+
+def test_signal_generation():
+    """Test vectorized signal generation layout and value ranges"""
+    print("\n📡 Testing Signal Generation...")
+    
+    generator = EVCopilotDatasetGenerator()
+    stations = generator.generate_station_master_data(5)
+    
+    # Force several station blocks so they are stitched together
+    block_rows = generate_datasets.SIGNAL_BLOCK_ROWS
+    generate_datasets.SIGNAL_BLOCK_ROWS = 2 * 7 * 24 * 4
+    try:
+        signals = generator.generate_historical_signals(stations, days=7, signals_per_hour=4)
+    finally:
+        generate_datasets.SIGNAL_BLOCK_ROWS = block_rows
+    
+    steps = 7 * 24 * 4
+    assert len(signals) == 5 * steps
+    assert list(signals['station_id'].astype(str)) == list(np.repeat(stations['station_id'], steps))
+    assert list(signals['timestamp'][:3]) == list(pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:15', '2024-01-01 00:30']))
+    assert signals['timestamp'].iloc[-1] == pd.Timestamp('2024-01-07 23:45')
+    assert (signals['hour'] == np.tile(np.repeat(np.arange(24), 4), 35)).all()
+    assert (signals['is_weekend'] == (signals['day_of_week'] >= 5)).all()
+    
+    assert (signals['chargers_up'] <= signals['total_chargers']).all()
+    assert (signals['inventory'].between(0, signals['max_inventory'])).all()
+    assert (signals['queue_length'] >= 0).all()
+    assert set(signals['weather']) <= set(generate_datasets.WEATHER_CONDITIONS)
+    assert set(signals['error'].dropna()) <= set(generate_datasets.ERROR_CODES)
+    
+    # Every signal of a station-day shares its holiday flag
+    assert (signals.groupby(['station_id', 'day_of_week'], observed=True)['is_holiday'].nunique() == 1).all()
+    
+    print(f"✅ Signal generation: {len(signals)} signals, {signals['error'].notna().sum()} errors")
+    return True
+
+def test_dataset_formats():
+    """Test that CSV, Parquet and Feather datasets load the same projected, filtered rows"""
+    print("\n🗄️ Testing Dataset Formats...")
+    
+    generator = EVCopilotDatasetGenerator()
+    stations = generator.generate_station_master_data(4)
+    signals = generator.generate_historical_signals(stations, days=14, signals_per_hour=2)
+    
+    query = {
+        'columns': {'signals': ['timestamp', 'station_id', 'queue_length']},
+        'station_ids': ['ST002', 'ST004'],
+        'start': datetime(2024, 1, 3),
+        'end': datetime(2024, 1, 5, 12)
+    }
+    expected = signals[
+        signals['station_id'].isin(query['station_ids']) &
+        (signals['timestamp'] >= query['start']) & (signals['timestamp'] < query['end'])
+    ]
+    
+    with tempfile.TemporaryDirectory() as root:
+        for file_format in ['csv', 'parquet', 'feather']:
+            directory = os.path.join(root, file_format)
+            os.makedirs(directory)
+            generator._save_dataset(stations, directory, 'stations', file_format)
+            generator._save_dataset(signals, directory, 'signals', file_format)
+            
+            loaded = DataProcessor.load_datasets(directory, ['stations', 'signals'], **query)
+            assert len(loaded['stations']) == 2
+            
+            subset = loaded['signals']
+            assert list(subset.columns) == query['columns']['signals']
+            assert pd.api.types.is_datetime64_any_dtype(subset['timestamp'])
+            assert len(subset) == len(expected) == 2 * 60 * 2
+            assert (subset['timestamp'].to_numpy() == expected['timestamp'].to_numpy()).all()
+            assert list(subset['station_id'].astype(str)) == list(expected['station_id'].astype(str))
+            assert np.allclose(subset['queue_length'], expected['queue_length'])
+        
+        # Columnar builds still write the station catalog the backend reads as CSV
+        generator.save_datasets(os.path.join(root, 'build'), 'parquet', n_stations=3, days=1)
+        catalog = pd.read_csv(os.path.join(root, 'build', 'stations.csv'))
+        loaded = DataProcessor.load_datasets(os.path.join(root, 'build'), ['stations'])['stations']
+        assert list(catalog['station_id']) == list(loaded['station_id'].astype(str))
+    
+    print(f"✅ Dataset formats: {len(expected)} matching signals from csv, parquet and feather")
+    return True
+
+def test_streaming_generation():
+    """Test that streamed signals match in-memory generation in every format"""
+    print("\n🌊 Testing Streaming Generation...")
+    
+    expected = EVCopilotDatasetGenerator()
+    expected = expected.generate_historical_signals(expected.generate_station_master_data(5), days=2)
+    
+    with tempfile.TemporaryDirectory() as root:
+        for file_format in ['csv', 'parquet', 'feather']:
+            generator = EVCopilotDatasetGenerator()
+            stations = generator.generate_station_master_data(5)
+            
+            # A ceiling this low makes every station its own block
+            filename, n_signals, pool = generator._stream_signals(stations, 2, root, file_format, max_memory_mb=0.2)
+            assert n_signals == len(expected) == 5 * 2 * 24 * 6
+            assert 0 < len(pool) <= n_signals
+            
+            streamed = DataProcessor.load_datasets(root, ['signals'])['signals']
+            os.remove(os.path.join(root, filename))
+            assert list(streamed['station_id'].astype(str)) == list(expected['station_id'].astype(str))
+            assert (streamed['timestamp'].to_numpy() == expected['timestamp'].to_numpy()).all()
+            for column in ['queue_length', 'chargers_up', 'inventory', 'temperature', 'current']:
+                assert np.allclose(streamed[column], expected[column]), column
+            assert streamed['error'].isna().equals(expected['error'].isna())
+    
+    print(f"✅ Streaming generation: {n_signals} signals identical across csv, parquet and feather")
+    return True
+
+def test_agent_decisions():
+    """Test vectorized decision generation against its trigger signals"""
+    print("\n🤖 Testing Agent Decisions...")
+    
+    generator = EVCopilotDatasetGenerator()
+    signals = generator.generate_historical_signals(generator.generate_station_master_data(3), days=7)
+    
+    # Signals loaded back from CSV carry errors as plain strings
+    for trigger_signals in [signals, signals.astype({'error': object, 'station_id': str})]:
+        decisions = generator.generate_agent_decisions(trigger_signals, 20000)
+        assert len(decisions) == 20000
+        assert decisions['decision_id'].iloc[0] == 'DEC_000001' and decisions['decision_id'].iloc[-1] == 'DEC_020000'
+        
+        triggers = decisions.merge(
+            signals[['timestamp', 'station_id', 'error']].astype({'station_id': str}),
+            left_on=['timestamp', decisions['station_id'].astype(str)],
+            right_on=['timestamp', 'station_id'], how='left'
+        )
+        assert len(triggers) == len(decisions)
+        assert (triggers['trigger_event'].astype(str) == triggers['error'].astype(object).fillna('routine_monitoring')).all()
+        
+        mechanic = decisions[decisions['agent'] == 'MechanicAgent']
+        assert (mechanic.loc[mechanic['trigger_event'] != 'routine_monitoring', 'confidence_score'] == 0.9).all()
+        assert (mechanic.loc[mechanic['trigger_event'] == 'routine_monitoring', 'success_rate'] == 0.95).all()
+        
+        prefixes = {'MechanicAgent': 0, 'TrafficAgent': 4, 'LogisticsAgent': 8, 'EnergyAgent': 12}
+        first_action = decisions['agent'].map(prefixes).astype(int)
+        assert (decisions['action'].cat.codes - first_action).between(0, 3).all()
+        assert decisions['agent'].value_counts(normalize=True).between(0.23, 0.27).all()
+    
+    print(f"✅ Agent decisions: {len(decisions)} decisions, {(decisions['trigger_event'] != 'routine_monitoring').sum()} on errors")
+    return True
+
+def test_parallel_generation():
+    """Test that signals are identical for any worker count and leave global state alone"""
+    print("\n🧵 Testing Parallel Generation...")
+    
+    global_state = np.random.get_state()[1].copy()
+    
+    serial = EVCopilotDatasetGenerator(seed=7)
+    stations = serial.generate_station_master_data(12)
+    expected = serial.generate_historical_signals(stations, days=5)
+    
+    parallel = EVCopilotDatasetGenerator(seed=7, workers=2)
+    pd.testing.assert_frame_equal(parallel.generate_station_master_data(12), stations)
+    
+    # Small blocks so both workers get several
+    blocks = list(parallel._signal_blocks(stations, 5, 6, block_rows=3 * 5 * 24 * 6))
+    assert len(blocks) == 4
+    pd.testing.assert_frame_equal(pd.concat(blocks, ignore_index=True), expected, check_exact=True)
+    
+    # Each dataset has its own stream, so repeated calls and other seeds behave predictably
+    pd.testing.assert_frame_equal(serial.generate_agent_decisions(expected, 500),
+                                  parallel.generate_agent_decisions(expected, 500))
+    other = EVCopilotDatasetGenerator(seed=8).generate_historical_signals(stations, days=5)
+    assert not np.allclose(other['temperature'], expected['temperature'])
+    assert (np.random.get_state()[1] == global_state).all()
+    
+    print(f"✅ Parallel generation: {len(expected)} signals identical on 1 and 2 workers")
+    return True
+
 def main():
     """Run all tests"""
     print("🧠 EV COPILOT ML MODELS TEST SUITE")
@@ -311,7 +1002,23 @@ def main():
         test_logistics_optimizer,
         test_energy_trader,
         test_audit_analyzer,
-        test_route_optimizer
+        test_route_optimizer,
+        test_model_registry,
+        test_failure_micro_batching,
+        test_inference_executor,
+        test_agent_deadlines,
+        test_background_retraining,
+        test_response_cache,
+        test_route_cache,
+        test_routing_client,
+        test_distance_matrix,
+        test_tsp_solver,
+        test_station_index,
+        test_signal_generation,
+        test_dataset_formats,
+        test_streaming_generation,
+        test_agent_decisions,
+        test_parallel_generation
     ]
     
     passed = 0
@@ -0,0 +1,231 @@
+"""
+Model training for EV Copilot ML Service
+Trains models in worker processes: all at once for a full refresh, or one
+at a time as background jobs that publish each new version atomically
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from config import MLConfig
+from inference import _init_worker
+from model_registry import ModelRegistry
+from utils import logger
+
+def _init_training_worker(niceness: int):
+    """Prepare a training worker, deprioritized so serving keeps the CPU"""
+    _init_worker()
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+
+def _with_n_jobs(config: Dict[str, Any], n_jobs: int) -> Dict[str, Any]:
+    """Override n_jobs for every estimator that declares one"""
+    return {
+        estimator: {**params, 'n_jobs': n_jobs} if 'n_jobs' in params else params
+        for estimator, params in config.items()
+    }
+
+def _train_and_register(model_cls, registry_name: str, models_dir: str, max_versions: int,
+                        n_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Train a fresh model instance and register it, inside a worker process"""
+    config = MLConfig.get_model_config(registry_name)
+    model = model_cls(_with_n_jobs(config, n_jobs) if n_jobs else config)
+    metrics = model.train()
+
+    # Saved estimators keep the serving n_jobs, not the training share
+    if n_jobs:
+        for estimator, params in config.items():
+            if 'n_jobs' in params:
+                getattr(model, estimator).set_params(n_jobs=params['n_jobs'])
+
+    registry = ModelRegistry(models_dir, max_versions)
+    version = registry.save(registry_name, model, metrics)
+    return registry.get_metadata(registry_name, version)
+
+def train_models(model_classes: Dict[str, Any], registry: Optional[ModelRegistry] = None,
+                 cpu_budget: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Train and register several models concurrently in worker processes
+
+    model_classes maps registry names to model classes. The CPU budget is
+    split between one worker per model (up to the budget) and the n_jobs of
+    each worker's estimators, so wall time approaches that of the slowest
+    model. Returns the registered metadata per model, or {'error': ...} for
+    models that failed to train.
+    """
+    registry = registry or ModelRegistry()
+    cpu_budget = cpu_budget or MLConfig.TRAINING_SETTINGS['cpu_budget']
+    workers = max(1, min(len(model_classes), cpu_budget))
+    n_jobs = max(1, cpu_budget // workers)
+
+    logger.info(
+        f"Training {len(model_classes)} models on {workers} workers "
+        f"({n_jobs} cores each, budget {cpu_budget})"
+    )
+
+    results = {}
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(
+                _train_and_register, model_cls, registry_name,
+                registry.models_dir, registry.max_versions, n_jobs
+            ): registry_name
+            for registry_name, model_cls in model_classes.items()
+        }
+
+        for future in as_completed(futures):
+            registry_name = futures[future]
+            try:
+                results[registry_name] = future.result()
+                logger.info(
+                    f"Trained {registry_name} version {results[registry_name]['version']} "
+                    f"after {time.time() - started:.1f}s"
+                )
+            except Exception as e:
+                results[registry_name] = {'error': str(e)}
+                logger.error(f"Training {registry_name} failed: {e}")
+
+    return results
+
+class TrainingJobManager:
+    """Run retraining jobs in a process pool and hand back the new models
+
+    A job trains a new instance of the model class in a worker process and
+    registers it as a new version. The serving process then loads that
+    version into another new instance and passes it to on_complete, so the
+    model serving requests is replaced in one step and never mutated.
+    """
+
+    def __init__(self, registry: ModelRegistry, on_complete: Callable[[str, Any, Dict[str, Any]], None],
+                 settings: Optional[Dict[str, Any]] = None):
+        self.registry = registry
+        self.on_complete = on_complete
+        self.settings = settings or MLConfig.TRAINING_SETTINGS
+        self.pool = None
+
+        self._jobs = OrderedDict()
+        self._slots = asyncio.Semaphore(self.settings['workers'])
+        self._tasks = set()
+
+    def submit(self, model_name: str, model_cls, registry_name: str) -> Dict[str, Any]:
+        """Queue a retraining job and return its record"""
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'model_name': model_name,
+            'status': 'queued',
+            'submitted_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'version': None,
+            'metrics': None,
+            'error': None
+        }
+        self._jobs[job['job_id']] = job
+        self._prune()
+
+        task = asyncio.create_task(self._run(job, model_cls, registry_name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info(f"Queued retraining job {job['job_id']} for {model_name}")
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record by id"""
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def active_job(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Get the queued or running job for a model, if any"""
+        for job in self._jobs.values():
+            if job['model_name'] == model_name and job['status'] in ('queued', 'running'):
+                return dict(job)
+        return None
+
+    def shutdown(self):
+        """Cancel pending jobs and stop the worker pool"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def _run(self, job: Dict[str, Any], model_cls, registry_name: str):
+        async with self._slots:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.settings['workers'],
+                    initializer=_init_training_worker,
+                    initargs=(self.settings['niceness'],)
+                )
+
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
+            loop = asyncio.get_running_loop()
+
+            try:
+                metadata = await loop.run_in_executor(self.pool, functools.partial(
+                    _train_and_register, model_cls, registry_name,
+                    self.registry.models_dir, self.registry.max_versions
+                ))
+
+                # Load the registered artifact into a new instance off the event loop
+                model = await loop.run_in_executor(None, functools.partial(
+                    self._load_version, model_cls, registry_name, metadata['version']
+                ))
+                self.on_complete(job['model_name'], model, metadata)
+
+                job['version'] = metadata['version']
+                job['metrics'] = metadata['metrics']
+                job['status'] = 'completed'
+                logger.info(f"Retraining job {job['job_id']} published {registry_name} {metadata['version']}")
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = 'failed'
+                logger.error(f"Retraining job {job['job_id']} failed: {e}")
+            finally:
+                job['finished_at'] = datetime.now().isoformat()
+
+    def _load_version(self, model_cls, registry_name: str, version: str):
+        model = model_cls()
+        model.load_model(self.registry.artifact_path(registry_name, version))
+        return model
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the retention limit"""
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job['status'] in ('completed', 'failed')
+        ]
+        for job_id in finished[:max(0, len(self._jobs) - self.settings['max_jobs'])]:
+            del self._jobs[job_id]
+
+if __name__ == "__main__":
+    _init_worker()
+    from failure_predictor import FailurePredictor
+    from traffic_optimizer import TrafficOptimizer
+    from logistics_optimizer import LogisticsOptimizer
+    from energy_trader import EnergyTrader
+    from audit_analyzer import AuditAnalyzer
+
+    started = time.time()
+    # Slowest first, so they start ahead of the quick ones when workers are scarce
+    results = train_models({
+        'traffic_optimizer': TrafficOptimizer,
+        'energy_trader': EnergyTrader,
+        'logistics_optimizer': LogisticsOptimizer,
+        'audit_analyzer': AuditAnalyzer,
+        'failure_predictor': FailurePredictor
+    })
+
+    failed = [name for name, result in results.items() if 'error' in result]
+    print(f"Trained {len(results) - len(failed)}/{len(results)} models in {time.time() - started:.1f}s")
+    sys.exit(1 if failed else 0)
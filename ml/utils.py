@@ -10,6 +10,18 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import logging
 
+from config import MLConfig
+
+try:
+    import pyarrow.dataset as pa_dataset
+except ImportError:  # Parquet and Feather datasets need pyarrow; CSV loads without it
+    pa_dataset = None
+
+DATASET_NAMES = ['stations', 'signals', 'decisions', 'energy_market', 'users']
+
+# File extension per dataset format, in the order load_datasets looks for them
+DATASET_FORMATS = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv'}
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -65,18 +77,19 @@ class ModelUtils:
     """Utility functions for ML models"""
     
     @staticmethod
-    def ensure_models_dir():
+    def ensure_models_dir(models_dir: Optional[str] = None):
         """Ensure models directory exists"""
-        models_dir = 'saved_models'
+        models_dir = models_dir or MLConfig.DATA_SETTINGS['models_dir']
         if not os.path.exists(models_dir):
             os.makedirs(models_dir)
             logger.info(f"Created models directory: {models_dir}")
         return models_dir
     
     @staticmethod
-    def save_model_metadata(model_name: str, metadata: Dict[str, Any]):
+    def save_model_metadata(model_name: str, metadata: Dict[str, Any],
+                            models_dir: Optional[str] = None):
         """Save model metadata"""
-        models_dir = ModelUtils.ensure_models_dir()
+        models_dir = ModelUtils.ensure_models_dir(models_dir)
         metadata_path = os.path.join(models_dir, f"{model_name}_metadata.json")
         
         metadata['saved_at'] = datetime.now().isoformat()
@@ -87,9 +100,10 @@ class ModelUtils:
         logger.info(f"Saved metadata for {model_name}")
     
     @staticmethod
-    def load_model_metadata(model_name: str) -> Optional[Dict[str, Any]]:
+    def load_model_metadata(model_name: str,
+                            models_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Load model metadata"""
-        models_dir = 'saved_models'
+        models_dir = models_dir or MLConfig.DATA_SETTINGS['models_dir']
         metadata_path = os.path.join(models_dir, f"{model_name}_metadata.json")
         
         if os.path.exists(metadata_path):
@@ -102,28 +116,87 @@ class DataProcessor:
     """Data processing utilities"""
     
     @staticmethod
-    def load_datasets(datasets_dir: str = 'datasets') -> Dict[str, pd.DataFrame]:
-        """Load all generated datasets"""
-        datasets = {}
+    def load_datasets(datasets_dir: str = 'datasets', names: Optional[List[str]] = None,
+                      columns: Optional[Dict[str, List[str]]] = None,
+                      station_ids: Optional[List[str]] = None,
+                      start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        """Load generated datasets in whichever format they were saved
         
-        dataset_files = {
-            'stations': 'stations.csv',
-            'signals': 'signals.csv',
-            'decisions': 'decisions.csv',
-            'energy_market': 'energy_market.csv',
-            'users': 'users.csv'
-        }
+        columns maps a dataset name to the columns to read. station_ids and
+        the [start, end) range filter every dataset with a station_id or
+        timestamp column; Parquet and Feather apply them while scanning.
+        """
+        datasets = {}
         
-        for name, filename in dataset_files.items():
-            filepath = os.path.join(datasets_dir, filename)
-            if os.path.exists(filepath):
-                datasets[name] = pd.read_csv(filepath)
-                logger.info(f"Loaded {name}: {len(datasets[name])} records")
+        for name in names or DATASET_NAMES:
+            for file_format, extension in DATASET_FORMATS.items():
+                filepath = os.path.join(datasets_dir, name + extension)
+                if os.path.exists(filepath):
+                    break
             else:
-                logger.warning(f"Dataset file not found: {filepath}")
+                logger.warning(f"Dataset file not found: {os.path.join(datasets_dir, name)}.*")
+                continue
+            
+            datasets[name] = DataProcessor._read_dataset(
+                filepath, file_format, (columns or {}).get(name), station_ids, start, end
+            )
+            logger.info(f"Loaded {name}: {len(datasets[name])} records from {file_format}")
         
         return datasets
     
+    @staticmethod
+    def _read_dataset(filepath: str, file_format: str, columns: Optional[List[str]],
+                      station_ids: Optional[List[str]], start: Optional[datetime],
+                      end: Optional[datetime]) -> pd.DataFrame:
+        """Read one dataset file with column projection and row filters"""
+        if file_format != 'csv':
+            if pa_dataset is None:
+                raise ImportError(f"pyarrow is required to read {filepath}")
+            
+            dataset = pa_dataset.dataset(filepath, format='parquet' if file_format == 'parquet' else 'ipc')
+            available = dataset.schema.names
+            
+            conditions = []
+            if station_ids is not None and 'station_id' in available:
+                conditions.append(pa_dataset.field('station_id').isin(list(station_ids)))
+            if 'timestamp' in available:
+                if start is not None:
+                    conditions.append(pa_dataset.field('timestamp') >= pd.Timestamp(start).to_pydatetime())
+                if end is not None:
+                    conditions.append(pa_dataset.field('timestamp') < pd.Timestamp(end).to_pydatetime())
+            
+            expression = None
+            for condition in conditions:
+                expression = condition if expression is None else expression & condition
+            
+            table = dataset.to_table(columns=columns, filter=expression)
+            # Release Arrow buffers as columns convert, so the table and frame are not both held
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        
+        available = pd.read_csv(filepath, nrows=0).columns
+        filter_station = station_ids is not None and 'station_id' in available
+        filter_time = (start is not None or end is not None) and 'timestamp' in available
+        
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(
+                [*columns, *(['station_id'] if filter_station else []), *(['timestamp'] if filter_time else [])]
+            ))
+        parse_dates = ['timestamp'] if 'timestamp' in (usecols or available) else None
+        df = pd.read_csv(filepath, usecols=usecols, parse_dates=parse_dates)
+        
+        mask = np.ones(len(df), dtype=bool)
+        if filter_station:
+            mask &= df['station_id'].isin(station_ids).to_numpy()
+        if filter_time and start is not None:
+            mask &= (df['timestamp'] >= pd.Timestamp(start)).to_numpy()
+        if filter_time and end is not None:
+            mask &= (df['timestamp'] < pd.Timestamp(end)).to_numpy()
+        
+        df = df[mask] if not mask.all() else df
+        return (df[columns] if columns is not None else df).reset_index(drop=True)
+    
     @staticmethod
     def get_recent_data(df: pd.DataFrame, hours: int = 24, 
                        timestamp_col: str = 'timestamp') -> pd.DataFrame: